@@ -0,0 +1,161 @@
+from typing import Iterable, List
+from xml.etree import ElementTree as ET
+
+# =====================
+# arXiv Atom feed parsing
+# =====================
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+ARXIV_NS = "{http://arxiv.org/schemas/atom}"
+
+FEED_TAG = ATOM_NS + "feed"
+ENTRY_TAG = ATOM_NS + "entry"
+TITLE_TAG = ATOM_NS + "title"
+SUMMARY_TAG = ATOM_NS + "summary"
+AUTHOR_TAG = ATOM_NS + "author"
+NAME_TAG = ATOM_NS + "name"
+PUBLISHED_TAG = ATOM_NS + "published"
+ID_TAG = ATOM_NS + "id"
+DOI_TAG = ARXIV_NS + "doi"
+
+ABSTRACT_LIMIT = 500
+
+
+def entry_to_dict(entry: ET.Element) -> dict:
+    """Convert one <entry> into ResearchPaper fields with a single pass over its children"""
+    title = "No title"
+    abstract = "No abstract available"
+    authors = []
+    published_date = ""
+    url = ""
+    doi = None
+
+    for child in entry:
+        tag = child.tag
+        if tag == TITLE_TAG:
+            title = (child.text or "").strip()
+        elif tag == SUMMARY_TAG:
+            abstract = (child.text or "").strip()
+        elif tag == AUTHOR_TAG:
+            for name_elem in child:
+                if name_elem.tag == NAME_TAG and name_elem.text:
+                    authors.append(name_elem.text.strip())
+        elif tag == PUBLISHED_TAG:
+            published_date = child.text or ""
+        elif tag == ID_TAG:
+            url = child.text or ""
+        elif tag == DOI_TAG:
+            doi = (child.text or "").strip() or None
+
+    if len(abstract) > ABSTRACT_LIMIT:
+        abstract = abstract[:ABSTRACT_LIMIT] + "..."
+
+    return {
+        "title": title,
+        "authors": authors,
+        "abstract": abstract,
+        "published_date": published_date,
+        "source": "arXiv",
+        "url": url,
+        "doi": doi,
+    }
+
+
+class ArxivFeedParser:
+    """Incremental Atom parser fed with raw response chunks.
+
+    Entries are converted as soon as their closing tag arrives and then
+    detached from the tree, so memory stays flat regardless of feed size.
+    feed() returns True once max_results entries have been collected, at
+    which point the caller can stop reading the response.
+    """
+
+    def __init__(self, max_results: int):
+        self.max_results = max_results
+        self.entries: List[dict] = []
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._feed_elem = None
+
+    @property
+    def done(self) -> bool:
+        return len(self.entries) >= self.max_results
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.done:
+            return True
+        self._parser.feed(chunk)
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if elem.tag == FEED_TAG:
+                    self._feed_elem = elem
+                continue
+            if elem.tag != ENTRY_TAG:
+                continue
+            try:
+                self.entries.append(entry_to_dict(elem))
+            except Exception as e:
+                print(f"Error processing arXiv entry: {e}")
+            elem.clear()
+            if self._feed_elem is not None:
+                self._feed_elem.remove(elem)
+            if self.done:
+                break
+        return self.done
+
+    def close(self) -> List[dict]:
+        if not self.done:
+            try:
+                self._parser.close()
+            except ET.ParseError as e:
+                print(f"arXiv feed ended early: {e}")
+        return self.entries[:self.max_results]
+
+
+def parse_feed_incremental(chunks: Iterable[bytes], max_results: int) -> List[dict]:
+    parser = ArxivFeedParser(max_results)
+    for chunk in chunks:
+        if parser.feed(chunk):
+            break
+    return parser.close()
+
+
+def parse_feed_tree(xml_text: str, max_results: int) -> List[dict]:
+    """Full-tree parse (the original implementation); kept for comparison benchmarks"""
+    root = ET.fromstring(xml_text)
+    papers = []
+
+    for entry in root.findall(ENTRY_TAG):
+        try:
+            title_elem = entry.find(TITLE_TAG)
+            title = title_elem.text.strip() if title_elem is not None else "No title"
+
+            summary_elem = entry.find(SUMMARY_TAG)
+            abstract = summary_elem.text.strip() if summary_elem is not None else "No abstract available"
+            if len(abstract) > ABSTRACT_LIMIT:
+                abstract = abstract[:ABSTRACT_LIMIT] + "..."
+
+            authors = []
+            for author_elem in entry.findall(AUTHOR_TAG):
+                name_elem = author_elem.find(NAME_TAG)
+                if name_elem is not None and name_elem.text:
+                    authors.append(name_elem.text.strip())
+
+            published_elem = entry.find(PUBLISHED_TAG)
+            published_date = published_elem.text if published_elem is not None else ""
+
+            id_elem = entry.find(ID_TAG)
+            url = id_elem.text if id_elem is not None else ""
+
+            papers.append({
+                "title": title,
+                "authors": authors,
+                "abstract": abstract,
+                "published_date": published_date,
+                "source": "arXiv",
+                "url": url,
+                "doi": None,
+            })
+        except Exception as e:
+            print(f"Error processing arXiv entry: {e}")
+            continue
+
+    return papers[:max_results]
@@ -0,0 +1,337 @@
+import os
+import re
+from datetime import datetime
+from typing import List, Optional
+
+from bson.objectid import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne, errors
+
+from database import (
+    MONGO_URI, MONGO_DB, MONGO_POOL_OPTIONS, PAPER_FIELDS, paper_key, _with_structure,
+    _activity_id, activity_summary, _count_pipeline, _merge_counts, _reconcile_operations, _applied_despite
+)
+from roadmap_phases import parse_roadmap
+
+# =====================
+# Async MongoDB data layer
+# =====================
+# The CRUD helpers of database.py with the same names and arguments, as
+# coroutines on motor, so async endpoints await MongoDB instead of blocking
+# the event loop (or borrowing a threadpool thread) for every round trip.
+# database.py stays the place for index creation and for sync callers
+# (scripts, the job queue). The async pool can be sized on its own with
+# MONGO_ASYNC_MAX_POOL_SIZE / MONGO_ASYNC_MIN_POOL_SIZE.
+
+client = AsyncIOMotorClient(MONGO_URI, **{
+    **MONGO_POOL_OPTIONS,
+    "maxPoolSize": int(os.getenv("MONGO_ASYNC_MAX_POOL_SIZE", MONGO_POOL_OPTIONS["maxPoolSize"])),
+    "minPoolSize": int(os.getenv("MONGO_ASYNC_MIN_POOL_SIZE", MONGO_POOL_OPTIONS["minPoolSize"])),
+})
+db = client[MONGO_DB]
+
+# Collections
+users_collection = db["users"]
+ideas_collection = db["ideas"]
+profiles_collection = db["profiles"]
+roadmaps_collection = db["roadmaps"]
+research_collection = db["research"]
+papers_collection = db["papers"]
+activity_collection = db["activity_counters"]
+cache_collection = db["cache"]
+
+# =====================
+# User/Profile helpers
+# =====================
+async def get_user_by_id(user_id: str):
+    return await users_collection.find_one({"_id": ObjectId(user_id)})
+
+async def get_user_profile(user_id: str):
+    return await profiles_collection.find_one({"user_id": ObjectId(user_id)})
+
+async def update_user_profile(user_id: str, profile_data: dict):
+    result = await profiles_collection.update_one(
+        {"user_id": ObjectId(user_id)},
+        {"$set": profile_data},
+        upsert=True
+    )
+    if result.upserted_id is not None:
+        await mark_profile_exists(user_id)
+    return result
+
+# =====================
+# Roadmap CRUD
+# =====================
+async def create_roadmap(user_id: str, data: dict) -> str:
+    now = datetime.utcnow()
+    data.update({
+        "created_at": now,
+        "updated_at": now,
+        "user_id": user_id
+    })
+    if data.get("roadmap"):
+        data.update(parse_roadmap(data["roadmap"]))
+    result = await roadmaps_collection.insert_one(data)
+    await increment_activity(user_id, "roadmaps")
+    return str(result.inserted_id)
+
+async def get_roadmap_by_id(roadmap_id: str):
+    roadmap = await roadmaps_collection.find_one({"_id": ObjectId(roadmap_id)})
+    if roadmap:
+        roadmap["id"] = str(roadmap["_id"])
+        del roadmap["_id"]
+        _with_structure(roadmap)
+    return roadmap
+
+async def get_user_roadmaps(user_id: str):
+    roadmaps = await roadmaps_collection.find({"user_id": user_id}).to_list(length=None)
+    for roadmap in roadmaps:
+        roadmap["id"] = str(roadmap["_id"])
+        del roadmap["_id"]
+        _with_structure(roadmap)
+    return roadmaps
+
+async def update_roadmap(roadmap_id: str, update_data: dict):
+    update_data["updated_at"] = datetime.utcnow()
+    if update_data.get("roadmap"):
+        update_data.update(parse_roadmap(update_data["roadmap"]))
+    return await roadmaps_collection.update_one(
+        {"_id": ObjectId(roadmap_id)},
+        {"$set": update_data}
+    )
+
+async def replace_roadmap_text(roadmap_id: str, expected_text: str, roadmap_text: str) -> bool:
+    """Store new roadmap text only if nobody changed it since it was read"""
+    result = await roadmaps_collection.update_one(
+        {"_id": ObjectId(roadmap_id), "roadmap": expected_text},
+        {"$set": {
+            "roadmap": roadmap_text,
+            "updated_at": datetime.utcnow(),
+            **parse_roadmap(roadmap_text)
+        }}
+    )
+    return result.matched_count == 1
+
+async def delete_roadmap(roadmap_id: str) -> bool:
+    deleted = await roadmaps_collection.find_one_and_delete({"_id": ObjectId(roadmap_id)}, {"user_id": 1})
+    if deleted is None:
+        return False
+    await increment_activity(deleted["user_id"], "roadmaps", -1)
+    return True
+
+# =====================
+# Research CRUD
+# =====================
+async def save_research(user_id: str, research_data: dict) -> str:
+    research_doc = {
+        "user_id": ObjectId(user_id),
+        "idea": research_data["idea"],
+        "search_terms": research_data.get("search_terms", []),
+        "papers": research_data.get("papers", []),
+        "validation": research_data.get("validation", {}),
+        "sources": research_data.get("sources", {}),
+        "created_at": research_data.get("created_at", datetime.utcnow())
+    }
+    result = await research_collection.insert_one(research_doc)
+    await increment_activity(user_id, "research")
+    return str(result.inserted_id)
+
+async def get_user_research_history(user_id: str, limit: int = 10) -> list:
+    return await research_collection.find(
+        {"user_id": ObjectId(user_id)},
+        {"papers": 0}  # exclude papers for list view
+    ).sort("created_at", -1).limit(limit).to_list(length=limit)
+
+async def get_research_by_id(user_id: str, research_id: str) -> dict:
+    return await research_collection.find_one({
+        "_id": ObjectId(research_id),
+        "user_id": ObjectId(user_id)
+    })
+
+async def get_research_count(user_id: str) -> int:
+    return await research_collection.count_documents({"user_id": ObjectId(user_id)})
+
+# =====================
+# Ideas
+# =====================
+async def save_idea(user_id: str, idea_doc: dict) -> str:
+    idea_doc["user_id"] = ObjectId(user_id)
+    result = await ideas_collection.insert_one(idea_doc)
+    await increment_activity(user_id, "ideas")
+    return str(result.inserted_id)
+
+# =====================
+# Activity Summary
+# =====================
+# Counters documents as described in database.py
+async def increment_activity(user_id, counter: str, amount: int = 1):
+    await activity_collection.update_one(
+        {"_id": _activity_id(user_id)},
+        {"$inc": {counter: amount}, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+async def mark_profile_exists(user_id):
+    await activity_collection.update_one(
+        {"_id": _activity_id(user_id)},
+        {"$set": {"profile_exists": True, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+ACTIVITY_COUNTERS = {"ideas": ideas_collection, "roadmaps": roadmaps_collection, "research": research_collection}
+
+async def _count_by_user(collection, ids=None) -> dict:
+    return _merge_counts(await collection.aggregate(_count_pipeline(ids), allowDiskUse=True).to_list(None))
+
+async def reconcile_activity_counters(user_ids=None) -> dict:
+    """Async reconcile_activity_counters; cancelling it stops the recount"""
+    ids = None if user_ids is None else [_activity_id(user_id) for user_id in user_ids]
+    existing = {
+        doc["_id"]: doc
+        async for doc in activity_collection.find({} if ids is None else {"_id": {"$in": ids}})
+    }
+    counts = {name: await _count_by_user(collection, ids) for name, collection in ACTIVITY_COUNTERS.items()}
+    profiles = set(await profiles_collection.distinct("user_id", {} if ids is None else {"user_id": {"$in": ids}}))
+
+    operations, drifted = _reconcile_operations(ids, existing, counts, profiles)
+    applied = 0
+    for start in range(0, len(operations), 1000):
+        try:
+            result = await activity_collection.bulk_write(operations[start:start + 1000], ordered=False)
+            applied += result.matched_count + result.upserted_count
+        except errors.BulkWriteError as e:
+            applied += _applied_despite(e)
+    return {"users": len(operations), "drifted": drifted, "skipped": len(operations) - applied}
+
+async def next_user_ids(after: Optional[ObjectId], limit: int) -> List[ObjectId]:
+    """The next `limit` user ids after `after`, in _id order"""
+    query = {} if after is None else {"_id": {"$gt": after}}
+    cursor = users_collection.find(query, {"_id": 1}).sort("_id", 1).limit(limit)
+    return [doc["_id"] async for doc in cursor]
+
+async def get_user_activity(user_id: str) -> dict:
+    counters = await activity_collection.find_one({"_id": _activity_id(user_id)})
+    if not counters or "reconciled_at" not in counters:
+        # first read for this user: seed the counters from a recount
+        await reconcile_activity_counters([user_id])
+        counters = await activity_collection.find_one({"_id": _activity_id(user_id)}) or {}
+    return activity_summary(counters)
+
+# =====================
+# Developer dashboard
+# =====================
+DASHBOARD_IDEAS_PER_USER = 10
+DASHBOARD_PROFILE_FIELDS = ("skills", "interests", "experience", "availability", "location", "updated_at")
+
+def dashboard_users_pipeline(
+    exclude_emails: List[str],
+    limit: int,
+    after: Optional[ObjectId] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    skills: Optional[List[str]] = None,
+    interests: Optional[List[str]] = None,
+    location: Optional[str] = None,
+) -> list:
+    """One page of users joined with their profile and latest ideas, in _id order.
+
+    Keyset pagination: pass the last _id of the previous page as `after`.
+    Profile filters (all listed skills/interests, location substring) run
+    after the profile join; the ideas join only runs for the final page.
+    Both joins are localField/foreignField lookups, which use the
+    profiles.user_id and ideas (user_id, created_at) indexes on every
+    server version; let/pipeline lookups with $expr only use indexes from
+    MongoDB 5.0. Without $sortArray (5.2), a user's ideas are ordered by
+    unwinding them and grouping them back, which only touches this page.
+    Uses only stages and operators available in MongoDB 3.6.
+    """
+    user_match = {"email": {"$nin": exclude_emails}}
+    if after is not None:
+        user_match["_id"] = {"$gt": after}
+    if created_from or created_to:
+        user_match["created_at"] = {}
+        if created_from:
+            user_match["created_at"]["$gte"] = created_from
+        if created_to:
+            user_match["created_at"]["$lt"] = created_to
+
+    profile_match = {}
+    if skills:
+        profile_match["profile.skills"] = {"$all": skills}
+    if interests:
+        profile_match["profile.interests"] = {"$all": interests}
+    if location:
+        profile_match["profile.location"] = {"$regex": re.escape(location), "$options": "i"}
+
+    pipeline = [
+        {"$match": user_match},
+        {"$sort": {"_id": 1}},
+        {"$project": {"name": 1, "email": 1, "created_at": 1}},
+        {"$lookup": {"from": "profiles", "localField": "_id", "foreignField": "user_id", "as": "profile"}},
+        {"$addFields": {"profile": {"$let": {
+            "vars": {"p": {"$ifNull": [{"$arrayElemAt": ["$profile", 0]}, {}]}},
+            "in": {field: f"$$p.{field}" for field in DASHBOARD_PROFILE_FIELDS},
+        }}}},
+    ]
+    if profile_match:
+        pipeline.append({"$match": profile_match})
+    pipeline += [
+        {"$limit": limit},
+        {"$lookup": {"from": "ideas", "localField": "_id", "foreignField": "user_id", "as": "validations"}},
+        {"$unwind": {"path": "$validations", "preserveNullAndEmptyArrays": True}},
+        {"$sort": {"_id": 1, "validations.created_at": -1}},
+        {"$group": {
+            "_id": "$_id",
+            "name": {"$first": "$name"},
+            "email": {"$first": "$email"},
+            "created_at": {"$first": "$created_at"},
+            "profile": {"$first": "$profile"},
+            "validations": {"$push": "$validations"},  # users without ideas push nothing
+        }},
+        {"$sort": {"_id": 1}},
+        {"$addFields": {
+            "validation_count": {"$size": "$validations"},
+            "validations": {"$map": {
+                "input": {"$slice": ["$validations", DASHBOARD_IDEAS_PER_USER]},
+                "as": "idea",
+                "in": {"prompt": "$$idea.prompt", "validation": "$$idea.validation", "created_at": "$$idea.created_at"},
+            }},
+        }},
+    ]
+    return pipeline
+
+def iter_dashboard_users(limit: int, **filters):
+    """Async cursor over one dashboard page (see dashboard_users_pipeline)"""
+    return users_collection.aggregate(dashboard_users_pipeline(limit=limit, **filters), batchSize=min(limit, 200))
+
+# =====================
+# Paper corpus
+# =====================
+async def upsert_papers(papers: list) -> int:
+    if not papers:
+        return 0
+    now = datetime.utcnow()
+    operations = []
+    for paper in papers:
+        fields = {field: paper.get(field) for field in PAPER_FIELDS}
+        fields["updated_at"] = now
+        operations.append(UpdateOne(
+            {"key": paper_key(paper)},
+            {"$set": fields, "$setOnInsert": {"created_at": now}},
+            upsert=True
+        ))
+    result = await papers_collection.bulk_write(operations, ordered=False)
+    return result.upserted_count + result.modified_count
+
+async def search_papers(search_terms: list, limit: int = 15, min_score: float = 0.0) -> list:
+    """Full-text search over stored titles and abstracts, best matches first"""
+    query = " ".join(search_terms)
+    if not query.strip():
+        return []
+    projection = {field: 1 for field in PAPER_FIELDS}
+    projection.update({"_id": 0, "score": {"$meta": "textScore"}})
+    cursor = papers_collection.find(
+        {"$text": {"$search": query}},
+        projection
+    ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+    return [paper async for paper in cursor if paper["score"] >= min_score]
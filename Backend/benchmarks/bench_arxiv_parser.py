@@ -0,0 +1,86 @@
+"""Compare the full-tree and incremental arXiv Atom parsers on large synthetic feeds.
+
+Usage: python benchmarks/bench_arxiv_parser.py [--entries 2000] [--max-results 20]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arxiv_parser import parse_feed_incremental, parse_feed_tree  # noqa: E402
+
+ENTRY_TEMPLATE = """  <entry>
+    <id>http://arxiv.org/abs/2401.{n:05d}v1</id>
+    <published>2024-01-{day:02d}T12:00:00Z</published>
+    <title>Synthetic paper {n} on precision agriculture
+      and machine learning</title>
+    <summary>{summary}</summary>
+    <author><name>Author A{n}</name></author>
+    <author><name>Author B{n}</name></author>
+    <author><name>Author C{n}</name></author>
+    <arxiv:doi>10.1000/synthetic.{n}</arxiv:doi>
+    <link href="http://arxiv.org/abs/2401.{n:05d}v1" rel="alternate" type="text/html"/>
+    <category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+"""
+
+
+def build_feed(entries: int) -> str:
+    summary = "Crop yield prediction with deep networks. " * 30
+    body = "".join(
+        ENTRY_TEMPLATE.format(n=n, day=n % 28 + 1, summary=summary) for n in range(entries)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">\n'
+        "  <title>arXiv Query</title>\n"
+        f"{body}</feed>\n"
+    )
+
+
+def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def measure(label, fn, repeat):
+    fn()  # warm up
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<28} {elapsed * 1000:9.2f} ms  peak {peak / 1024:9.1f} KiB  entries {len(result)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--max-results", type=int, default=20)
+    parser.add_argument("--chunk-size", type=int, default=16384)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    feed = build_feed(args.entries)
+    feed_bytes = feed.encode("utf-8")
+    print(f"Feed: {args.entries} entries, {len(feed_bytes) / 1024:.0f} KiB, chunk {args.chunk_size} B")
+
+    for limit in (args.max_results, args.entries):
+        print(f"\nmax_results={limit}")
+        measure("full tree (ET.fromstring)", lambda: parse_feed_tree(feed, limit), args.repeat)
+        measure(
+            "incremental (pull parser)",
+            lambda: parse_feed_incremental(chunked(feed_bytes, args.chunk_size), limit),
+            args.repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
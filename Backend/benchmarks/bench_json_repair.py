@@ -0,0 +1,211 @@
+"""Benchmark the validation fallback parser on malformed model completions.
+
+The corpus starts from well-formed completions in the format the
+validation system prompt asks for and breaks each one in the ways model output
+commonly breaks: prose and ``` fences around the JSON, trailing commas,
+unescaped quotes inside strings, single-quoted keys, raw newlines in
+strings, and output truncated at random points. Reports time per
+completion and the share of the 16 result fields recovered with their
+true value, for the old regex fallback and the single-pass repair parser.
+
+Usage: python benchmarks/bench_json_repair.py [--count 2000]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from validation_parser import VALIDATION_SCORE_FIELDS, parse_fallback_response  # noqa: E402
+
+SENTENCES = [
+    "Small farms lack affordable yield forecasting",
+    "Sensor hardware costs fall every year",
+    "Competitors like \"FarmLogs\" focus on large growers",
+    "Regulation varies by region, which slows expansion",
+    "Strong network effects once cooperatives adopt it",
+    "Data quality from cheap sensors is a real risk",
+    "The team needs agronomy expertise",
+    "Pricing must fit seasonal cash flow",
+]
+
+
+def make_completion(rng):
+    def text(count):
+        return ". ".join(rng.sample(SENTENCES, count)) + "."
+
+    return {
+        "overall_score": rng.randint(40, 95),
+        "scores": {name: rng.randint(30, 95) for name in VALIDATION_SCORE_FIELDS},
+        "analysis": {
+            "verdict": text(2),
+            "feasibility": text(2),
+            "market_demand": text(2),
+            "uniqueness": text(1),
+            "strength": text(2),
+            "risk_factors": text(2),
+            "existing_competitors": text(1),
+        },
+        "suggestions": {
+            "critical": [text(1) for _ in range(3)],
+            "recommended": [text(1) for _ in range(3)],
+            "optional": [text(1) for _ in range(2)],
+        },
+    }
+
+
+def fenced(raw, rng):
+    return "Here is the analysis you requested:\n```json\n" + raw + "\n```\nLet me know if you need more."
+
+
+def trailing_commas(raw, rng):
+    return re.sub(r"(\]|\}|\d|\")(\n\s*[\]\}])", r"\1,\2", raw)
+
+
+def unescaped_quotes(raw, rng):
+    return raw.replace('\\"', '"')
+
+
+def single_quoted_keys(raw, rng):
+    return re.sub(r'"(\w+)":', r"'\1':", raw)
+
+
+def raw_newlines(raw, rng):
+    return raw.replace(". ", ".\n")
+
+
+def truncated(raw, rng):
+    return raw[:rng.randint(len(raw) // 3, len(raw) - 1)]
+
+
+MUTATIONS = [fenced, trailing_commas, unescaped_quotes, single_quoted_keys, raw_newlines, truncated]
+
+
+def build_corpus(count, seed=7):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        truth = make_completion(rng)
+        raw = json.dumps(truth, indent=2)
+        applied = rng.sample(MUTATIONS, rng.randint(1, 3))
+        for mutation in applied:
+            raw = mutation(raw, rng)
+        corpus.append((raw, truth, [mutation.__name__ for mutation in applied]))
+    return corpus
+
+
+# --- the regex fallback this parser replaced, kept for comparison ---
+
+def legacy_extract_score(text, pattern):
+    match = re.search(pattern, text, re.IGNORECASE)
+    if match:
+        return min(100, max(0, int(match.group(1))))
+    return 70
+
+
+def legacy_extract_section(text, pattern, default):
+    match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+    if match:
+        return match.group(1).strip()[:500]
+    return default
+
+
+def legacy_extract_suggestions(text, category) -> List[str]:
+    match = re.search(rf"{category}[\"']?\s*:\s*\[(.*?)\]", text, re.IGNORECASE | re.DOTALL)
+    if match:
+        return re.findall(r'["\']([^"\']+)["\']', match.group(1))[:5]
+    suggestions = []
+    in_category = False
+    for line in text.split('\n'):
+        if category.lower() in line.lower():
+            in_category = True
+            continue
+        if in_category:
+            if line.strip().startswith(('-', '•', '*')) or re.match(r'^\d+\.', line.strip()):
+                suggestion = re.sub(r'^[-•*\d\.\s]+', '', line.strip())
+                if suggestion:
+                    suggestions.append(suggestion[:100])
+            elif line.strip() and not line.startswith(' '):
+                break
+    return suggestions[:5] if suggestions else [f"No specific {category} suggestions identified"]
+
+
+def legacy_parse(text):
+    section = r"[\"']?\s*:\s*[\"'](.*?)[\"']"
+    return {
+        "overall_score": legacy_extract_score(text, r"overall[_\s]*score[\"']?\s*:\s*(\d+)"),
+        "scores": {
+            "feasibility": legacy_extract_score(text, r"feasibility[\"']?\s*:\s*(\d+)"),
+            "market_demand": legacy_extract_score(text, r"market[_\s]*demand[\"']?\s*:\s*(\d+)"),
+            "uniqueness": legacy_extract_score(text, r"uniqueness[\"']?\s*:\s*(\d+)"),
+            "strength": legacy_extract_score(text, r"strength[\"']?\s*:\s*(\d+)"),
+            "risk_factors": legacy_extract_score(text, r"risk[_\s]*factors[\"']?\s*:\s*(\d+)"),
+        },
+        "analysis": {
+            "verdict": legacy_extract_section(text, r"verdict" + section, ""),
+            "feasibility": legacy_extract_section(text, r"feasibility" + section, ""),
+            "market_demand": legacy_extract_section(text, r"market[_\s]*demand" + section, ""),
+            "uniqueness": legacy_extract_section(text, r"uniqueness" + section, ""),
+            "strength": legacy_extract_section(text, r"strength" + section, ""),
+            "risk_factors": legacy_extract_section(text, r"risk[_\s]*factors" + section, ""),
+            "existing_competitors": legacy_extract_section(text, r"competitors" + section, ""),
+        },
+        "suggestions": {
+            category: legacy_extract_suggestions(text, category)
+            for category in ("critical", "recommended", "optional")
+        },
+    }
+
+
+def recovered_fields(result, truth):
+    """Fields whose parsed value equals the original (16 per completion)"""
+    hits = int(result["overall_score"] == truth["overall_score"])
+    hits += sum(result["scores"][name] == truth["scores"][name] for name in VALIDATION_SCORE_FIELDS)
+    hits += sum(
+        " ".join(result["analysis"][name].split()) == " ".join(value.split())
+        for name, value in truth["analysis"].items()
+    )
+    hits += sum(
+        [" ".join(item.split()) for item in result["suggestions"][name]] == [" ".join(item.split()) for item in value]
+        for name, value in truth["suggestions"].items()
+    )
+    return hits
+
+
+def run(name, parser, corpus):
+    start = time.perf_counter()
+    results = [parser(raw) for raw, _, _ in corpus]
+    elapsed = time.perf_counter() - start
+    hits = sum(recovered_fields(result, truth) for result, (_, truth, _) in zip(results, corpus))
+    print(f"  {name:<22} {elapsed / len(corpus) * 1e6:8.1f} us/completion   fields recovered {hits / (16 * len(corpus)):6.1%}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.count)
+    average = sum(len(raw) for raw, _, _ in corpus) / len(corpus)
+    print(f"{len(corpus)} malformed completions, {average:.0f} chars on average")
+    run("legacy regex fallback", legacy_parse, corpus)
+    repaired = run("single-pass repair", parse_fallback_response, corpus)
+
+    print("\nRepair parser by mutation (truncated completions counted only under truncated)")
+    for mutation in MUTATIONS:
+        rows = [
+            (result, truth) for result, (_, truth, applied) in zip(repaired, corpus)
+            if mutation.__name__ in applied and (mutation is truncated or "truncated" not in applied)
+        ]
+        hits = sum(recovered_fields(result, truth) for result, truth in rows)
+        print(f"  {mutation.__name__:<22} {hits / (16 * max(len(rows), 1)):6.1%}  ({len(rows)} completions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Benchmark local search-term extraction and compare it with LLM-generated terms.
+
+Times the RAKE + domain-vocabulary extractor against the old stop-word
+filter on a corpus of startup ideas. With --llm (needs GROQ_API_KEY) the
+ideas are also sent through the original Groq search-term prompt and the
+answers are saved to --reference; a saved reference file is reused on
+later runs so the recall comparison needs no network access.
+
+Recall is measured on stemmed content words: the share of LLM-term words
+that also appear in the local terms (word recall), and the share of LLM
+terms with at least one word in common with the local terms (term hits).
+
+Usage: python benchmarks/bench_keywords.py [--llm] [--reference benchmarks/keyword_reference.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_extractor import STOP_WORDS, extract_keywords, stem  # noqa: E402
+
+IDEAS = [
+    "An AI-powered app that helps small farmers predict crop yields using soil sensors and satellite imagery.",
+    "A mobile platform connecting patients with mental health therapists through video sessions and mood tracking.",
+    "Blockchain-based supply chain tracking for fair-trade coffee from farm to cup.",
+    "A tutoring marketplace where university students teach high school students coding, with AI-generated practice problems.",
+    "Peer-to-peer electric vehicle charger sharing for apartment residents without garages.",
+    "Computer vision system that detects defects on factory assembly lines in real time.",
+    "A chatbot that answers tenant questions and files maintenance requests for property managers.",
+    "Wearable device for elderly people that detects falls and alerts family members.",
+    "Personalized nutrition plans generated from continuous glucose monitor data.",
+    "Drone delivery of medical supplies to rural clinics in low-income countries.",
+    "Fraud detection for small online shops using transaction graphs and machine learning.",
+    "Marketplace for renting unused restaurant kitchens to food startups at night.",
+    "Smart irrigation controller that uses weather forecasts to cut water usage on farms.",
+    "Language learning app that pairs learners with native speakers for short voice conversations.",
+    "Carbon footprint tracker for households that links to utility bills and suggests reductions.",
+    "Recruitment tool that matches junior developers to open-source projects based on skills.",
+    "Sign language translation glasses for deaf users using on-device neural networks.",
+    "Inventory forecasting for independent pharmacies to reduce expired stock.",
+    "A platform that recommends personalized workout routines from wearable fitness data.",
+    "Recycling kiosk that identifies plastic types with image recognition and pays users per item.",
+    "Credit scoring for gig workers using alternative data such as rideshare earnings.",
+    "Telemedicine service for livestock farmers to consult veterinarians remotely.",
+    "Social media sentiment analysis for local political campaigns.",
+    "Solar panel cleaning robots for desert solar farms.",
+    "Cybersecurity awareness training game for employees of small businesses.",
+    "Traffic prediction app for delivery drivers in congested cities.",
+    "Accessibility checker that audits websites for screen reader compatibility.",
+    "Home energy management system that schedules appliances when renewable energy is cheap.",
+    "Early dyslexia screening for children using eye tracking on tablets.",
+    "Matching surplus food from supermarkets with food banks in real time.",
+]
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def legacy_fallback_terms(idea):
+    """The stop-word filter generate_search_terms fell back to before the local extractor"""
+    words = re.findall(r'\b\w{3,}\b', idea.lower())
+    stop_words = {'the', 'and', 'for', 'with', 'that', 'this', 'your', 'have', 'from'}
+    filtered_words = [word for word in words if word not in stop_words]
+    domain_terms = []
+    idea_lower = idea.lower()
+    if any(term in idea_lower for term in ['ai', 'artificial', 'machine learning', 'ml']):
+        domain_terms.extend(['artificial intelligence', 'machine learning', 'neural networks'])
+    if any(term in idea_lower for term in ['agriculture', 'farming', 'crop', 'soil']):
+        domain_terms.extend(['agriculture', 'precision farming', 'crop yield'])
+    if any(term in idea_lower for term in ['health', 'medical', 'patient', 'diagnosis']):
+        domain_terms.extend(['healthcare', 'medical technology', 'clinical'])
+    return (domain_terms + filtered_words)[:5]
+
+
+def content_words(terms):
+    return {stem(word) for term in terms for word in _WORD_RE.findall(term.lower()) if word not in STOP_WORDS}
+
+
+def time_per_call(extractor, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for idea in IDEAS:
+            extractor(idea)
+    return (time.perf_counter() - start) / (repeat * len(IDEAS))
+
+
+async def fetch_llm_terms():
+    from groq_client import chat_completion, GroqError
+
+    reference = {}
+    for idea in IDEAS:
+        prompt = f"""
+    Extract 3-5 precise technical and academic search terms from this startup idea: {idea}
+    Focus on terms that would be effective for searching academic databases like Semantic Scholar, arXiv, and CrossRef.
+    Return ONLY the terms separated by commas, no explanations or extra text.
+    """
+        messages = [
+            {"role": "system", "content": "You are an expert research assistant. Extract precise academic search terms that would return highly relevant research papers."},
+            {"role": "user", "content": prompt},
+        ]
+        try:
+            content = await chat_completion(messages, model="llama3-8b-8192", temperature=0.1, max_tokens=50, timeout=15)
+        except GroqError as e:
+            print(f"  skipped ({e.detail}): {idea[:50]}")
+            continue
+        reference[idea] = [term.strip().strip('"').strip("'") for term in content.split(",") if term.strip()][:5]
+    return reference
+
+
+def recall(extractor, reference):
+    word_hits = word_total = term_hits = term_total = 0
+    for idea, llm_terms in reference.items():
+        local = content_words(extractor(idea))
+        for term in llm_terms:
+            words = content_words([term])
+            if not words:
+                continue
+            word_hits += len(words & local)
+            word_total += len(words)
+            term_hits += bool(words & local)
+            term_total += 1
+    return word_hits / max(word_total, 1), term_hits / max(term_total, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--llm", action="store_true", help="fetch reference terms from Groq")
+    parser.add_argument(
+        "--reference",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "keyword_reference.json"),
+    )
+    args = parser.parse_args()
+
+    extractors = {"legacy stop-word filter": legacy_fallback_terms, "rake + vocabulary": extract_keywords}
+
+    print(f"{len(IDEAS)} ideas, {args.repeat} repeats")
+    for name, extractor in extractors.items():
+        print(f"  {name:<24} {time_per_call(extractor, args.repeat) * 1e6:8.1f} us/idea")
+
+    reference = None
+    if args.llm:
+        start = time.perf_counter()
+        reference = asyncio.run(fetch_llm_terms())
+        print(f"  {'groq round trip':<24} {(time.perf_counter() - start) / max(len(reference), 1) * 1e6:8.1f} us/idea")
+        with open(args.reference, "w", encoding="utf-8") as handle:
+            json.dump(reference, handle, indent=2)
+    elif os.path.exists(args.reference):
+        with open(args.reference, encoding="utf-8") as handle:
+            reference = json.load(handle)
+
+    if not reference:
+        print("\nNo LLM reference terms; run with --llm and GROQ_API_KEY set for the recall comparison.")
+        for idea in IDEAS[:5]:
+            print(f"  {idea[:60]:<60} -> {extract_keywords(idea)}")
+        return
+
+    print(f"\nRecall against LLM terms ({len(reference)} ideas)")
+    for name, extractor in extractors.items():
+        word_recall, term_hits = recall(extractor, reference)
+        print(f"  {name:<24} word recall {word_recall:6.1%}   term hits {term_hits:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
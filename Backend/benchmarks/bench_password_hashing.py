@@ -0,0 +1,107 @@
+"""Benchmark bcrypt login throughput and its effect on other sync endpoints.
+
+1. Logins per second per core: single-threaded bcrypt verifications at
+   each cost in --rounds.
+2. Pool throughput: a storm of concurrent verifications through
+   PasswordHasher with 1..N worker threads (bcrypt releases the GIL, so
+   throughput should scale with cores up to os.cpu_count()).
+3. Starvation: latency of a trivial sync endpoint (run on Starlette's
+   shared threadpool, as FastAPI does for `def` handlers) while a login
+   storm runs on that same threadpool, as the old sync /login did,
+   versus on the dedicated hashing pool.
+
+Usage: python benchmarks/bench_password_hashing.py [--rounds 10,12] [--storm 200]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from anyio import to_thread  # noqa: E402
+
+from password_hasher import PasswordHasher, hash_password_sync, verify_password_sync  # noqa: E402
+
+
+def single_thread_rate(rounds: int, seconds: float = 2.0) -> float:
+    hashed = hash_password_sync("correct horse battery staple", rounds)
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        verify_password_sync("correct horse battery staple", hashed)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+async def pool_rate(workers: int, rounds: int, storm: int) -> float:
+    hasher = PasswordHasher(workers=workers, max_pending=storm, rounds=rounds)
+    hashed = hash_password_sync("pw", rounds)
+    start = time.perf_counter()
+    await asyncio.gather(*(hasher.verify("pw", hashed) for _ in range(storm)))
+    elapsed = time.perf_counter() - start
+    hasher.shutdown()
+    return storm / elapsed
+
+
+async def probe_latency(storm_task, probes: int = 40) -> list:
+    """Latency of a no-op sync handler on Starlette's threadpool while storm_task runs"""
+    latencies = []
+    await asyncio.sleep(0.05)
+    for _ in range(probes):
+        if storm_task.done():
+            break
+        start = time.perf_counter()
+        await to_thread.run_sync(lambda: None)
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.02)
+    await storm_task
+    return latencies
+
+
+async def starvation(rounds: int, storm: int):
+    hashed = hash_password_sync("pw", rounds)
+
+    async def old_storm():
+        # the sync /login: bcrypt on the same 40-thread limiter as every other def endpoint
+        await asyncio.gather(*(to_thread.run_sync(verify_password_sync, "pw", hashed) for _ in range(storm)))
+
+    hasher = PasswordHasher(max_pending=storm, rounds=rounds)
+
+    async def new_storm():
+        await asyncio.gather(*(hasher.verify("pw", hashed) for _ in range(storm)))
+
+    for label, storm_fn in (("shared threadpool (old)", old_storm), ("dedicated pool (new)", new_storm)):
+        latencies = await probe_latency(asyncio.create_task(storm_fn()))
+        if latencies:
+            ordered = sorted(latencies)
+            print(f"  {label:<24} sync endpoint p50 {statistics.median(ordered):8.1f} ms  "
+                  f"p95 {ordered[int(len(ordered) * 0.95) - 1]:8.1f} ms  ({len(ordered)} probes)")
+    hasher.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", default="10,11,12")
+    parser.add_argument("--storm", type=int, default=100)
+    args = parser.parse_args()
+    rounds = [int(value) for value in args.rounds.split(",")]
+    cores = os.cpu_count() or 1
+
+    print(f"Single-threaded verification ({cores} cores available)")
+    for cost in rounds:
+        print(f"  cost {cost:2d}: {single_thread_rate(cost):7.1f} logins/s/core")
+
+    cost = rounds[0]
+    print(f"\nPool throughput, {args.storm} concurrent logins at cost {cost}")
+    for workers in sorted({1, 2, cores, cores * 2}):
+        rate = asyncio.run(pool_rate(workers, cost, args.storm))
+        print(f"  {workers:2d} workers: {rate:7.1f} logins/s  ({rate / min(workers, cores):6.1f} per busy core)")
+
+    print(f"\nNo-op sync endpoint latency during a {args.storm}-login storm at cost {cost}")
+    asyncio.run(starvation(cost, args.storm))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Measure what the principal cache saves on authenticated requests.
+
+Calls an authenticated endpoint that does no work of its own
+(GET /debug/source-health) in-process, so the latency is the auth
+dependency plus framework overhead, in three modes:
+
+  lookup   PRINCIPAL_CACHE_TTL_SECONDS=0: users find_one on every request
+  cache    principal cache hits
+  claims   AUTH_TRUST_TOKEN_CLAIMS: no user load at all
+
+Needs MongoDB (MONGO_URI/MONGO_DB); a temporary user is inserted and
+removed. Without a database, --simulated-db-ms replaces the user lookup
+with a sleep of that length.
+
+Usage: python benchmarks/bench_principal_cache.py [--requests 2000] [--concurrency 10]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("HTTP_WARMUP_ENABLED", "false")
+os.environ.setdefault("JOB_WORKERS", "0")
+os.environ.setdefault("MONGO_URI", "mongodb://127.0.0.1:27017/?serverSelectionTimeoutMS=500")
+os.environ.setdefault("MONGO_DB", "startup_gps_bench")
+
+import httpx  # noqa: E402
+
+import database  # noqa: E402
+import main  # noqa: E402
+
+
+async def measure(client, headers, requests, concurrency):
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get("/debug/source-health", headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+def report(label, latencies, elapsed):
+    ordered = sorted(latencies)
+    print(f"  {label:<8} p50 {statistics.median(ordered):7.2f} ms  p95 {ordered[int(len(ordered) * 0.95) - 1]:7.2f} ms  "
+          f"{len(ordered) / elapsed:8.1f} req/s")
+    return statistics.median(ordered)
+
+
+async def run(args):
+    user_id = None
+    if args.simulated_db_ms is not None:
+        async def simulated_lookup(requested_id):
+            await asyncio.sleep(args.simulated_db_ms / 1000)
+            return {"_id": main.ObjectId(requested_id), "email": "bench@example.com"}
+
+        main.get_user_by_id = simulated_lookup
+        user_id = main.ObjectId()
+        print(f"Simulated user lookup: {args.simulated_db_ms} ms")
+    else:
+        try:
+            user_id = database.users_collection.insert_one({
+                "name": "Principal cache bench",
+                "email": f"bench-{time.time_ns()}@example.com",
+                "password_hash": "x",
+                "created_at": datetime.utcnow(),
+            }).inserted_id
+        except Exception as e:
+            raise SystemExit(f"MongoDB unavailable ({type(e).__name__}); rerun with --simulated-db-ms")
+
+    token = main.create_access_token_helper(str(user_id), email="bench@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=main.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"{args.requests} requests, concurrency {args.concurrency}")
+            medians = {}
+            for label, ttl, trust_claims in (("lookup", 0, False), ("cache", 60, False), ("claims", 60, True)):
+                main.PRINCIPAL_CACHE_TTL_SECONDS = ttl
+                main.AUTH_TRUST_TOKEN_CLAIMS = trust_claims
+                await measure(client, headers, 50, args.concurrency)  # warm up
+                medians[label] = report(label, *await measure(client, headers, args.requests, args.concurrency))
+            print(f"  saved per request (p50): cache {medians['lookup'] - medians['cache']:.2f} ms, "
+                  f"claims {medians['lookup'] - medians['claims']:.2f} ms")
+    finally:
+        if args.simulated_db_ms is None:
+            database.users_collection.delete_one({"_id": user_id})
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--simulated-db-ms", type=float, default=None)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,120 @@
+"""Benchmark concurrent roadmap reads: blocking pymongo vs the motor data layer.
+
+Seeds --roadmaps roadmaps for a throwaway user, then runs --concurrency
+readers that each call get_user_roadmaps and get_roadmap_by_id until
+--reads calls are done, in three modes:
+
+  sync       database.py called straight from coroutines (the old endpoints)
+  to_thread  database.py through asyncio.to_thread
+  motor      async_database.py awaited on the event loop
+
+Reports throughput, call latency and the worst event-loop stall seen by
+a 5 ms heartbeat, which is what every other request on the worker feels.
+Needs MongoDB (MONGO_URI/MONGO_DB); seeded documents are removed afterwards.
+
+Usage: python benchmarks/bench_roadmap_reads.py [--concurrency 50] [--reads 2000] [--roadmaps 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("MONGO_URI", "mongodb://127.0.0.1:27017/?serverSelectionTimeoutMS=500")
+os.environ.setdefault("MONGO_DB", "startup_gps_bench")
+
+import async_database  # noqa: E402
+import database  # noqa: E402
+
+ROADMAP_TEXT = "Overview:\nA bench roadmap.\n\n" + "\n\n".join(
+    f"Phase {n}: Step {n} - Do part {n}\nTasks:\n- Task a\n- Task b\nImplementation:\n- Build it" for n in range(1, 6)
+)
+
+
+async def heartbeat(stop: asyncio.Event, interval: float = 0.005) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run_mode(mode, user_id, roadmap_ids, concurrency, reads):
+    if mode == "sync":
+        async def list_roadmaps():
+            return database.get_user_roadmaps(user_id)
+
+        async def get_roadmap(roadmap_id):
+            return database.get_roadmap_by_id(roadmap_id)
+    elif mode == "to_thread":
+        async def list_roadmaps():
+            return await asyncio.to_thread(database.get_user_roadmaps, user_id)
+
+        async def get_roadmap(roadmap_id):
+            return await asyncio.to_thread(database.get_roadmap_by_id, roadmap_id)
+    else:
+        async def list_roadmaps():
+            return await async_database.get_user_roadmaps(user_id)
+
+        async def get_roadmap(roadmap_id):
+            return await async_database.get_roadmap_by_id(roadmap_id)
+
+    latencies = []
+    remaining = iter(range(reads))
+
+    async def reader():
+        for index in remaining:
+            start = time.perf_counter()
+            if index % 2:
+                await get_roadmap(roadmap_ids[index % len(roadmap_ids)])
+            else:
+                await list_roadmaps()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(reader() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worst_stall = await beat
+
+    ordered = sorted(latencies)
+    print(f"  {mode:<10} {len(ordered) / elapsed:8.1f} reads/s  p50 {statistics.median(ordered):7.2f} ms  "
+          f"p95 {ordered[int(len(ordered) * 0.95) - 1]:7.2f} ms  worst loop stall {worst_stall * 1000:7.2f} ms")
+
+
+async def run(args):
+    user_id = f"bench-{time.time_ns()}"
+    try:
+        roadmap_ids = [
+            database.create_roadmap(user_id, {"prompt": f"bench {n}", "timeframe": "6 months", "roadmap": ROADMAP_TEXT})
+            for n in range(args.roadmaps)
+        ]
+    except Exception as e:
+        raise SystemExit(f"MongoDB unavailable ({type(e).__name__}); set MONGO_URI/MONGO_DB")
+
+    try:
+        print(f"{args.reads} reads, concurrency {args.concurrency}, {args.roadmaps} roadmaps per user, "
+              f"async pool {async_database.client.options.pool_options.max_pool_size}")
+        for mode in ("sync", "to_thread", "motor"):
+            await run_mode(mode, user_id, roadmap_ids, args.concurrency, 50)  # warm up the pools
+            await run_mode(mode, user_id, roadmap_ids, args.concurrency, args.reads)
+    finally:
+        database.roadmaps_collection.delete_many({"user_id": user_id})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--roadmaps", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
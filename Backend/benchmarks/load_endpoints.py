@@ -0,0 +1,212 @@
+"""End-to-end load test of the backend against the mock upstreams.
+
+Starts benchmarks/mock_upstreams.py in-process and the API under uvicorn
+in a subprocess whose GROQ/Semantic Scholar/arXiv/CrossRef URLs point at
+the mock, then drives each endpoint with --concurrency closed-loop
+clients for --duration seconds and reports throughput and p50/p95/p99
+latency. Every request uses a fresh idea so the caches miss (--cached
+repeats one idea to measure the cache path instead).
+
+Authenticated endpoints need MongoDB (MONGO_URI/MONGO_DB) for a load-test
+user; without it only /health and /validate-idea are run. The source rate
+limiters are opened up in the API process so the numbers show the
+backend, not the politeness limits; --keep-rate-limits leaves them as configured.
+
+Usage:
+    python benchmarks/load_endpoints.py [--endpoints health,validate,research,roadmap]
+        [--concurrency 20] [--duration 15] [--set groq.latency=fixed:300]
+        [--target http://127.0.0.1:8000]   # an API already running against a mock
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_upstreams import MockUpstreams, backend_env, start_in_thread  # noqa: E402
+
+TOPICS = [
+    "an app that helps small farmers predict crop yields from soil sensors",
+    "a marketplace matching patients with mental health therapists over video",
+    "fraud detection for small online shops using transaction graphs",
+    "drone delivery of medical supplies to rural clinics",
+    "smart irrigation that uses weather forecasts to cut water usage",
+    "a language learning app pairing learners with native speakers",
+]
+
+_counter = itertools.count()
+
+
+def idea(cached: bool) -> str:
+    if cached:
+        return TOPICS[0]
+    number = next(_counter)
+    return f"{TOPICS[number % len(TOPICS)]} (load test variant {number})"
+
+
+# name -> (method, path, body factory, needs auth)
+SCENARIOS = {
+    "health": ("GET", "/health", None, False),
+    "validate": ("POST", "/validate-idea", lambda cached: {"prompt": idea(cached)}, False),
+    "research": ("POST", "/research-papers", lambda cached: {"idea": idea(cached), "max_results": 15}, True),
+    "roadmap": ("POST", "/roadmaps", lambda cached: {"prompt": idea(cached), "timeframe": "6 months"}, True),
+    "roadmap_stream": ("POST", "/roadmaps/stream", lambda cached: {"prompt": idea(cached), "timeframe": "6 months"}, True),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_backend(mock_url: str, keep_rate_limits: bool):
+    port = free_port()
+    env = {
+        **os.environ,
+        **backend_env(mock_url),
+        "GROQ_API_KEY": os.getenv("GROQ_API_KEY", "load-test"),
+        "HTTP_WARMUP_ENABLED": "false",
+        "JOB_WORKERS": "0",
+    }
+    env.setdefault("MONGO_URI", "mongodb://127.0.0.1:27017/?serverSelectionTimeoutMS=500")
+    env.setdefault("MONGO_DB", "startup_gps_bench")
+    if not keep_rate_limits:
+        for prefix in ("SEMANTIC_SCHOLAR", "ARXIV", "CROSSREF"):
+            env[f"{prefix}_RATE_PER_SECOND"] = "100000"
+            env[f"{prefix}_BURST"] = "100000"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("API process exited during startup")
+        try:
+            httpx.get(url + "/health", timeout=1)
+            return process, url
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("API did not start within 30s")
+
+
+async def login(client: httpx.AsyncClient):
+    """Register and log in a throwaway user; None when the database is unavailable"""
+    email = f"load-{uuid.uuid4().hex[:10]}@example.com"
+    credentials = {"email": email, "password": "load-test-password"}
+    try:
+        await client.post("/register", json={**credentials, "name": "Load Test", "confirm_password": credentials["password"]})
+        response = await client.post("/login", json=credentials)
+    except httpx.HTTPError:
+        return None
+    if response.status_code != 200:
+        return None
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def run_scenario(client, name, headers, concurrency, duration, cached):
+    method, path, body, _ = SCENARIOS[name]
+    latencies, errors = [], {}
+    end = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < end:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body(cached) if body else None, headers=headers)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            if status != 200 and status != 201:
+                errors[status] = errors.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000 if ordered else 0.0
+
+
+def report(name, latencies, errors, elapsed):
+    ordered = sorted(latencies)
+    error_text = ", ".join(f"{status}x{count}" for status, count in errors.items()) or "-"
+    print(f"  {name:<15} {len(ordered):6d} {len(ordered) / elapsed:8.1f}/s  "
+          f"p50 {percentile(ordered, 0.5):8.1f}  p95 {percentile(ordered, 0.95):8.1f}  "
+          f"p99 {percentile(ordered, 0.99):8.1f} ms  errors {error_text}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", default="health,validate,research,roadmap")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--cached", action="store_true", help="repeat one idea instead of fresh ones")
+    parser.add_argument("--target", help="URL of an API already running against a mock")
+    parser.add_argument("--keep-rate-limits", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--set", action="append", default=[], metavar="UPSTREAM.FIELD=VALUE",
+                        help="mock upstream setting, e.g. groq.latency=lognormal:800:0.4")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown endpoints {unknown}; choose from {sorted(SCENARIOS)}")
+
+    mock = MockUpstreams(args.seed)
+    mock.configure(args.set)
+    process = None
+    if args.target:
+        target = args.target
+    else:
+        _, mock_url = start_in_thread(mock)
+        process, target = start_backend(mock_url, args.keep_rate_limits)
+
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+        async with httpx.AsyncClient(base_url=target, timeout=120, limits=limits) as client:
+            headers = await login(client)
+            if headers is None:
+                print("No database for a load-test user: running only unauthenticated endpoints")
+            print(f"{target}: concurrency {args.concurrency}, {args.duration:g}s per endpoint, "
+                  f"{'cached' if args.cached else 'fresh'} ideas")
+            print(f"  {'endpoint':<15} {'reqs':>6} {'throughput':>10}")
+            for name in names:
+                if SCENARIOS[name][3] and headers is None:
+                    print(f"  {name:<15} skipped (needs auth)")
+                    continue
+                latencies, errors, elapsed = await run_scenario(
+                    client, name, headers or {}, args.concurrency, args.duration, args.cached
+                )
+                report(name, latencies, errors, elapsed)
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    if not args.target:
+        print("\nMock upstream traffic")
+        for name, stats in mock.stats().items():
+            requests = stats["requests"]
+            average = stats["injected_latency_seconds"] / requests * 1000 if requests else 0.0
+            print(f"  {name:<17} {requests:6d} requests  {stats['errors']:5d} errors  avg injected {average:7.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
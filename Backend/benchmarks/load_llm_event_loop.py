@@ -0,0 +1,101 @@
+"""Check that slow LLM calls no longer stall other endpoints.
+
+Starts a local stand-in for the Groq chat-completions API that answers
+after --llm-delay seconds, then probes GET /health in two phases: idle,
+and with --concurrency /validate-idea calls in flight. With the async
+Groq client both phases should show the same /health latency.
+
+Usage: python benchmarks/load_llm_event_loop.py [--concurrency 20] [--llm-delay 2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+VALIDATION_JSON = json.dumps({
+    "overall_score": 80,
+    "scores": {"feasibility": 80, "market_demand": 75, "uniqueness": 70, "strength": 78, "risk_factors": 60},
+    "analysis": {key: "Synthetic analysis." for key in (
+        "verdict", "feasibility", "market_demand", "uniqueness", "strength", "risk_factors", "existing_competitors"
+    )},
+    "suggestions": {"critical": ["a"], "recommended": ["b"], "optional": ["c"]},
+})
+
+
+async def serve_fake_groq(delay: float):
+    async def handle(reader, writer):
+        headers = await reader.readuntil(b"\r\n\r\n")
+        length = 0
+        for line in headers.split(b"\r\n"):
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":", 1)[1])
+        await reader.readexactly(length)
+        await asyncio.sleep(delay)
+        body = json.dumps({"choices": [{"message": {"content": VALIDATION_JSON}}]}).encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+async def probe(client, duration: float, interval: float = 0.05):
+    latencies = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+def report(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<34} n={len(latencies):4d}  p50 {statistics.median(latencies):7.2f} ms  "
+          f"p95 {p95:7.2f} ms  max {latencies[-1]:7.2f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--llm-delay", type=float, default=2.0)
+    args = parser.parse_args()
+
+    server, port = await serve_fake_groq(args.llm_delay)
+    os.environ["GROQ_API_KEY"] = "load-test"
+    os.environ["GROQ_API_URL"] = f"http://127.0.0.1:{port}/openai/v1/chat/completions"
+    os.environ["HTTP_WARMUP_ENABLED"] = "false"
+    os.environ.setdefault("MONGO_URI", "mongodb://127.0.0.1:27017/?serverSelectionTimeoutMS=500")
+    os.environ.setdefault("MONGO_DB", "startup_gps_bench")
+
+    import httpx
+    import main as backend
+
+    transport = httpx.ASGITransport(app=backend.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        report("/health, idle", await probe(client, args.llm_delay))
+
+        prompts = [f"Load test idea number {i}: an app that matches farmers with buyers" for i in range(args.concurrency)]
+        llm_calls = [asyncio.create_task(client.post("/validate-idea", json={"prompt": p})) for p in prompts]
+        await asyncio.sleep(0.1)
+        report(f"/health, {args.concurrency} LLM calls in flight", await probe(client, args.llm_delay * 0.8))
+        responses = await asyncio.gather(*llm_calls)
+        ok = sum(response.status_code == 200 for response in responses)
+        print(f"/validate-idea: {ok}/{len(responses)} succeeded")
+
+    server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,403 @@
+"""Local stand-ins for the Groq, Semantic Scholar, arXiv and CrossRef APIs.
+
+Serves the endpoints main.py calls, with the response shapes it parses:
+
+    POST /openai/v1/chat/completions   Groq chat completions (JSON, or SSE with "stream": true)
+    GET  /graph/v1/paper/search        Semantic Scholar {"data": [...]}
+    GET  /api/query                    arXiv Atom XML feed
+    GET  /works                        CrossRef {"message": {"items": [...]}}
+
+Each upstream has its own latency distribution, error rate, error status
+and payload size, set with --set, MOCK_<UPSTREAM>_<FIELD> environment
+variables, or at runtime through POST /_mock/config. GET /_mock/stats
+returns request and error counts; GET /_mock/env prints the environment
+variables that point the backend here.
+
+Latency specs (milliseconds): fixed:200, uniform:100:400, normal:300:50,
+lognormal:300:0.6 (median, sigma).
+
+Usage:
+    python benchmarks/mock_upstreams.py [--port 8900] [--seed 7] \\
+        [--set groq.latency=lognormal:800:0.4] [--set crossref.error_rate=0.05]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List
+from xml.sax.saxutils import escape
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+UPSTREAMS = ("groq", "semantic_scholar", "arxiv", "crossref")
+
+PATHS = {
+    "groq": "/openai/v1/chat/completions",
+    "semantic_scholar": "/graph/v1/paper/search",
+    "arxiv": "/api/query",
+    "crossref": "/works",
+}
+
+# Backend environment variable holding each upstream's URL
+ENV_VARS = {
+    "groq": "GROQ_API_URL",
+    "semantic_scholar": "SEMANTIC_SCHOLAR_API_URL",
+    "arxiv": "ARXIV_API_URL",
+    "crossref": "CROSSREF_API_URL",
+}
+
+DEFAULTS = {
+    # items: papers per response (capped by the requested limit), or roadmap phases for Groq
+    # text_chars: abstract length, or words per roadmap task for Groq
+    "groq": {"latency": "lognormal:700:0.4", "error_rate": 0.0, "error_status": 429,
+             "items": 4, "text_chars": 12, "token_ms": 2.0},
+    "semantic_scholar": {"latency": "lognormal:350:0.5", "error_rate": 0.0, "error_status": 429,
+                         "items": 10, "text_chars": 900, "token_ms": 0.0},
+    "arxiv": {"latency": "lognormal:600:0.5", "error_rate": 0.0, "error_status": 503,
+              "items": 20, "text_chars": 1200, "token_ms": 0.0},
+    "crossref": {"latency": "lognormal:450:0.5", "error_rate": 0.0, "error_status": 503,
+                 "items": 20, "text_chars": 700, "token_ms": 0.0},
+}
+
+WORDS = (
+    "adaptive distributed learning network model framework analysis system data driven "
+    "scalable robust efficient optimization prediction detection platform sensor graph "
+    "federated privacy preserving real time inference evaluation benchmark dataset "
+    "recommendation forecasting simulation control hybrid neural probabilistic"
+).split()
+SURNAMES = ["Chen", "Garcia", "Kumar", "Smith", "Nguyen", "Okafor", "Rossi", "Tanaka", "Novak", "Silva"]
+GIVEN = ["A.", "Maria", "Wei", "John", "Priya", "Kwame", "Lena", "Hiro", "Sara", "Tomas"]
+
+
+def latency_sampler(spec: str) -> Callable[[random.Random], float]:
+    """Parse a latency spec into a function returning a delay in seconds"""
+    kind, *raw = spec.split(":")
+    args = [float(value) for value in raw]
+    if kind == "fixed" and len(args) == 1:
+        return lambda rng: args[0] / 1000
+    if kind == "uniform" and len(args) == 2:
+        return lambda rng: rng.uniform(args[0], args[1]) / 1000
+    if kind == "normal" and len(args) == 2:
+        return lambda rng: max(0.0, rng.gauss(args[0], args[1])) / 1000
+    if kind == "lognormal" and len(args) == 2:
+        return lambda rng: rng.lognormvariate(math.log(args[0]), args[1]) / 1000
+    raise ValueError(f"Bad latency spec {spec!r}; use fixed:MS, uniform:LO:HI, normal:MEAN:SD or lognormal:MEDIAN:SIGMA")
+
+
+class UpstreamConfig:
+    FIELDS = {"latency": str, "error_rate": float, "error_status": int, "items": int, "text_chars": int, "token_ms": float}
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stats = {"requests": 0, "errors": 0, "injected_latency_seconds": 0.0}
+        for field, value in DEFAULTS[name].items():
+            self.set(field, os.getenv(f"MOCK_{name.upper()}_{field.upper()}", value))
+
+    def set(self, field: str, value):
+        if field not in self.FIELDS:
+            raise ValueError(f"Unknown field {field!r} for {self.name}; expected one of {sorted(self.FIELDS)}")
+        value = self.FIELDS[field](value)
+        if field == "latency":
+            self.sample_latency = latency_sampler(value)
+        setattr(self, field, value)
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+class MockUpstreams:
+    def __init__(self, seed: int = 7):
+        self.rng = random.Random(seed)
+        self.configs: Dict[str, UpstreamConfig] = {name: UpstreamConfig(name) for name in UPSTREAMS}
+
+    def configure(self, assignments: List[str]):
+        """Apply "upstream.field=value" assignments; upstream "all" sets every upstream"""
+        for assignment in assignments:
+            target, _, value = assignment.partition("=")
+            name, _, field = target.partition(".")
+            for config in (self.configs.values() if name == "all" else [self.configs[name]]):
+                config.set(field, value)
+
+    async def delay(self, config: UpstreamConfig) -> bool:
+        """Sleep for one latency sample; True when this request should fail"""
+        config.stats["requests"] += 1
+        seconds = config.sample_latency(self.rng)
+        config.stats["injected_latency_seconds"] += seconds
+        await asyncio.sleep(seconds)
+        failed = self.rng.random() < config.error_rate
+        if failed:
+            config.stats["errors"] += 1
+        return failed
+
+    def error_response(self, config: UpstreamConfig) -> Response:
+        headers = {"Retry-After": "1"} if config.error_status == 429 else {}
+        return JSONResponse({"error": f"mock {config.name} failure"}, status_code=config.error_status, headers=headers)
+
+    # ---- synthetic content ----
+
+    def _sentence(self, query_words: List[str], chars: int) -> str:
+        words = []
+        while sum(len(word) + 1 for word in words) < chars:
+            words.append(self.rng.choice(query_words) if query_words and self.rng.random() < 0.3 else self.rng.choice(WORDS))
+        return " ".join(words).capitalize() + "."
+
+    def _title(self, query_words: List[str]) -> str:
+        words = self.rng.sample(WORDS, 4) + self.rng.sample(query_words, min(2, len(query_words)))
+        self.rng.shuffle(words)
+        return " ".join(words).title()
+
+    def _paper(self, query_words: List[str], chars: int) -> dict:
+        return {
+            "title": self._title(query_words),
+            "authors": [f"{self.rng.choice(GIVEN)} {self.rng.choice(SURNAMES)}" for _ in range(self.rng.randint(1, 5))],
+            "abstract": self._sentence(query_words, chars),
+            "year": self.rng.randint(2005, 2025),
+            "doi": f"10.{self.rng.randint(1000, 9999)}/mock.{uuid.uuid4().hex[:10]}",
+            "citations": int(self.rng.paretovariate(1.2)) - 1,
+        }
+
+    def semantic_scholar_body(self, query: str, limit: int, config: UpstreamConfig) -> dict:
+        words = _query_words(query)
+        data = []
+        for _ in range(min(limit, config.items)):
+            paper = self._paper(words, config.text_chars)
+            data.append({
+                "paperId": uuid.uuid4().hex,
+                "title": paper["title"],
+                "authors": [{"authorId": str(self.rng.randint(1, 10**8)), "name": name} for name in paper["authors"]],
+                "abstract": paper["abstract"],
+                "year": paper["year"],
+                "url": f"https://www.semanticscholar.org/paper/{uuid.uuid4().hex}",
+                "externalIds": {"DOI": paper["doi"]},
+                "citationCount": paper["citations"],
+            })
+        return {"total": len(data) * 37, "offset": 0, "data": data}
+
+    def arxiv_feed(self, query: str, limit: int, config: UpstreamConfig) -> str:
+        words = _query_words(query)
+        entries = []
+        for _ in range(min(limit, config.items)):
+            paper = self._paper(words, config.text_chars)
+            arxiv_id = f"{self.rng.randint(2001, 2412)}.{self.rng.randint(10000, 99999)}"
+            authors = "".join(f"<author><name>{escape(name)}</name></author>" for name in paper["authors"])
+            entries.append(
+                f"<entry><id>http://arxiv.org/abs/{arxiv_id}v1</id>"
+                f"<updated>{paper['year']}-03-01T00:00:00Z</updated>"
+                f"<published>{paper['year']}-02-14T18:00:00Z</published>"
+                f"<title>{escape(paper['title'])}</title>"
+                f"<summary>{escape(paper['abstract'])}</summary>{authors}"
+                f"<arxiv:doi>{paper['doi']}</arxiv:doi>"
+                f'<link href="http://arxiv.org/abs/{arxiv_id}v1" rel="alternate" type="text/html"/>'
+                f'<arxiv:primary_category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/></entry>'
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+            'xmlns:arxiv="http://arxiv.org/schemas/atom">'
+            f"<title>arXiv Query: {escape(query)}</title>"
+            f"<opensearch:totalResults>{len(entries) * 41}</opensearch:totalResults>"
+            + "".join(entries) + "</feed>"
+        )
+
+    def crossref_body(self, query: str, rows: int, config: UpstreamConfig) -> dict:
+        words = _query_words(query)
+        items = []
+        for _ in range(min(rows, config.items)):
+            paper = self._paper(words, config.text_chars)
+            date_parts = {"date-parts": [[paper["year"], self.rng.randint(1, 12), self.rng.randint(1, 28)]]}
+            items.append({
+                "DOI": paper["doi"],
+                "URL": f"https://doi.org/{paper['doi']}",
+                "title": [paper["title"]],
+                "author": [
+                    {"given": name.split()[0], "family": name.split()[-1], "sequence": "additional"}
+                    for name in paper["authors"]
+                ],
+                "abstract": f"<jats:p>{paper['abstract']}</jats:p>",
+                "created": date_parts,
+                "published-print": date_parts,
+                "is-referenced-by-count": paper["citations"],
+            })
+        return {
+            "status": "ok",
+            "message-type": "work-list",
+            "message": {"total-results": len(items) * 53, "items-per-page": rows, "items": items},
+        }
+
+    def groq_content(self, messages: List[dict], config: UpstreamConfig) -> str:
+        """A completion in the format the calling prompt asks for"""
+        system = " ".join(message.get("content", "") for message in messages if message.get("role") == "system")
+        user = " ".join(message.get("content", "") for message in messages if message.get("role") == "user")
+        # Prefer the words of the idea itself ("... startup idea: <idea>" up to the end of the line)
+        subject = re.split(r"idea:|roadmap for:", user, maxsplit=1, flags=re.IGNORECASE)[-1].strip().split("\n")[0]
+        words = _query_words(subject) or WORDS[:5]
+        if "search terms" in system.lower():
+            return ", ".join(" ".join(self.rng.sample(words, min(2, len(words)))) for _ in range(4))
+        if "json" in system.lower():
+            return json.dumps({
+                "overall_score": self.rng.randint(40, 95),
+                "scores": {name: self.rng.randint(30, 95) for name in
+                           ("feasibility", "market_demand", "uniqueness", "strength", "risk_factors")},
+                "analysis": {name: self._sentence(words, 160) for name in (
+                    "verdict", "feasibility", "market_demand", "uniqueness",
+                    "strength", "risk_factors", "existing_competitors"
+                )},
+                "suggestions": {name: [self._sentence(words, 60) for _ in range(3)]
+                                for name in ("critical", "recommended", "optional")},
+            }, indent=2)
+        chars = config.text_chars * 6
+        phases = [f"Overview: {self._sentence(words, 200)}"]
+        for number in range(1, config.items + 1):
+            phases.append(
+                f"Phase {number}: {self._title(words)} - {self._sentence(words, 80)}\n"
+                "Tasks:\n" + "\n".join(f"- {self._sentence(words, chars)}" for _ in range(4)) + "\n"
+                "Implementation:\n" + "\n".join(f"- {self._sentence(words, chars)}" for _ in range(3))
+            )
+        return "\n\n".join(phases)
+
+    def stats(self) -> dict:
+        return {name: {**config.stats, **config.as_dict()} for name, config in self.configs.items()}
+
+
+_QUERY_WORD_RE = re.compile(r"[a-z]{4,}")
+
+
+def _query_words(query: str) -> List[str]:
+    # arXiv queries look like "all:crop+OR+all:yield"
+    return list(dict.fromkeys(
+        word for word in _QUERY_WORD_RE.findall(query.lower().replace("all:", " "))
+        if word not in ("this", "that", "with", "from", "startup", "idea", "terms", "return")
+    ))[:12]
+
+
+def create_app(mock: MockUpstreams) -> FastAPI:
+    app = FastAPI(title="Mock research and LLM upstreams")
+
+    @app.post(PATHS["groq"])
+    async def chat_completions(request: Request):
+        config = mock.configs["groq"]
+        payload = await request.json()
+        if await mock.delay(config):
+            return mock.error_response(config)
+        content = mock.groq_content(payload.get("messages", []), config)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = payload.get("model", "mock")
+        if not payload.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 200, "completion_tokens": len(content) // 4, "total_tokens": 200 + len(content) // 4},
+            }
+
+        async def chunks():
+            def chunk(delta, finish=None):
+                body = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                        "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+                return f"data: {json.dumps(body)}\n\n"
+
+            yield chunk({"role": "assistant"})
+            for token in re.findall(r"\S*\s*", content):
+                if token:
+                    yield chunk({"content": token})
+                    if config.token_ms:
+                        await asyncio.sleep(config.token_ms / 1000)
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    @app.get(PATHS["semantic_scholar"])
+    async def semantic_scholar_search(query: str = "", limit: int = 10):
+        config = mock.configs["semantic_scholar"]
+        if await mock.delay(config):
+            return mock.error_response(config)
+        return mock.semantic_scholar_body(query, limit, config)
+
+    @app.get(PATHS["arxiv"])
+    async def arxiv_query(search_query: str = "", max_results: int = 10):
+        config = mock.configs["arxiv"]
+        if await mock.delay(config):
+            return mock.error_response(config)
+        return Response(mock.arxiv_feed(search_query, max_results, config), media_type="application/atom+xml")
+
+    @app.get(PATHS["crossref"])
+    async def crossref_works(query: str = "", rows: int = 20):
+        config = mock.configs["crossref"]
+        if await mock.delay(config):
+            return mock.error_response(config)
+        return mock.crossref_body(query, rows, config)
+
+    @app.get("/_mock/stats")
+    async def mock_stats():
+        return mock.stats()
+
+    @app.post("/_mock/config")
+    async def mock_config(request: Request):
+        """Body: {"groq": {"latency": "fixed:50", "error_rate": 0.1}, ...}"""
+        try:
+            for name, fields in (await request.json()).items():
+                mock.configure([f"{name}.{field}={value}" for field, value in fields.items()])
+        except (KeyError, ValueError) as e:
+            return JSONResponse({"detail": str(e)}, status_code=400)
+        return mock.stats()
+
+    @app.get("/_mock/env")
+    async def mock_env(request: Request):
+        base = str(request.base_url).rstrip("/")
+        return backend_env(base)
+
+    return app
+
+
+def backend_env(base_url: str) -> Dict[str, str]:
+    """Environment variables pointing the backend at a mock server on base_url"""
+    return {ENV_VARS[name]: base_url + PATHS[name] for name in UPSTREAMS}
+
+
+def start_in_thread(mock: MockUpstreams, host: str = "127.0.0.1", port: int = 0):
+    """Run the mock server on its own event loop in a daemon thread; returns (server, base_url)"""
+    import socket
+    import uvicorn
+
+    sock = socket.socket()
+    sock.bind((host, port))
+    server = uvicorn.Server(uvicorn.Config(create_app(mock), log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://{host}:{sock.getsockname()[1]}"
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--set", action="append", default=[], metavar="UPSTREAM.FIELD=VALUE")
+    args = parser.parse_args()
+
+    mock = MockUpstreams(args.seed)
+    mock.configure(args.set)
+    print("Point the backend at this server with:")
+    for name, value in backend_env(f"http://{args.host}:{args.port}").items():
+        print(f"  export {name}={value}")
+    for name, config in mock.configs.items():
+        print(f"  {name:<17} {config.as_dict()}")
+    uvicorn.run(create_app(mock), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 import os
-from pymongo import MongoClient, errors
-from passlib.context import CryptContext
+import hashlib
+import re
+from pymongo import MongoClient, errors, UpdateOne, TEXT
 from dotenv import load_dotenv
 from bson.objectid import ObjectId
 from datetime import datetime, timedelta
 import jwt
 
+from roadmap_phases import parse_roadmap
+from password_hasher import hash_password_sync, verify_password_sync
+
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
@@ -17,7 +21,19 @@ JWT_EXPIRES_MINUTES = int(os.getenv("JWT_EXPIRES_MINUTES", "60"))
 if not MONGO_URI or not MONGO_DB:
     raise Exception("MONGO_URI and MONGO_DB must be set in environment")
 
-client = MongoClient(MONGO_URI)
+def _optional_int(name: str):
+    value = os.getenv(name)
+    return int(value) if value else None
+
+# Connection pool settings, shared with the async client in async_database.py
+MONGO_POOL_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+    "maxIdleTimeMS": _optional_int("MONGO_MAX_IDLE_TIME_MS"),
+    "waitQueueTimeoutMS": _optional_int("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+}
+
+client = MongoClient(MONGO_URI, **MONGO_POOL_OPTIONS)
 db = client[MONGO_DB]
 
 # Collections
@@ -26,26 +42,46 @@ ideas_collection = db["ideas"]
 profiles_collection = db["profiles"]
 roadmaps_collection = db["roadmaps"]
 research_collection = db["research"]
+cache_collection = db["cache"]
+papers_collection = db["papers"]
+jobs_collection = db["jobs"]
+activity_collection = db["activity_counters"]
 
 # Create indexes
 try:
     users_collection.create_index("email", unique=True)
+    users_collection.create_index("created_at")
+    ideas_collection.create_index([("user_id", 1), ("created_at", -1)])
     profiles_collection.create_index("user_id", unique=True)
     roadmaps_collection.create_index("user_id")
     research_collection.create_index("user_id")
+    cache_collection.create_index("expires_at", expireAfterSeconds=0)
+    papers_collection.create_index("key", unique=True)
+    papers_collection.create_index(
+        [("title", TEXT), ("abstract", TEXT)],
+        weights={"title": 10, "abstract": 2},
+        name="paper_text"
+    )
+    jobs_collection.create_index([("status", 1), ("run_at", 1)])
+    jobs_collection.create_index("user_id")
+    jobs_collection.create_index(
+        "active_key",
+        unique=True,
+        partialFilterExpression={"active_key": {"$exists": True}}
+    )
+    jobs_collection.create_index("expires_at", expireAfterSeconds=0)
 except Exception as e:
     print(f"Index creation error: {e}")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # =====================
 # Auth helpers
 # =====================
+# Blocking helpers; request handlers go through password_hasher's pool instead
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return hash_password_sync(password)
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    return verify_password_sync(plain, hashed)
 
 def create_access_token(subject: str, expires_minutes: int = JWT_EXPIRES_MINUTES):
     expire = datetime.utcnow() + timedelta(minutes=expires_minutes)
@@ -62,15 +98,25 @@ def get_user_profile(user_id: str):
     return profiles_collection.find_one({"user_id": ObjectId(user_id)})
 
 def update_user_profile(user_id: str, profile_data: dict):
-    return profiles_collection.update_one(
+    result = profiles_collection.update_one(
         {"user_id": ObjectId(user_id)},
         {"$set": profile_data},
         upsert=True
     )
+    if result.upserted_id is not None:
+        mark_profile_exists(user_id)
+    return result
 
 # =====================
 # Roadmap CRUD
 # =====================
+# Roadmap text is parsed into "overview" and structured "phases" whenever it
+# is written; documents stored before that are parsed on read.
+def _with_structure(roadmap: dict) -> dict:
+    if "phases" not in roadmap and roadmap.get("roadmap"):
+        roadmap.update(parse_roadmap(roadmap["roadmap"]))
+    return roadmap
+
 def create_roadmap(user_id: str, data: dict) -> str:
     now = datetime.utcnow()
     data.update({
@@ -78,7 +124,10 @@ def create_roadmap(user_id: str, data: dict) -> str:
         "updated_at": now,
         "user_id": user_id
     })
+    if data.get("roadmap"):
+        data.update(parse_roadmap(data["roadmap"]))
     result = roadmaps_collection.insert_one(data)
+    increment_activity(user_id, "roadmaps")
     return str(result.inserted_id)
 
 def get_roadmap_by_id(roadmap_id: str):
@@ -86,6 +135,7 @@ def get_roadmap_by_id(roadmap_id: str):
     if roadmap:
         roadmap["id"] = str(roadmap["_id"])
         del roadmap["_id"]
+        _with_structure(roadmap)
     return roadmap
 
 def get_user_roadmaps(user_id: str):
@@ -93,17 +143,36 @@ def get_user_roadmaps(user_id: str):
     for roadmap in roadmaps:
         roadmap["id"] = str(roadmap["_id"])
         del roadmap["_id"]
+        _with_structure(roadmap)
     return roadmaps
 
 def update_roadmap(roadmap_id: str, update_data: dict):
     update_data["updated_at"] = datetime.utcnow()
+    if update_data.get("roadmap"):
+        update_data.update(parse_roadmap(update_data["roadmap"]))
     return roadmaps_collection.update_one(
         {"_id": ObjectId(roadmap_id)},
         {"$set": update_data}
     )
 
-def delete_roadmap(roadmap_id: str):
-    return roadmaps_collection.delete_one({"_id": ObjectId(roadmap_id)})
+def replace_roadmap_text(roadmap_id: str, expected_text: str, roadmap_text: str) -> bool:
+    """Store new roadmap text only if nobody changed it since it was read"""
+    result = roadmaps_collection.update_one(
+        {"_id": ObjectId(roadmap_id), "roadmap": expected_text},
+        {"$set": {
+            "roadmap": roadmap_text,
+            "updated_at": datetime.utcnow(),
+            **parse_roadmap(roadmap_text)
+        }}
+    )
+    return result.matched_count == 1
+
+def delete_roadmap(roadmap_id: str) -> bool:
+    deleted = roadmaps_collection.find_one_and_delete({"_id": ObjectId(roadmap_id)}, {"user_id": 1})
+    if deleted is None:
+        return False
+    increment_activity(deleted["user_id"], "roadmaps", -1)
+    return True
 
 # =====================
 # Research CRUD
@@ -119,6 +188,7 @@ def save_research(user_id: str, research_data: dict) -> str:
         "created_at": research_data.get("created_at", datetime.utcnow())
     }
     result = research_collection.insert_one(research_doc)
+    increment_activity(user_id, "research")
     return str(result.inserted_id)
 
 def get_user_research_history(user_id: str, limit: int = 10) -> list:
@@ -137,13 +207,170 @@ def get_research_by_id(user_id: str, research_id: str) -> dict:
 
 def get_research_count(user_id: str) -> int:
     return research_collection.count_documents({"user_id": ObjectId(user_id)})
+
+# =====================
+# Ideas
+# =====================
+def save_idea(user_id: str, idea_doc: dict) -> str:
+    idea_doc["user_id"] = ObjectId(user_id)
+    result = ideas_collection.insert_one(idea_doc)
+    increment_activity(user_id, "ideas")
+    return str(result.inserted_id)
+
+# =====================
 # Activity Summary
 # =====================
+# One counters document per user in "activity_counters", keyed by the user's
+# ObjectId, so an activity summary is a single find_one instead of a
+# count_documents per collection. Writers $inc the matching counter after
+# each insert or delete; the two writes are not a transaction, so
+# reconcile_activity_counters() recounts from the source collections
+# (periodically, as the "reconcile_activity" job) and overwrites any drift.
+# The overwrite is a compare-and-set against the counters read before the
+# recount: a user whose counters moved meanwhile is skipped until the next
+# run instead of losing or doubling that $inc. What remains is the gap
+# between a writer's insert and its own $inc; a recount landing inside it
+# counts that write twice until the next run.
+# A counters document without "reconciled_at" was created by $inc alone for
+# a user with older history; it is recounted on first read.
+ACTIVITY_COUNTERS = {"ideas": ideas_collection, "roadmaps": roadmaps_collection, "research": research_collection}
+
+def _activity_id(user_id) -> ObjectId:
+    # roadmaps store user_id as a string, everything else as an ObjectId
+    return user_id if isinstance(user_id, ObjectId) else ObjectId(user_id)
+
+def activity_summary(counters: dict) -> dict:
+    summary = {name: max(0, counters.get(name, 0)) for name in ACTIVITY_COUNTERS}
+    summary["profile_exists"] = bool(counters.get("profile_exists"))
+    return summary
+
+def increment_activity(user_id, counter: str, amount: int = 1):
+    activity_collection.update_one(
+        {"_id": _activity_id(user_id)},
+        {"$inc": {counter: amount}, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+def mark_profile_exists(user_id):
+    activity_collection.update_one(
+        {"_id": _activity_id(user_id)},
+        {"$set": {"profile_exists": True, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+def _count_pipeline(ids=None) -> list:
+    pipeline = []
+    if ids is not None:
+        pipeline.append({"$match": {"user_id": {"$in": ids + [str(user_id) for user_id in ids]}}})
+    pipeline.append({"$group": {"_id": "$user_id", "count": {"$sum": 1}}})
+    return pipeline
+
+def _merge_counts(rows) -> dict:
+    counts = {}
+    for row in rows:
+        if ObjectId.is_valid(row["_id"]):
+            user_id = _activity_id(row["_id"])
+            counts[user_id] = counts.get(user_id, 0) + row["count"]
+    return counts
+
+def _count_by_user(collection, ids=None) -> dict:
+    return _merge_counts(collection.aggregate(_count_pipeline(ids), allowDiskUse=True))
+
+def _reconcile_operations(ids, existing: dict, counts: dict, profiles: set):
+    """Compare-and-set updates for a recount; returns (operations, drifted)"""
+    everyone = set(existing) | profiles | set(ids or [])
+    for per_user in counts.values():
+        everyone |= set(per_user)
+
+    now = datetime.utcnow()
+    operations, drifted = [], 0
+    for user_id in everyone:
+        fresh = {name: counts[name].get(user_id, 0) for name in ACTIVITY_COUNTERS}
+        fresh["profile_exists"] = user_id in profiles
+        if activity_summary(existing.get(user_id, {})) != fresh:
+            drifted += 1
+        seen = existing.get(user_id, {})
+        operations.append(UpdateOne(
+            {"_id": user_id, **{name: seen.get(name) for name in ACTIVITY_COUNTERS}},
+            {"$set": {**fresh, "reconciled_at": now, "updated_at": now}},
+            upsert=True
+        ))
+    return operations, drifted
+
+def _applied_despite(error: errors.BulkWriteError) -> int:
+    # A counters document created by $inc after it was read: the upsert hits its _id
+    if any(write_error["code"] != 11000 for write_error in error.details["writeErrors"]):
+        raise error
+    return error.details["nMatched"] + error.details["nUpserted"]
+
+def reconcile_activity_counters(user_ids=None) -> dict:
+    """Recount activity from the source collections and overwrite the counters.
+
+    Recounts everyone when user_ids is None. Returns how many counters
+    documents were checked, how many had drifted, and how many were skipped
+    because a writer changed them during the recount.
+    """
+    ids = None if user_ids is None else [_activity_id(user_id) for user_id in user_ids]
+    # Read the counters first: the write below only applies if they are unchanged
+    existing = {doc["_id"]: doc for doc in activity_collection.find({} if ids is None else {"_id": {"$in": ids}})}
+    counts = {name: _count_by_user(collection, ids) for name, collection in ACTIVITY_COUNTERS.items()}
+    profiles = set(profiles_collection.distinct("user_id", {} if ids is None else {"user_id": {"$in": ids}}))
+
+    operations, drifted = _reconcile_operations(ids, existing, counts, profiles)
+    applied = 0
+    for start in range(0, len(operations), 1000):
+        try:
+            result = activity_collection.bulk_write(operations[start:start + 1000], ordered=False)
+            applied += result.matched_count + result.upserted_count
+        except errors.BulkWriteError as e:
+            applied += _applied_despite(e)
+    return {"users": len(operations), "drifted": drifted, "skipped": len(operations) - applied}
+
 def get_user_activity(user_id: str) -> dict:
-    user_obj_id = ObjectId(user_id)
-    return {
-        "ideas": ideas_collection.count_documents({"user_id": user_obj_id}),
-        "roadmaps": roadmaps_collection.count_documents({"user_id": user_obj_id}),
-        "research": research_collection.count_documents({"user_id": user_obj_id}),
-        "profile_exists": profiles_collection.count_documents({"user_id": user_obj_id}) > 0
-    }
+    counters = activity_collection.find_one({"_id": _activity_id(user_id)})
+    if not counters or "reconciled_at" not in counters:
+        reconcile_activity_counters([user_id])
+        counters = activity_collection.find_one({"_id": _activity_id(user_id)}) or {}
+    return activity_summary(counters)
+
+# =====================
+# Paper corpus
+# =====================
+PAPER_FIELDS = ("title", "authors", "abstract", "published_date", "source", "url", "doi", "citation_count")
+
+def paper_key(paper: dict) -> str:
+    """Stable corpus key: the DOI when known, otherwise a hash of the normalized title"""
+    doi = (paper.get("doi") or "").strip().lower()
+    if doi:
+        return f"doi:{doi}"
+    title = re.sub(r"[^a-z0-9]+", " ", paper.get("title", "").lower()).strip()
+    return "title:" + hashlib.sha1(title.encode("utf-8")).hexdigest()
+
+def upsert_papers(papers: list) -> int:
+    if not papers:
+        return 0
+    now = datetime.utcnow()
+    operations = []
+    for paper in papers:
+        fields = {field: paper.get(field) for field in PAPER_FIELDS}
+        fields["updated_at"] = now
+        operations.append(UpdateOne(
+            {"key": paper_key(paper)},
+            {"$set": fields, "$setOnInsert": {"created_at": now}},
+            upsert=True
+        ))
+    result = papers_collection.bulk_write(operations, ordered=False)
+    return result.upserted_count + result.modified_count
+
+def search_papers(search_terms: list, limit: int = 15, min_score: float = 0.0) -> list:
+    """Full-text search over stored titles and abstracts, best matches first"""
+    query = " ".join(search_terms)
+    if not query.strip():
+        return []
+    projection = {field: 1 for field in PAPER_FIELDS}
+    projection.update({"_id": 0, "score": {"$meta": "textScore"}})
+    cursor = papers_collection.find(
+        {"$text": {"$search": query}},
+        projection
+    ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+    return [paper for paper in cursor if paper["score"] >= min_score]
@@ -0,0 +1,201 @@
+import os
+import json
+import random
+import asyncio
+from typing import AsyncIterator, List, Optional, Tuple
+
+import httpx
+
+from http_clients import registry
+from source_guard import parse_retry_after
+from llm_scheduler import llm_scheduler, SchedulerTimeoutError, PRIORITY_INTERACTIVE
+
+# =====================
+# Async Groq chat-completions client
+# =====================
+# All LLM calls share one pooled keep-alive client (see http_clients.py),
+# never block the event loop, and retry 429/5xx/transport errors with
+# full-jitter exponential backoff (honoring Retry-After when present).
+# stream_chat_completion() uses Groq's SSE streaming mode and only retries
+# before the first token has been handed to the caller. Each attempt holds
+# a slot from the shared LLM scheduler (see llm_scheduler.py) for as long
+# as the request is open; backoff sleeps do not.
+
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "2"))
+GROQ_BACKOFF_BASE = float(os.getenv("GROQ_BACKOFF_BASE", "0.5"))
+GROQ_BACKOFF_CAP = float(os.getenv("GROQ_BACKOFF_CAP", "8"))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+registry.register(
+    "groq",
+    GROQ_API_URL,
+    timeout=30.0,
+    max_connections=int(os.getenv("GROQ_MAX_CONNECTIONS", "20")),
+)
+
+
+class GroqError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    delay = random.uniform(0, min(GROQ_BACKOFF_CAP, GROQ_BACKOFF_BASE * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def _request_parts(
+    messages: List[dict], model: str, temperature: float, max_tokens: Optional[int]
+) -> Tuple[dict, dict]:
+    if not GROQ_API_KEY:
+        raise GroqError(500, "GROQ_API_KEY not set in environment")
+    headers = {
+        "Authorization": f"Bearer {GROQ_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    payload = {"model": model, "messages": messages, "temperature": temperature}
+    if max_tokens is not None:
+        payload["max_tokens"] = max_tokens
+    return headers, payload
+
+
+async def _acquire_slot(priority: int):
+    try:
+        await llm_scheduler.acquire(priority)
+    except SchedulerTimeoutError as e:
+        raise GroqError(503, str(e))
+
+
+def _retry_after(response) -> Optional[float]:
+    """Retry-After of a retryable response; it also pauses every queued LLM call"""
+    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+    if retry_after is not None:
+        llm_scheduler.pause(retry_after)
+    return retry_after
+
+
+async def chat_completion(
+    messages: List[dict],
+    model: str,
+    temperature: float,
+    max_tokens: Optional[int] = None,
+    timeout: float = 30.0,
+    max_retries: int = GROQ_MAX_RETRIES,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> str:
+    """Return the first choice's message content, raising GroqError on failure"""
+    headers, payload = _request_parts(messages, model, temperature, max_tokens)
+
+    client = registry.get("groq")
+    for attempt in range(max_retries + 1):
+        retry_after = None
+        await _acquire_slot(priority)
+        try:
+            response = await client.post(GROQ_API_URL, headers=headers, json=payload, timeout=timeout)
+        except httpx.TransportError as e:
+            error = GroqError(503, f"Groq API request failed: {e}")
+        else:
+            if response.status_code == 200:
+                try:
+                    content = response.json()["choices"][0]["message"]["content"]
+                except (ValueError, KeyError, IndexError, TypeError):
+                    content = None
+                if isinstance(content, str):
+                    return content
+                # Malformed body: retried like the stream's malformed chunks
+                error = GroqError(502, f"Malformed Groq response: {response.text[:200]}")
+            else:
+                error = GroqError(response.status_code, f"Groq API error {response.status_code}: {response.text[:200]}")
+                if response.status_code not in RETRYABLE_STATUS:
+                    raise error
+                retry_after = _retry_after(response)
+        finally:
+            llm_scheduler.release()
+
+        if attempt == max_retries:
+            raise error
+        delay = backoff_delay(attempt, retry_after)
+        print(f"{error.detail} - retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+
+def _stream_delta(line: str) -> Optional[str]:
+    """Content of one SSE "data:" line; None for keep-alives, role-only chunks and [DONE]"""
+    if not line.startswith("data:"):
+        return None
+    data = line[5:].strip()
+    if not data or data == "[DONE]":
+        return None
+    try:
+        choices = json.loads(data).get("choices") or []
+    except (ValueError, AttributeError):
+        raise GroqError(502, f"Malformed Groq stream chunk: {data[:200]}")
+    if not choices:
+        return None
+    return (choices[0].get("delta") or {}).get("content") or None
+
+
+async def stream_chat_completion(
+    messages: List[dict],
+    model: str,
+    temperature: float,
+    max_tokens: Optional[int] = None,
+    timeout: float = 30.0,
+    max_retries: int = GROQ_MAX_RETRIES,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> AsyncIterator[str]:
+    """Yield content deltas as Groq produces them, raising GroqError on failure.
+
+    Failures before the first delta are retried like chat_completion();
+    once output has been yielded a failure is raised, since a retry would
+    repeat text the caller already forwarded.
+    """
+    headers, payload = _request_parts(messages, model, temperature, max_tokens)
+    payload["stream"] = True
+
+    client = registry.get("groq")
+    for attempt in range(max_retries + 1):
+        retry_after = None
+        started = False
+        await _acquire_slot(priority)
+        try:
+            async with client.stream(
+                "POST", GROQ_API_URL, headers=headers, json=payload, timeout=timeout
+            ) as response:
+                if response.status_code == 200:
+                    try:
+                        async for line in response.aiter_lines():
+                            delta = _stream_delta(line)
+                            if delta:
+                                started = True
+                                yield delta
+                        return
+                    except GroqError as e:
+                        if started:
+                            raise
+                        error = e  # malformed chunk before any output: retry
+                else:
+                    body = (await response.aread()).decode("utf-8", "replace")
+                    error = GroqError(response.status_code, f"Groq API error {response.status_code}: {body[:200]}")
+                    if response.status_code not in RETRYABLE_STATUS:
+                        raise error
+                    retry_after = _retry_after(response)
+        except httpx.TransportError as e:
+            if started:
+                raise GroqError(503, f"Groq stream interrupted: {e}")
+            error = GroqError(503, f"Groq API request failed: {e}")
+        finally:
+            llm_scheduler.release()
+
+        if attempt == max_retries:
+            raise error
+        delay = backoff_delay(attempt, retry_after)
+        print(f"{error.detail} - retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
@@ -0,0 +1,112 @@
+import os
+import asyncio
+from typing import Dict
+from urllib.parse import urlsplit
+
+import httpx
+
+# =====================
+# Shared outbound HTTP clients
+# =====================
+# One pooled AsyncClient per upstream host, created once for the app lifetime
+# so keep-alive connections (and their TCP/TLS handshakes) are reused across
+# requests instead of being paid on every call.
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+HTTP_WARMUP_ENABLED = os.getenv("HTTP_WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+
+try:
+    import h2  # noqa: F401  (needed by httpx for HTTP/2)
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+
+class ClientRegistry:
+    """Named, lazily created httpx.AsyncClient instances shared by the app"""
+
+    def __init__(self):
+        self._configs: Dict[str, dict] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def register(
+        self,
+        name: str,
+        base_url: str,
+        timeout: float = 30.0,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive: int = HTTP_MAX_KEEPALIVE,
+        follow_redirects: bool = False,
+        http2: bool = HTTP2_ENABLED,
+    ):
+        if http2 and not _HTTP2_AVAILABLE:
+            print(f"HTTP/2 requested for {name} but 'h2' is not installed, using HTTP/1.1")
+            http2 = False
+        self._configs[name] = {
+            "base_url": base_url,
+            "timeout": timeout,
+            "limits": httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            "follow_redirects": follow_redirects,
+            "http2": http2,
+        }
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Return the shared client, creating it on first use"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            config = self._configs[name]
+            client = httpx.AsyncClient(
+                timeout=config["timeout"],
+                limits=config["limits"],
+                follow_redirects=config["follow_redirects"],
+                http2=config["http2"],
+            )
+            self._clients[name] = client
+        return client
+
+    async def start(self, warmup: bool = HTTP_WARMUP_ENABLED):
+        for name in self._configs:
+            self.get(name)
+        if warmup:
+            await asyncio.gather(*(self._warmup(name) for name in self._configs))
+
+    async def _warmup(self, name: str):
+        """Resolve DNS and open one keep-alive connection so the first request skips the handshake"""
+        base_url = self._configs[name]["base_url"]
+        parts = urlsplit(base_url)
+        try:
+            loop = asyncio.get_running_loop()
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            await loop.getaddrinfo(parts.hostname, port)
+            await self.get(name).head(f"{parts.scheme}://{parts.netloc}/", timeout=5.0)
+        except Exception as e:
+            print(f"HTTP warm-up for {name} failed: {e}")
+
+    async def close(self):
+        clients = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "base_url": config["base_url"],
+                "http2": config["http2"],
+                "open": name in self._clients and not self._clients[name].is_closed,
+            }
+            for name, config in self._configs.items()
+        }
+
+
+registry = ClientRegistry()
+
+
+def get_client(name: str) -> httpx.AsyncClient:
+    return registry.get(name)
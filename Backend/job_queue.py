@@ -0,0 +1,322 @@
+import os
+import time
+import uuid
+import random
+import asyncio
+import hashlib
+import json
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from llm_scheduler import priority_floor, PRIORITY_BACKGROUND
+
+# =====================
+# MongoDB-backed job queue
+# =====================
+# Long-running work (roadmap generation, validation, research) is enqueued
+# as a document in the "jobs" collection and the HTTP request returns the
+# job ID at once. A bounded pool of workers claims queued jobs atomically
+# with find_one_and_update and a lease, so several API processes, or
+# standalone job_worker.py processes, can share the queue, and a job whose
+# worker died is picked up again once its lease expires. Failures are
+# retried with jittered backoff up to max_attempts; after that the job is
+# dead-lettered (status "dead") and kept for inspection. Jobs run with the
+# background LLM priority.
+#
+# While a job is queued or running it carries "active_key" (its dedupe key),
+# which has a partial unique index, so two concurrent enqueues of the same
+# work cannot both insert; the field is removed when the job finishes.
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+DEAD = "dead"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+TERMINAL_STATUSES = (SUCCEEDED, DEAD)
+
+DURATION_SAMPLES = 500
+# Client errors that are worth retrying: timeouts and rate limits
+RETRYABLE_CLIENT_ERRORS = {408, 429}
+
+JobHandler = Callable[[dict], Awaitable[Any]]
+
+
+def _percentile(samples, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def dedupe_key(job_type: str, user_id: str, payload: dict) -> str:
+    raw = json.dumps({"type": job_type, "user_id": user_id, "payload": payload}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class JobQueue:
+    def __init__(
+        self,
+        collection,
+        workers: int = 4,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 180.0,
+        timeout_seconds: float = 120.0,
+        max_attempts: int = 3,
+        retry_base: float = 2.0,
+        retry_cap: float = 60.0,
+        result_ttl_seconds: float = 86400.0,
+    ):
+        self.collection = collection
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.timeout_seconds = timeout_seconds
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+        self.result_ttl_seconds = result_ttl_seconds
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.handlers: Dict[str, JobHandler] = {}
+        self._tasks = []
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._watchers: Dict[str, set] = {}
+        self.counters = {
+            "enqueued": 0, "deduplicated": 0, "started": 0, "succeeded": 0,
+            "failed_attempts": 0, "retried": 0, "dead_lettered": 0,
+        }
+        self._durations: Dict[str, deque] = {}
+        self._waits: Dict[str, deque] = {}
+
+    def handler(self, job_type: str):
+        """Decorator registering the coroutine that runs jobs of job_type"""
+        def register(fn: JobHandler) -> JobHandler:
+            self.handlers[job_type] = fn
+            return fn
+        return register
+
+    # ---- producer side ----
+
+    async def enqueue(
+        self,
+        job_type: str,
+        payload: dict,
+        user_id: str,
+        max_attempts: Optional[int] = None,
+        run_at: Optional[datetime] = None,
+    ) -> dict:
+        """Queue a job (not claimed before run_at, if given); an identical queued
+        or running job for the same user is returned instead"""
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        key = dedupe_key(job_type, user_id, payload)
+        while True:
+            existing = await asyncio.to_thread(self.collection.find_one, {"active_key": key})
+            if existing:
+                self.counters["deduplicated"] += 1
+                return existing
+
+            now = datetime.utcnow()
+            job = {
+                "type": job_type,
+                "payload": payload,
+                "user_id": user_id,
+                "dedupe_key": key,
+                "active_key": key,
+                "status": QUEUED,
+                "attempts": 0,
+                "max_attempts": max_attempts or self.max_attempts,
+                "run_at": run_at or now,
+                "created_at": now,
+                "started_at": None,
+                "finished_at": None,
+                "lease_until": None,
+                "result": None,
+                "error": None,
+                "errors": [],
+                "duration_seconds": None,
+            }
+            try:
+                result = await asyncio.to_thread(self.collection.insert_one, job)
+                break
+            except DuplicateKeyError:
+                continue  # a concurrent enqueue won; return its job (or retry if it already finished)
+        job["_id"] = result.inserted_id
+        self.counters["enqueued"] += 1
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id) -> Optional[dict]:
+        return await asyncio.to_thread(self.collection.find_one, {"_id": job_id})
+
+    async def wait_for_change(self, job_id, timeout: float):
+        """Return when a local worker finishes job_id, or after timeout (jobs run elsewhere are polled)"""
+        event = asyncio.Event()
+        watchers = self._watchers.setdefault(str(job_id), set())
+        watchers.add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            watchers.discard(event)
+            if not watchers:
+                self._watchers.pop(str(job_id), None)
+
+    # ---- worker side ----
+
+    def _claim(self) -> Optional[dict]:
+        now = datetime.utcnow()
+        return self.collection.find_one_and_update(
+            {"$or": [
+                {"status": QUEUED, "run_at": {"$lte": now}},
+                {"status": RUNNING, "lease_until": {"$lt": now}},  # its worker died
+            ]},
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "worker_id": self.worker_id,
+                    "started_at": now,
+                    "lease_until": now + timedelta(seconds=self.lease_seconds),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("run_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def _finish(self, job: dict, update: dict):
+        # Only the worker that holds the lease may record the outcome
+        self.collection.update_one({"_id": job["_id"], "worker_id": self.worker_id}, update)
+
+    def _retry_delay(self, attempts: int) -> float:
+        return random.uniform(0, min(self.retry_cap, self.retry_base * (2 ** (attempts - 1))))
+
+    def _record_duration(self, job_type: str, samples: Dict[str, deque], seconds: float):
+        samples.setdefault(job_type, deque(maxlen=DURATION_SAMPLES)).append(seconds)
+
+    async def _run(self, job: dict):
+        job_type = job["type"]
+        self.counters["started"] += 1
+        wait = (job["started_at"] - job["run_at"]).total_seconds()
+        self._record_duration(job_type, self._waits, max(0.0, wait))
+        started = time.monotonic()
+        try:
+            handler = self.handlers.get(job_type)
+            if handler is None:
+                raise ValueError(f"No handler registered for job type {job_type}")
+            if job["attempts"] > job["max_attempts"]:
+                raise RuntimeError("worker lost while running the final attempt")
+            result = await asyncio.wait_for(handler(job), self.timeout_seconds)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            duration = time.monotonic() - started
+            if isinstance(e, asyncio.TimeoutError):
+                error = f"TimeoutError: job exceeded {self.timeout_seconds:g}s"
+            else:
+                error = f"{type(e).__name__}: {getattr(e, 'detail', None) or e}"
+            self.counters["failed_attempts"] += 1
+            # 4xx-style errors (bad input, missing records) will fail the same way again
+            status_code = getattr(e, "status_code", 500)
+            permanent = 400 <= status_code < 500 and status_code not in RETRYABLE_CLIENT_ERRORS
+            now = datetime.utcnow()
+            update = {"$set": {"error": error, "duration_seconds": duration, "lease_until": None},
+                      "$push": {"errors": {"attempt": job["attempts"], "error": error, "at": now}}}
+            if permanent or job["attempts"] >= job["max_attempts"]:
+                self.counters["dead_lettered"] += 1
+                update["$set"].update({
+                    "status": DEAD,
+                    "finished_at": now,
+                    "expires_at": now + timedelta(seconds=self.result_ttl_seconds),
+                })
+                update["$unset"] = {"active_key": ""}
+                print(f"Job {job['_id']} ({job_type}) dead-lettered after {job['attempts']} attempt(s): {error}")
+            else:
+                self.counters["retried"] += 1
+                update["$set"].update({
+                    "status": QUEUED,
+                    "run_at": now + timedelta(seconds=self._retry_delay(job["attempts"])),
+                })
+                print(f"Job {job['_id']} ({job_type}) attempt {job['attempts']} failed, retrying: {error}")
+        else:
+            duration = time.monotonic() - started
+            self.counters["succeeded"] += 1
+            self._record_duration(job_type, self._durations, duration)
+            now = datetime.utcnow()
+            update = {"$set": {
+                "status": SUCCEEDED,
+                "result": result,
+                "error": None,
+                "duration_seconds": duration,
+                "finished_at": now,
+                "lease_until": None,
+                "expires_at": now + timedelta(seconds=self.result_ttl_seconds),
+            }, "$unset": {"active_key": ""}}
+        await asyncio.to_thread(self._finish, job, update)
+        for event in self._watchers.get(str(job["_id"]), ()):
+            event.set()
+
+    async def _worker(self):
+        priority_floor.set(PRIORITY_BACKGROUND)
+        while not self._stopping:
+            try:
+                job = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                print(f"Job queue claim failed: {e}")
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    def start(self):
+        if self._tasks or self.workers <= 0:
+            return
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        # The flag also ends workers whose cancellation wait_for swallowed
+        # (Python < 3.12 can drop it when the wakeup fires at the same time)
+        self._stopping = True
+        self._wakeup.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        def summary(samples: Dict[str, deque]) -> dict:
+            return {
+                job_type: {
+                    "samples": len(values),
+                    "avg_seconds": round(sum(values) / len(values), 3),
+                    "p50_seconds": round(_percentile(values, 0.5), 3),
+                    "p95_seconds": round(_percentile(values, 0.95), 3),
+                    "max_seconds": round(max(values), 3),
+                }
+                for job_type, values in samples.items() if values
+            }
+
+        return {
+            "worker_id": self.worker_id,
+            "workers": len(self._tasks),
+            **self.counters,
+            "durations": summary(self._durations),
+            "queue_waits": summary(self._waits),
+        }
+
+    def status_counts(self) -> dict:
+        counts = {status: 0 for status in (QUEUED, RUNNING, SUCCEEDED, DEAD)}
+        for row in self.collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            counts[row["_id"]] = row["count"]
+        return counts
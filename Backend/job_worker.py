@@ -0,0 +1,37 @@
+import asyncio
+import signal
+
+# =====================
+# Standalone job worker
+# =====================
+# Runs queued jobs outside the API process. Start the API with JOB_WORKERS=0
+# and run one or more of these next to it; they share the MongoDB "jobs"
+# collection with the API and with each other.
+#
+#   JOB_WORKERS=4 python job_worker.py
+
+import main  # registers the job handlers
+
+
+async def run():
+    if main.job_queue.workers <= 0:
+        main.job_queue.workers = 4
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await main.http_registry.start()
+    main.job_queue.start()
+    print(f"Job worker {main.job_queue.worker_id} running {main.job_queue.workers} workers "
+          f"for {sorted(main.job_queue.handlers)}")
+    try:
+        await stop.wait()
+    finally:
+        await main.job_queue.stop()
+        await main.http_registry.close()
+        print(f"Job worker stopped: {main.job_queue.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
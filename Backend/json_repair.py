@@ -0,0 +1,186 @@
+import re
+from typing import Any, Optional
+
+# =====================
+# Lenient JSON parsing for LLM output
+# =====================
+# One left-to-right pass over the text that accepts the ways model output
+# usually breaks JSON: prose or ``` fences around the object, trailing or
+# missing commas, single-quoted or unquoted keys, raw newlines and
+# unescaped double quotes inside strings, Python literals, and output cut
+# off mid-value (open strings, arrays and objects are closed at the end of
+# the text; a key with no value is dropped). Runs in O(n) on the input.
+
+_WHITESPACE_RE = re.compile(r"[ \t\r\n]*")
+# Strings are scanned to the next quote or backslash in C rather than char by char
+_STRING_STOP_RE = {'"': re.compile(r'["\\]'), "'": re.compile(r"['\\]")}
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_LITERALS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+_VALUE_STARTS = set('"\'{[-0123456789tfnTFN')
+_MISSING = object()
+
+
+class _LenientParser:
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.end = len(text)
+
+    def _skip_whitespace(self) -> Optional[str]:
+        self.pos = _WHITESPACE_RE.match(self.text, self.pos).end()
+        return self.text[self.pos] if self.pos < self.end else None
+
+    def _next_significant(self, pos: int) -> Optional[str]:
+        pos = _WHITESPACE_RE.match(self.text, pos).end()
+        return self.text[pos] if pos < self.end else None
+
+    def _closes_string(self, pos: int) -> bool:
+        """Does the quote at pos end the string, or is it an unescaped quote inside it?"""
+        following = self._next_significant(pos + 1)
+        if following is None or following in ":}]":
+            return True
+        if following != ",":
+            return False
+        # After a comma a real string end is followed by another key or value
+        comma = self.text.index(",", pos + 1)
+        after = self._next_significant(comma + 1)
+        return after is None or after in _VALUE_STARTS or after in "}]"
+
+    def parse_value(self) -> Any:
+        char = self._skip_whitespace()
+        if char is None:
+            return _MISSING
+        if char == "{":
+            return self.parse_object()
+        if char == "[":
+            return self.parse_array()
+        if char in "\"'":
+            return self.parse_string(char)
+        if char == "-" or char.isdigit():
+            return self.parse_number()
+        word = self.parse_bare_word()
+        return _LITERALS.get(word, word) if word else _MISSING
+
+    def parse_object(self) -> dict:
+        self.pos += 1
+        result = {}
+        while True:
+            char = self._skip_whitespace()
+            if char is None:
+                return result  # truncated
+            if char == "}":
+                self.pos += 1
+                return result
+            if char == ",":
+                self.pos += 1  # trailing or doubled comma
+                continue
+            if char == "]":
+                self.pos += 1  # mismatched bracket, close the object
+                return result
+            key = self.parse_string(char) if char in "\"'" else self.parse_bare_word()
+            if not key:
+                self.pos += 1  # unusable character, skip it
+                continue
+            if self._skip_whitespace() == ":":
+                self.pos += 1
+            value = self.parse_value()
+            if value is _MISSING:
+                return result  # truncated right after the key
+            result[key] = value
+
+    def parse_array(self) -> list:
+        self.pos += 1
+        result = []
+        while True:
+            char = self._skip_whitespace()
+            if char is None:
+                return result
+            if char == "]":
+                self.pos += 1
+                return result
+            if char == ",":
+                self.pos += 1
+                continue
+            if char == "}":
+                self.pos += 1
+                return result
+            start = self.pos
+            value = self.parse_value()
+            if value is _MISSING:
+                return result
+            if self.pos == start:
+                self.pos += 1  # never loop on a character no value can start with
+                continue
+            result.append(value)
+
+    def parse_string(self, quote: str) -> str:
+        text, end = self.text, self.end
+        stop = _STRING_STOP_RE[quote]
+        self.pos += 1
+        chunks = []
+        start = self.pos
+        while True:
+            match = stop.search(text, self.pos)
+            if match is None:
+                chunks.append(text[start:end])  # truncated inside the string
+                self.pos = end
+                return "".join(chunks)
+            self.pos = match.start()
+            if text[self.pos] == "\\":
+                chunks.append(text[start:self.pos])
+                escaped = text[self.pos + 1:self.pos + 2]
+                if escaped == "u" and self.pos + 6 <= end:
+                    try:
+                        chunks.append(chr(int(text[self.pos + 2:self.pos + 6], 16)))
+                        self.pos += 6
+                    except ValueError:
+                        chunks.append(escaped)
+                        self.pos += 2
+                else:
+                    chunks.append(_ESCAPES.get(escaped, escaped))
+                    self.pos += 2
+                start = self.pos
+            elif self._closes_string(self.pos):
+                chunks.append(text[start:self.pos])
+                self.pos += 1
+                return "".join(chunks)
+            else:
+                self.pos += 1  # unescaped quote inside the string
+
+    def parse_number(self):
+        text, end = self.text, self.end
+        start = self.pos
+        if text[self.pos] == "-":
+            self.pos += 1
+        while self.pos < end and (text[self.pos].isdigit() or text[self.pos] in ".eE+-"):
+            self.pos += 1
+        raw = text[start:self.pos]
+        try:
+            return int(raw)
+        except ValueError:
+            pass
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+
+    def parse_bare_word(self) -> str:
+        text, end = self.text, self.end
+        start = self.pos
+        while self.pos < end and (text[self.pos].isalnum() or text[self.pos] in "_-$"):
+            self.pos += 1
+        return text[start:self.pos]
+
+
+def lenient_json_loads(text: str, default: Any = None) -> Any:
+    """Parse the first JSON object or array in text, repairing it where needed.
+
+    Returns `default` when the text contains no object or array at all.
+    """
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        return default
+    parser = _LenientParser(text)
+    parser.pos = min(starts)
+    value = parser.parse_value()
+    return default if value is _MISSING else value
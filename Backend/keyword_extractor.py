@@ -0,0 +1,247 @@
+import os
+import re
+import json
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# =====================
+# Local search-term extraction
+# =====================
+# RAKE-style phrase scoring: the idea is split into candidate phrases at
+# punctuation and stop words, each word scores degree/frequency over the
+# candidates, and a phrase scores the sum of its words (earlier phrases win
+# ties). A domain-vocabulary table maps everyday wording ("farmers",
+# "chatbot", "ai") to the academic terms that papers actually use; entries
+# can be added at runtime or loaded from KEYWORD_VOCABULARY_PATH (a JSON
+# object of trigger phrase -> academic term). Everything runs in-process in
+# tens of microseconds, so search terms no longer need an LLM round trip.
+
+MAX_PHRASE_WORDS = 3
+
+STOP_WORDS = set("""
+a about above after again against all also am an and any app apps application applications are as at
+be because been before being below between both build builds but by can could create creates did do
+does doing down during each easy easily every few for from further get gets give gives had has have
+having help helps her here hers him his how i idea if in into is it its itself just let lets like make
+makes many me more most much my need needs new no nor not now of off on once one only or other our out
+over own people person platform platforms product products provide provides same service services she
+should simple so some solution solutions startup startups such than that the their them then there
+these they this those through to too tool tools under until up use used user users uses using very want
+wants was way ways we were what when where which while who whom why will with within without would you
+your based better best allow allows enable enables offer offers via online digital smart
+""".split())
+
+DEFAULT_VOCABULARY: Dict[str, str] = {
+    # AI / ML
+    "ai": "artificial intelligence",
+    "artificial intelligence": "artificial intelligence",
+    "ml": "machine learning",
+    "machine learning": "machine learning",
+    "deep learning": "deep learning",
+    "neural network": "neural networks",
+    "chatbot": "conversational agents",
+    "chat bot": "conversational agents",
+    "llm": "large language models",
+    "gpt": "large language models",
+    "nlp": "natural language processing",
+    "computer vision": "computer vision",
+    "image recognition": "image classification",
+    "recommendation": "recommender systems",
+    "recommend": "recommender systems",
+    "personalized": "personalization",
+    "predict": "predictive modeling",
+    "forecast": "time series forecasting",
+    # Agriculture
+    "agriculture": "agriculture",
+    "farming": "precision agriculture",
+    "farmer": "precision agriculture",
+    "crop": "crop yield prediction",
+    "soil": "soil monitoring",
+    "irrigation": "smart irrigation",
+    "livestock": "livestock monitoring",
+    # Health
+    "health": "healthcare",
+    "healthcare": "healthcare",
+    "medical": "medical technology",
+    "patient": "patient monitoring",
+    "diagnosis": "clinical diagnosis",
+    "mental health": "mental health",
+    "therapy": "digital therapeutics",
+    "telemedicine": "telemedicine",
+    "wearable": "wearable sensors",
+    "fitness": "physical activity tracking",
+    # Finance
+    "fintech": "financial technology",
+    "payment": "digital payments",
+    "loan": "credit risk assessment",
+    "credit": "credit scoring",
+    "fraud": "fraud detection",
+    "investing": "algorithmic trading",
+    "stock": "stock market prediction",
+    "blockchain": "blockchain",
+    "crypto": "cryptocurrency",
+    # Education
+    "education": "educational technology",
+    "student": "educational technology",
+    "learning platform": "e-learning",
+    "tutor": "intelligent tutoring systems",
+    "tutoring": "intelligent tutoring systems",
+    # Climate / energy
+    "climate": "climate change",
+    "carbon": "carbon emissions",
+    "solar": "solar energy",
+    "energy": "energy efficiency",
+    "renewable": "renewable energy",
+    "recycling": "waste management",
+    "waste": "waste management",
+    # Logistics / retail / mobility
+    "supply chain": "supply chain management",
+    "logistics": "logistics optimization",
+    "delivery": "last-mile delivery",
+    "inventory": "inventory management",
+    "ecommerce": "e-commerce",
+    "e-commerce": "e-commerce",
+    "retail": "retail analytics",
+    "traffic": "traffic prediction",
+    "ride sharing": "ride-sharing",
+    "electric vehicle": "electric vehicles",
+    "drone": "unmanned aerial vehicles",
+    # Infrastructure / security
+    "iot": "internet of things",
+    "sensor": "sensor networks",
+    "cybersecurity": "cybersecurity",
+    "security": "cybersecurity",
+    "privacy": "data privacy",
+    "cloud": "cloud computing",
+    "smart home": "smart home automation",
+    "smart city": "smart cities",
+    # Work / society
+    "hiring": "recruitment",
+    "recruitment": "recruitment",
+    "job": "job matching",
+    "social media": "social media analytics",
+    "sentiment": "sentiment analysis",
+    "accessibility": "assistive technology",
+    "elderly": "aging in place",
+}
+
+_FRAGMENT_RE = re.compile(r"[.,;:!?()\[\]{}\"\n/|]+")
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+\-']*")
+_VOCAB_WORD_RE = re.compile(r"[a-z0-9+]+")  # splits "ai-powered" so "ai" can trigger
+
+# stemmed trigger tokens -> academic term
+_vocabulary: Dict[Tuple[str, ...], str] = {}
+
+
+def stem(word: str) -> str:
+    """Light plural stripping so "farmers"/"farmer" and "crops"/"crop" share vocabulary entries"""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def _tokens(text: str) -> List[str]:
+    return _VOCAB_WORD_RE.findall(text.lower())
+
+
+def register_vocabulary(entries: Dict[str, str]):
+    """Add or override trigger phrase -> academic term entries"""
+    for trigger, term in entries.items():
+        key = tuple(stem(token) for token in _tokens(trigger))
+        if 0 < len(key) <= MAX_PHRASE_WORDS and term.strip():
+            _vocabulary[key] = term.strip()
+
+
+def load_vocabulary_file(path: str):
+    with open(path, encoding="utf-8") as handle:
+        register_vocabulary(json.load(handle))
+
+
+register_vocabulary(DEFAULT_VOCABULARY)
+if os.getenv("KEYWORD_VOCABULARY_PATH"):
+    load_vocabulary_file(os.getenv("KEYWORD_VOCABULARY_PATH"))
+
+
+def _candidate_phrases(text: str) -> List[List[str]]:
+    """Runs of non-stop-words between punctuation, cut to MAX_PHRASE_WORDS"""
+    phrases = []
+    for fragment in _FRAGMENT_RE.split(text.lower()):
+        run: List[str] = []
+        for word in _WORD_RE.findall(fragment) + [""]:
+            word = word.strip("'-")
+            if word and word not in STOP_WORDS and len(word) > 1 and not word.isdigit():
+                run.append(word)
+                continue
+            for start in range(0, len(run), MAX_PHRASE_WORDS):
+                phrases.append(run[start:start + MAX_PHRASE_WORDS])
+            run = []
+    return phrases
+
+
+def domain_terms(text: str) -> List[str]:
+    """Academic terms whose trigger phrases occur in the text, in order of occurrence"""
+    stems = [stem(token) for token in _tokens(text)]
+    found: List[str] = []
+    index = 0
+    while index < len(stems):
+        # Prefer the longest trigger starting here ("mental health" over "mental"),
+        # and don't let its words trigger again ("health")
+        size = MAX_PHRASE_WORDS
+        while size and tuple(stems[index:index + size]) not in _vocabulary:
+            size -= 1
+        if size:
+            term = _vocabulary[tuple(stems[index:index + size])]
+            if term not in found:
+                found.append(term)
+        index += max(size, 1)
+    return found
+
+
+def rake_phrases(text: str) -> List[Tuple[str, float]]:
+    """Candidate phrases with RAKE scores, best first (ties keep text order)"""
+    phrases = _candidate_phrases(text)
+    frequency: Dict[str, int] = defaultdict(int)
+    degree: Dict[str, int] = defaultdict(int)
+    for phrase in phrases:
+        for word in phrase:
+            frequency[word] += 1
+            degree[word] += len(phrase)
+
+    scored: Dict[str, float] = {}
+    for phrase in phrases:
+        key = " ".join(phrase)
+        if key not in scored:
+            scored[key] = sum(degree[word] / frequency[word] for word in phrase)
+    return sorted(scored.items(), key=lambda item: -item[1])
+
+
+def extract_keywords(text: str, max_terms: int = 5) -> List[str]:
+    """Search terms for an idea: mapped domain terms first, then the best RAKE phrases.
+
+    Domain terms take at most half the slots (rounded up) so the idea's own
+    wording is always represented; phrases whose words are already covered
+    by a chosen term are skipped.
+    """
+    chosen: List[str] = []
+    covered: set = set()
+
+    def take(term: str) -> bool:
+        stems = {stem(token) for token in _tokens(term)}
+        if not stems or stems <= covered:
+            return False
+        chosen.append(term)
+        covered.update(stems)
+        return True
+
+    for term in domain_terms(text)[:(max_terms + 1) // 2]:
+        take(term)
+    for phrase, _ in rake_phrases(text):
+        if len(chosen) >= max_terms:
+            break
+        # A phrase made only of trigger words adds nothing to its domain term
+        if tuple(stem(token) for token in _tokens(phrase)) in _vocabulary:
+            continue
+        take(phrase)
+    return chosen[:max_terms]
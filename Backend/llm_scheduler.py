@@ -0,0 +1,165 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+import contextvars
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+# =====================
+# Outbound LLM scheduler
+# =====================
+# Every Groq call takes a slot from one process-wide scheduler. At most
+# max_concurrency calls run at once; the rest wait in a priority queue
+# (interactive validation, then search-term extraction, then batch
+# validation, then background jobs; FIFO within a priority). A 429/503 carrying Retry-After pauses all
+# dispatching until it expires, so a burst backs off together instead of
+# every queued call hitting the rate limit. Waiters give up after
+# queue_timeout rather than piling up behind a saturated provider.
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SEARCH_TERMS = 1
+PRIORITY_BATCH = 2
+PRIORITY_BACKGROUND = 3
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_SEARCH_TERMS: "search_terms",
+    PRIORITY_BATCH: "batch",
+    PRIORITY_BACKGROUND: "background",
+}
+
+WAIT_SAMPLES = 500
+
+# Lowest priority the current task may use; background workers raise it so
+# every LLM call they make, however deep, queues behind interactive traffic.
+priority_floor: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "llm_priority_floor", default=PRIORITY_INTERACTIVE
+)
+
+
+def effective_priority(priority: int) -> int:
+    return max(priority, priority_floor.get())
+
+
+class SchedulerTimeoutError(Exception):
+    """Raised when a call waited longer than queue_timeout for a slot"""
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LLMScheduler:
+    def __init__(self, max_concurrency: int, queue_timeout: Optional[float] = None):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._waiters: List[tuple] = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._wake_handle: Optional[asyncio.TimerHandle] = None
+        self._wait_samples: Dict[int, deque] = {p: deque(maxlen=WAIT_SAMPLES) for p in PRIORITY_NAMES}
+        self.counters = {"dispatched": 0, "queued": 0, "timeouts": 0, "pauses": 0, "paused_seconds": 0.0}
+
+    def _paused_for(self) -> float:
+        return max(0.0, self.paused_until - time.monotonic())
+
+    def pause(self, seconds: float):
+        """Stop dispatching for `seconds` (Retry-After from the provider)"""
+        until = time.monotonic() + seconds
+        if until <= self.paused_until:
+            return
+        self.counters["pauses"] += 1
+        self.counters["paused_seconds"] += until - max(self.paused_until, time.monotonic())
+        self.paused_until = until
+        print(f"LLM scheduler paused for {seconds:.1f}s")
+
+    def _wake(self):
+        self._wake_handle = None
+        self._dispatch()
+
+    def _dispatch(self):
+        """Hand free slots to the highest-priority waiters"""
+        paused_for = self._paused_for()
+        if paused_for > 0:
+            if self._waiters and self._wake_handle is None:
+                self._wake_handle = asyncio.get_running_loop().call_later(paused_for, self._wake)
+            return
+        while self._waiters and self.in_flight < self.max_concurrency:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue  # timed out or cancelled while queued
+            self.in_flight += 1
+            future.set_result(None)
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE):
+        priority = effective_priority(priority)
+        started = time.monotonic()
+        if not self._waiters and self.in_flight < self.max_concurrency and not self._paused_for():
+            self.in_flight += 1
+        else:
+            self.counters["queued"] += 1
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._seq), future))
+            self._dispatch()
+            try:
+                await asyncio.wait_for(future, self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.counters["timeouts"] += 1
+                raise SchedulerTimeoutError(
+                    f"LLM queue wait exceeded {self.queue_timeout:g}s "
+                    f"({PRIORITY_NAMES.get(priority, priority)} priority)"
+                )
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self.release()  # the slot was granted as we gave up
+                raise
+        self.counters["dispatched"] += 1
+        self._wait_samples[priority].append(time.monotonic() - started)
+
+    def release(self):
+        self.in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_INTERACTIVE):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        depth = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                depth[PRIORITY_NAMES[priority]] += 1
+        waits = {}
+        for priority, samples in self._wait_samples.items():
+            recent = list(samples)
+            waits[PRIORITY_NAMES[priority]] = {
+                "samples": len(recent),
+                "avg_seconds": round(sum(recent) / len(recent), 4) if recent else 0.0,
+                "p95_seconds": round(_percentile(recent, 0.95), 4),
+                "max_seconds": round(max(recent), 4) if recent else 0.0,
+            }
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": depth,
+            "paused_for_seconds": round(self._paused_for(), 2),
+            "wait_times": waits,
+            **{key: round(value, 2) if isinstance(value, float) else value for key, value in self.counters.items()},
+        }
+
+
+llm_scheduler = LLMScheduler(
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "4")),
+    queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "30")),
+)
@@ -1,28 +1,51 @@
 from fastapi import FastAPI, HTTPException, status, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 import os
 import jwt
-import requests
+import json
+import hashlib
+import time
 import asyncio
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
 from pymongo import errors
 from bson import ObjectId
 import httpx
 from dotenv import load_dotenv
-from xml.etree import ElementTree
 import re
-from database import users_collection
+from contextlib import asynccontextmanager
+from database import jobs_collection
+from ttl_cache import TwoTierCache
+from streaming import encode_frame, media_type_for, STREAM_HEADERS
+from paper_ranking import rank_papers, term_coverage
+from paper_dedup import PaperDeduper, dedupe_papers
+from arxiv_parser import ArxivFeedParser, parse_feed_incremental
+from groq_client import chat_completion, stream_chat_completion, GroqError
+from llm_scheduler import llm_scheduler, priority_floor, PRIORITY_INTERACTIVE, PRIORITY_SEARCH_TERMS, PRIORITY_BATCH
+from roadmap_phases import PhaseSplitter, PHASE_HEADING_RE, phase_text, replace_phase_text
+from keyword_extractor import extract_keywords
+from validation_parser import normalize_validation_result, parse_fallback_response
+from singleflight import SingleFlight, normalize_text_key
+from source_guard import source_guards
+from http_clients import registry as http_registry, get_client
+from job_queue import JobQueue, TERMINAL_STATUSES
+from password_hasher import password_hasher, PasswordHasherBusy
 
 # Database imports
 from database import (
-    hash_password, verify_password, create_access_token,
+    create_access_token,
+    PAPER_FIELDS
+)
+# Async endpoints use the motor-based helpers (same names as database.py)
+import async_database
+from async_database import (
     get_user_by_id, get_user_profile, update_user_profile,
     create_roadmap, get_roadmap_by_id, get_user_roadmaps,
-    update_roadmap, delete_roadmap, get_user_by_id,
-    profiles_collection,ideas_collection
+    update_roadmap, delete_roadmap, replace_roadmap_text,
+    upsert_papers, search_papers, get_user_activity, cache_collection, save_idea
 )
 
 load_dotenv()
@@ -33,15 +56,36 @@ JWT_SECRET = os.environ.get("JWT_SECRET", "fallback_secret")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 SEMANTIC_SCHOLAR_API_KEY = os.getenv("SEMANTIC_SCHOLAR_API_KEY")  # Add this to your .env file
-SEMANTIC_SCHOLAR_API = "https://api.semanticscholar.org/graph/v1/paper/search"
-ARXIV_API = "https://export.arxiv.org/api/query"
-CROSSREF_API = "https://api.crossref.org/works"
+# Upstream URLs can point at benchmarks/mock_upstreams.py for load tests
+SEMANTIC_SCHOLAR_API = os.getenv("SEMANTIC_SCHOLAR_API_URL", "https://api.semanticscholar.org/graph/v1/paper/search")
+ARXIV_API = os.getenv("ARXIV_API_URL", "https://export.arxiv.org/api/query")
+CROSSREF_API = os.getenv("CROSSREF_API_URL", "https://api.crossref.org/works")
+
+# Shared research clients (one keep-alive pool per upstream host)
+http_registry.register("semantic_scholar", SEMANTIC_SCHOLAR_API, timeout=30.0)
+http_registry.register("arxiv", ARXIV_API, timeout=45.0, follow_redirects=True)
+http_registry.register("crossref", CROSSREF_API, timeout=45.0)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await http_registry.start()
+    job_queue.start()
+    reconcile_task = None
+    if ACTIVITY_RECONCILE_INTERVAL_SECONDS > 0:
+        reconcile_task = asyncio.create_task(schedule_activity_reconciliation())
+    yield
+    if reconcile_task:
+        reconcile_task.cancel()
+    await job_queue.stop()
+    await http_registry.close()
+    password_hasher.shutdown()
 
 # Initialize FastAPI
 app = FastAPI(
     title="Research Advisor API",
     description="API for fetching academic research papers",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS Configuration
@@ -79,11 +123,6 @@ class TokenOut(BaseModel):
 class IdeaInput(BaseModel):
     prompt: str
 
-class IdeaResponse(BaseModel):
-    prompt: str
-    validation: str
-    created_at: datetime
-
 # Update the ProfileBase model to match your frontend changes
 class ProfileBase(BaseModel):
     name: str
@@ -111,147 +150,149 @@ class ResearchPaper(BaseModel):
     source: str
     url: str
     doi: Optional[str] = None
+    citation_count: Optional[int] = None
+    relevance_score: Optional[float] = None
 
 class ResearchRequest(BaseModel):
     idea: str
     max_results: int = 10
+    min_relevance: Optional[float] = Field(None, ge=0, le=1)  # drop papers containing less than this share of the search-term tokens
+    budget_seconds: Optional[float] = Field(None, gt=0, le=60)  # overrides RESEARCH_BUDGET_SECONDS
 
 class ResearchResponse(BaseModel):
     papers: List[ResearchPaper]
     search_terms: List[str]
+    partial: bool = False
+    timed_out_sources: List[str] = []
 
 # Helper Functions
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+# Principal cache: the user document (minus the password hash) per user ID,
+# so authenticated requests skip the users lookup. Entries are dropped when
+# the user or their profile changes in this process; the TTL bounds how long
+# other processes can serve a stale principal.
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+# Trust the email/role claims in the token instead of loading the user at all.
+# Faster, but a deleted user keeps access until the token expires.
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() in ("1", "true", "yes")
+
+principal_cache = TwoTierCache(
+    "principal",
+    max_entries=PRINCIPAL_CACHE_MAX_ENTRIES,
+    max_entry_bytes=16_000,
+    fresh_seconds=PRINCIPAL_CACHE_TTL_SECONDS,
+    stale_seconds=0,
+)
+
+async def invalidate_principal(user_id):
+    await principal_cache.invalidate(str(user_id))
+
+async def load_principal(user_id: str) -> Optional[dict]:
+    if PRINCIPAL_CACHE_TTL_SECONDS > 0:
+        cached, state = await principal_cache.get(user_id)
+        if state == "fresh":
+            return dict(cached)
+    user = await get_user_by_id(user_id)
+    if not user:
+        return None
+    user.pop("password_hash", None)
+    if PRINCIPAL_CACHE_TTL_SECONDS > 0:
+        await principal_cache.set(user_id, user)
+    return dict(user)
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     if not credentials or not credentials.credentials:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     try:
         payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         user_id = payload.get("sub")
-        if not user_id:
+        if not user_id or not ObjectId.is_valid(user_id):
             raise HTTPException(status_code=401, detail="Invalid token")
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = get_user_by_id(user_id)
+    # Tokens issued before the email claim existed fall through to the lookup
+    if AUTH_TRUST_TOKEN_CLAIMS and payload.get("email"):
+        return {"_id": ObjectId(user_id), "email": payload["email"], "role": payload.get("role", "user")}
+
+    user = await load_principal(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
-def create_access_token_helper(subject: str, role: str = "user"):
+async def get_optional_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """The caller's principal for endpoints open to guests; None without a usable token"""
+    if not credentials or not credentials.credentials:
+        return None
+    try:
+        return await get_current_user(credentials)
+    except HTTPException:
+        return None
+
+def create_access_token_helper(subject: str, role: str = "user", email: Optional[str] = None):
     payload = {
         "sub": subject,
         "exp": datetime.utcnow() + timedelta(days=1),
         "role": role
     }
+    if email:
+        payload["email"] = email
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
-def call_groq_validation(prompt: str) -> str:
-    if not GROQ_API_KEY:
-        return f"Mock validation for: {prompt[:100]}... This startup idea has potential in the current market. Consider focusing on user acquisition and product-market fit."
+# "llm" (default) asks Groq to refine the locally extracted candidates and
+# falls back to them if the call fails or GROQ_API_KEY is unset; "local" skips
+# Groq. Switch the default once benchmarks/bench_keywords.py --llm shows the
+# local terms keep recall.
+SEARCH_TERMS_MODE = os.getenv("SEARCH_TERMS_MODE", "llm").lower()
 
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "model": "llama3-8b-8192",
-        "messages": [
-            {"role": "system", "content": "You are a startup idea validation assistant."},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.7
-    }
-
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        if response.status_code != 200:
-            return f"Validation service temporarily unavailable. Mock validation: {prompt[:100]}..."
-        
-        data = response.json()
-        return data["choices"][0]["message"]["content"]
-    except Exception as e:
-        print(f"Groq API error: {e}")
-        return f"Mock validation for: {prompt[:100]}... This startup idea shows promise. Focus on market research and MVP development."
-def generate_search_terms(idea: str) -> List[str]:
+async def generate_search_terms(idea: str) -> List[str]:
     """Generate more precise search terms from the startup idea"""
-    if not GROQ_API_KEY:
-        # Enhanced fallback with domain-specific terms
-        words = re.findall(r'\b\w{3,}\b', idea.lower())
-        stop_words = {'the', 'and', 'for', 'with', 'that', 'this', 'your', 'have', 'from'}
-        filtered_words = [word for word in words if word not in stop_words]
-        
-        # Add domain-specific terms based on context
-        domain_terms = []
-        idea_lower = idea.lower()
-        
-        if any(term in idea_lower for term in ['ai', 'artificial', 'machine learning', 'ml']):
-            domain_terms.extend(['artificial intelligence', 'machine learning', 'neural networks'])
-        if any(term in idea_lower for term in ['agriculture', 'farming', 'crop', 'soil']):
-            domain_terms.extend(['agriculture', 'precision farming', 'crop yield'])
-        if any(term in idea_lower for term in ['health', 'medical', 'patient', 'diagnosis']):
-            domain_terms.extend(['healthcare', 'medical technology', 'clinical'])
-        
-        return (domain_terms + filtered_words)[:5]
-    
-    # Use Groq API for better term extraction
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
+    local_terms = extract_keywords(idea)
+    if SEARCH_TERMS_MODE != "llm" or not GROQ_API_KEY:
+        return local_terms
     
     # More specific prompt for academic research
     prompt = f"""
     Extract 3-5 precise technical and academic search terms from this startup idea: {idea}
+    Candidate terms from keyword extraction (keep, rewrite or replace them): {", ".join(local_terms)}
     Focus on terms that would be effective for searching academic databases like Semantic Scholar, arXiv, and CrossRef.
     Return ONLY the terms separated by commas, no explanations or extra text.
     """
     
-    payload = {
-        "model": "llama3-8b-8192",
-        "messages": [
-            {
-                "role": "system", 
-                "content": "You are an expert research assistant. Extract precise academic search terms that would return highly relevant research papers."
-            },
-            {
-                "role": "user", 
-                "content": prompt
-            }
-        ],
-        "temperature": 0.1,
-        "max_tokens": 50
-    }
+    messages = [
+        {
+            "role": "system", 
+            "content": "You are an expert research assistant. Extract precise academic search terms that would return highly relevant research papers."
+        },
+        {
+            "role": "user", 
+            "content": prompt
+        }
+    ]
 
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=15)
-        if response.status_code == 200:
-            content = response.json()["choices"][0]["message"]["content"].strip()
-            # Clean up the response
-            terms = [term.strip().strip('"').strip("'") for term in content.split(",")]
-            clean_terms = []
-            for term in terms:
-                if (term and len(term) > 2 and not term.isdigit() and 
-                    not term.startswith("Here") and not term.lower() in ['the', 'and', 'for']):
-                    clean_terms.append(term)
-            
-            if clean_terms:
-                return clean_terms[:5]
-    except Exception as e:
+        content = await chat_completion(
+            messages, model="llama3-8b-8192", temperature=0.1, max_tokens=50, timeout=15,
+            priority=PRIORITY_SEARCH_TERMS
+        )
+        # Clean up the response
+        terms = [term.strip().strip('"').strip("'") for term in content.strip().split(",")]
+        clean_terms = []
+        for term in terms:
+            if (term and len(term) > 2 and not term.isdigit() and 
+                not term.startswith("Here") and not term.lower() in ['the', 'and', 'for']):
+                clean_terms.append(term)
+        
+        if clean_terms:
+            return clean_terms[:5]
+    except GroqError as e:
         print(f"Error generating search terms with Groq: {e}")
     
-    # Fallback to the enhanced method
-    return generate_search_terms.fallback(idea)
-import asyncio
-import httpx
-from typing import List, Optional
-import xml.etree.ElementTree as ET
-import re
-from datetime import datetime
+    # Fallback to the local extractor
+    return local_terms
 
 async def fetch_semantic_scholar(search_terms: List[str], max_results: int) -> List[ResearchPaper]:
     """Fetch papers from Semantic Scholar with improved error handling"""
@@ -271,45 +312,46 @@ async def fetch_semantic_scholar(search_terms: List[str], max_results: int) -> L
         if SEMANTIC_SCHOLAR_API_KEY:
             headers["x-api-key"] = SEMANTIC_SCHOLAR_API_KEY
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        client = get_client("semantic_scholar")
+        async with source_guards["semantic_scholar"].request() as guard:
             response = await client.get(SEMANTIC_SCHOLAR_API, params=params, headers=headers)
-            
-            if response.status_code != 200:
-                print(f"Semantic Scholar error {response.status_code}: {response.text[:200]}")
-                return []
-            
-            data = response.json()
-            papers = []
-            
-            for item in data.get("data", []):
-                try:
-                    title = item.get("title", "").strip()
-                    if not title:
-                        continue
-                        
-                    authors = [author.get("name", "") for author in item.get("authors", [])]
-                    abstract = (item.get("abstract") or "")[:500] + "..." if item.get("abstract") else "No abstract available"
-                    
-                    papers.append(ResearchPaper(
-                        title=title,
-                        authors=authors,
-                        abstract=abstract,
-                        published_date=str(item.get("year", "")),
-                        source="Semantic Scholar",
-                        url=item.get("url", ""),
-                        doi=item.get("externalIds", {}).get("DOI")
-                    ))
-                except Exception as e:
-                    print(f"Error processing Semantic Scholar paper: {e}")
+            guard.record_response(response)
+
+        if response.status_code != 200:
+            print(f"Semantic Scholar error {response.status_code}: {response.text[:200]}")
+            return []
+
+        data = response.json()
+        papers = []
+
+        for item in data.get("data", []):
+            try:
+                title = item.get("title", "").strip()
+                if not title:
                     continue
-                    
-            return papers
+
+                authors = [author.get("name", "") for author in item.get("authors", [])]
+                abstract = (item.get("abstract") or "")[:500] + "..." if item.get("abstract") else "No abstract available"
+
+                papers.append(ResearchPaper(
+                    title=title,
+                    authors=authors,
+                    abstract=abstract,
+                    published_date=str(item.get("year", "")),
+                    source="Semantic Scholar",
+                    url=item.get("url", ""),
+                    doi=(item.get("externalIds") or {}).get("DOI"),
+                    citation_count=item.get("citationCount")
+                ))
+            except Exception as e:
+                print(f"Error processing Semantic Scholar paper: {e}")
+                continue
+
+        return papers
             
     except Exception as e:
         print(f"Semantic Scholar fetch failed: {e}")
         return []
-ARXIV_API = "https://export.arxiv.org/api/query"
-
 async def fetch_arxiv(search_terms: List[str], max_results: int) -> List[ResearchPaper]:
     """Fetch papers from arXiv with query mapping + fallback"""
     try:
@@ -330,76 +372,49 @@ async def fetch_arxiv(search_terms: List[str], max_results: int) -> List[Researc
             "User-Agent": "Research-Advisor-API/1.0 (contact@researchadvisor.com)"
         }
 
-        async with httpx.AsyncClient(timeout=45.0, follow_redirects=True) as client:
-            response = await client.get(ARXIV_API, params=params, headers=headers)
-            print("arXiv query:", params["search_query"])  # debug line
-
-            if response.status_code != 200:
-                print(f"arXiv error {response.status_code}: {response.text[:200]}")
-                return []
-
-            papers = parse_arxiv_response(response.text, max_results)
+        client = get_client("arxiv")
+        print("arXiv query:", params["search_query"])  # debug line
+        papers = await stream_arxiv_papers(client, params, headers, max_results)
+        if papers is None:
+            return []
 
-            # --- Step 3: Fallback if nothing found ---
-            if not papers:
-                print("No arXiv results → retrying with fallback terms...")
-                fallback_terms = ["optimization", "reinforcement learning", "machine learning"]
-                query = "+OR+".join([f'all:{t}' for t in fallback_terms])
-                params["search_query"] = query
-                response = await client.get(ARXIV_API, params=params, headers=headers)
-                print("arXiv fallback query:", params["search_query"])
-                if response.status_code == 200:
-                    papers = parse_arxiv_response(response.text, max_results)
+        # --- Step 3: Fallback if nothing found ---
+        if not papers:
+            print("No arXiv results → retrying with fallback terms...")
+            fallback_terms = ["optimization", "reinforcement learning", "machine learning"]
+            query = "+OR+".join([f'all:{t}' for t in fallback_terms])
+            params["search_query"] = query
+            print("arXiv fallback query:", params["search_query"])
+            papers = await stream_arxiv_papers(client, params, headers, max_results) or []
 
-            return papers[:max_results]
+        return papers[:max_results]
 
     except Exception as e:
         print(f"arXiv fetch failed: {e}")
         return []
 
 
-def parse_arxiv_response(xml_text: str, max_results: int) -> List[ResearchPaper]:
-    """Helper to parse arXiv XML into ResearchPaper objects"""
-    root = ET.fromstring(xml_text)
-    papers = []
+async def stream_arxiv_papers(client: httpx.AsyncClient, params: dict, headers: dict, max_results: int) -> Optional[List[ResearchPaper]]:
+    """Parse the arXiv feed while it downloads and stop reading once max_results entries are in"""
+    async with source_guards["arxiv"].request() as guard, \
+            client.stream("GET", ARXIV_API, params=params, headers=headers) as response:
+        guard.record_response(response)
+        if response.status_code != 200:
+            await response.aread()
+            print(f"arXiv error {response.status_code}: {response.text[:200]}")
+            return None
 
-    # ✅ Use raw namespace, no "atom:" prefix
-    for entry in root.findall('{http://www.w3.org/2005/Atom}entry'):
-        try:
-            title_elem = entry.find('{http://www.w3.org/2005/Atom}title')
-            title = title_elem.text.strip() if title_elem is not None else "No title"
-
-            summary_elem = entry.find('{http://www.w3.org/2005/Atom}summary')
-            abstract = summary_elem.text.strip() if summary_elem is not None else "No abstract available"
-            if len(abstract) > 500:
-                abstract = abstract[:500] + "..."
-
-            authors = []
-            for author_elem in entry.findall('{http://www.w3.org/2005/Atom}author'):
-                name_elem = author_elem.find('{http://www.w3.org/2005/Atom}name')
-                if name_elem is not None and name_elem.text:
-                    authors.append(name_elem.text.strip())
-
-            published_elem = entry.find('{http://www.w3.org/2005/Atom}published')
-            published_date = published_elem.text if published_elem is not None else ""
-
-            id_elem = entry.find('{http://www.w3.org/2005/Atom}id')
-            url = id_elem.text if id_elem is not None else ""
-
-            papers.append(ResearchPaper(
-                title=title,
-                authors=authors,
-                abstract=abstract,
-                published_date=published_date,
-                source="arXiv",
-                url=url
-            ))
+        parser = ArxivFeedParser(max_results)
+        async for chunk in response.aiter_bytes():
+            if parser.feed(chunk):
+                break
+        return [ResearchPaper(**entry) for entry in parser.close()]
 
-        except Exception as e:
-            print(f"Error processing arXiv entry: {e}")
-            continue
 
-    return papers[:max_results]
+def parse_arxiv_response(xml_text: str, max_results: int) -> List[ResearchPaper]:
+    """Helper to parse arXiv XML into ResearchPaper objects"""
+    entries = parse_feed_incremental([xml_text.encode("utf-8")], max_results)
+    return [ResearchPaper(**entry) for entry in entries]
 
 
 async def fetch_crossref(search_terms: List[str], max_results: int) -> List[ResearchPaper]:
@@ -410,141 +425,313 @@ async def fetch_crossref(search_terms: List[str], max_results: int) -> List[Rese
             "query": query,
             "rows": min(max_results, 20),
             "sort": "relevance",
-            "select": "title,author,abstract,created,URL,DOI,published-print,published-online"
+            "select": "title,author,abstract,created,URL,DOI,published-print,published-online,is-referenced-by-count"
         }
         
         headers = {
             "User-Agent": "Research-Advisor-API/1.0 (mailto:contact@researchadvisor.com)"
         }
         
-        async with httpx.AsyncClient(timeout=45.0) as client:
+        client = get_client("crossref")
+        async with source_guards["crossref"].request() as guard:
             response = await client.get(CROSSREF_API, params=params, headers=headers)
+            guard.record_response(response)
+        
+        if response.status_code != 200:
+            print(f"CrossRef error {response.status_code}: {response.text[:200]}")
+            return []
             
-            if response.status_code != 200:
-                print(f"CrossRef error {response.status_code}: {response.text[:200]}")
-                return []
-                
-            data = response.json()
-            papers = []
-            
-            for item in data.get("message", {}).get("items", []):
-                try:
-                    # Handle title (can be a list)
-                    title_list = item.get("title", [])
-                    title = " ".join(title_list) if isinstance(title_list, list) else str(title_list)
-                    title = title.strip()
-                    if not title:
-                        continue
-                    
-                    # Handle abstract
-                    abstract = item.get("abstract", "")
-                    if not abstract:
-                        abstract = "No abstract available"
-                    if len(abstract) > 500:
-                        abstract = abstract[:500] + "..."
-                    
-                    # Handle authors
-                    authors = []
-                    for author in item.get("author", []):
-                        given = author.get("given", "")
-                        family = author.get("family", "")
-                        author_name = f"{given} {family}".strip()
-                        if author_name:
-                            authors.append(author_name)
-                    
-                    # Handle publication date
-                    pub_date = ""
-                    date_fields = ["published-print", "published-online", "created"]
-                    for field in date_fields:
-                        if field in item and "date-parts" in item[field]:
-                            date_parts = item[field]["date-parts"][0]
-                            if date_parts:
-                                pub_date = "-".join(str(part) for part in date_parts[:3])
-                                break
-                    
-                    papers.append(ResearchPaper(
-                        title=title,
-                        authors=authors,
-                        abstract=abstract,
-                        published_date=pub_date,
-                        source="CrossRef",
-                        url=item.get("URL", ""),
-                        doi=item.get("DOI")
-                    ))
-                    
-                except Exception as e:
-                    print(f"Error processing CrossRef item: {e}")
+        data = response.json()
+        papers = []
+        
+        for item in data.get("message", {}).get("items", []):
+            try:
+                # Handle title (can be a list)
+                title_list = item.get("title", [])
+                title = " ".join(title_list) if isinstance(title_list, list) else str(title_list)
+                title = title.strip()
+                if not title:
                     continue
-                    
-            return papers
-            
+                
+                # Handle abstract
+                abstract = item.get("abstract", "")
+                if not abstract:
+                    abstract = "No abstract available"
+                if len(abstract) > 500:
+                    abstract = abstract[:500] + "..."
+                
+                # Handle authors
+                authors = []
+                for author in item.get("author", []):
+                    given = author.get("given", "")
+                    family = author.get("family", "")
+                    author_name = f"{given} {family}".strip()
+                    if author_name:
+                        authors.append(author_name)
+                
+                # Handle publication date
+                pub_date = ""
+                date_fields = ["published-print", "published-online", "created"]
+                for field in date_fields:
+                    if field in item and "date-parts" in item[field]:
+                        date_parts = item[field]["date-parts"][0]
+                        if date_parts:
+                            pub_date = "-".join(str(part) for part in date_parts[:3])
+                            break
+                
+                papers.append(ResearchPaper(
+                    title=title,
+                    authors=authors,
+                    abstract=abstract,
+                    published_date=pub_date,
+                    source="CrossRef",
+                    url=item.get("URL", ""),
+                    doi=item.get("DOI"),
+                    citation_count=item.get("is-referenced-by-count")
+                ))
+                
+            except Exception as e:
+                print(f"Error processing CrossRef item: {e}")
+                continue
+                
+        return papers
+        
     except Exception as e:
         print(f"CrossRef fetch failed: {e}")
         return []
 
-@app.post("/research-papers", response_model=ResearchResponse)
-async def get_research_papers(request: ResearchRequest, current_user=Depends(get_current_user)):
-    """Enhanced research papers endpoint enforcing ~15 results (5 from each source)"""
+# Research result cache: in-process LRU in front of the MongoDB "cache" collection
+RESEARCH_CACHE_MAX_ENTRIES = int(os.getenv("RESEARCH_CACHE_MAX_ENTRIES", "512"))
+RESEARCH_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESEARCH_CACHE_MAX_ENTRY_BYTES", "200000"))
+RESEARCH_CACHE_FRESH_SECONDS = float(os.getenv("RESEARCH_CACHE_FRESH_SECONDS", "21600"))
+RESEARCH_CACHE_STALE_SECONDS = float(os.getenv("RESEARCH_CACHE_STALE_SECONDS", "604800"))
+
+research_cache = TwoTierCache(
+    "research",
+    cache_collection,
+    max_entries=RESEARCH_CACHE_MAX_ENTRIES,
+    max_entry_bytes=RESEARCH_CACHE_MAX_ENTRY_BYTES,
+    fresh_seconds=RESEARCH_CACHE_FRESH_SECONDS,
+    stale_seconds=RESEARCH_CACHE_STALE_SECONDS,
+)
+
+def research_cache_key(search_terms: List[str], per_source: int) -> str:
+    """Cache key from the normalized, sorted search-term set and per-source count"""
+    terms = sorted({" ".join(term.lower().split()) for term in search_terms if term.strip()})
+    raw = json.dumps({"terms": terms, "per_source": per_source})
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+RESEARCH_SOURCES = {
+    "semantic_scholar": fetch_semantic_scholar,
+    "arxiv": fetch_arxiv,
+    "crossref": fetch_crossref,
+}
+
+# Identical concurrent calls share one upstream request. Source and search-term
+# results are only useful to the requests waiting on them, so those flights
+# stop when every waiter has gone.
+search_terms_flight = SingleFlight("search_terms", cancel_when_abandoned=True)
+source_flight = SingleFlight("research_sources", cancel_when_abandoned=True)
+validation_flight = SingleFlight("validation")
+
+async def fetch_source(name: str, search_terms: List[str], per_source: int) -> List[ResearchPaper]:
+    """Fetch one source, coalesced with identical in-flight fetches"""
+    key = (name, tuple(normalize_text_key(term) for term in search_terms), per_source)
+    papers = await source_flight.do(key, lambda: RESEARCH_SOURCES[name](search_terms, per_source))
+    # Dedup and ranking mutate papers, so every waiter gets its own copies
+    return [paper.copy() for paper in papers]
+
+async def search_sources(
+    search_terms: List[str],
+    per_source: int,
+    timeout: Optional[float] = None
+) -> Tuple[List[ResearchPaper], List[str]]:
+    """Query all sources concurrently; returns (deduplicated papers, sources cut off by the timeout)"""
+    tasks = {
+        name: asyncio.create_task(fetch_source(name, search_terms, per_source))
+        for name in RESEARCH_SOURCES
+    }
+    done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+    for task in pending:
+        task.cancel()
+
+    timed_out = [name for name, task in tasks.items() if task in pending]
+    results = {}
+    for name, task in tasks.items():
+        if task in pending:
+            results[name] = []
+        elif task.exception() is not None:
+            print(f"{name} failed: {task.exception()}")
+            results[name] = []
+        else:
+            results[name] = task.result()
+
+    print(f"Results - Semantic: {len(results['semantic_scholar'])}, arXiv: {len(results['arxiv'])}, "
+          f"CrossRef: {len(results['crossref'])}, timed out: {timed_out}")
+
+    all_papers = [paper for papers in results.values() for paper in papers]
+    return dedupe_papers(all_papers), timed_out
+
+async def _load_research_dicts(search_terms: List[str], per_source: int) -> List[dict]:
+    papers, _ = await search_sources(search_terms, per_source)
+    store_papers_in_background(papers)
+    return [paper.dict() for paper in papers]
+
+# Local corpus answers a request on its own when it has enough good matches.
+# $text ORs the query words (a single shared title word scores ~10), so the
+# text score only preselects candidates; a match must also contain at least
+# RESEARCH_LOCAL_MIN_COVERAGE of the search-term tokens.
+RESEARCH_LOCAL_MIN_RECALL = float(os.getenv("RESEARCH_LOCAL_MIN_RECALL", "1.0"))
+RESEARCH_LOCAL_MIN_SCORE = float(os.getenv("RESEARCH_LOCAL_MIN_SCORE", "1.0"))
+RESEARCH_LOCAL_MIN_COVERAGE = float(os.getenv("RESEARCH_LOCAL_MIN_COVERAGE", "0.75"))
+RESEARCH_LOCAL_CANDIDATES = int(os.getenv("RESEARCH_LOCAL_CANDIDATES", "3"))  # x limit
+
+def local_recall_target(max_results: int) -> int:
+    return max(1, int(max_results * RESEARCH_LOCAL_MIN_RECALL + 0.5))
+
+async def search_local_corpus(
+    search_terms: List[str],
+    limit: int,
+    timeout: Optional[float] = None
+) -> List[ResearchPaper]:
+    """Well-covered matches from the local paper corpus, best first; [] if it is unavailable or too slow"""
+    try:
+        docs = await asyncio.wait_for(
+            search_papers(search_terms, limit * RESEARCH_LOCAL_CANDIDATES, RESEARCH_LOCAL_MIN_SCORE),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        print("Local corpus search exceeded the research budget")
+        return []
+    except errors.PyMongoError as e:
+        print(f"Local corpus search failed: {e}")
+        return []
+    papers = [ResearchPaper(**{field: doc.get(field) for field in PAPER_FIELDS}) for doc in docs]
+    coverage = term_coverage(papers, search_terms)
+    covered = [paper for paper, share in zip(papers, coverage) if share >= RESEARCH_LOCAL_MIN_COVERAGE]
+    return rank_papers(covered, search_terms)[:limit]
+
+_background_tasks = set()
+
+def run_in_background(coro):
+    """Fire-and-forget task that is kept referenced until it finishes"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+def store_papers_in_background(papers: List[ResearchPaper]):
+    if papers:
+        run_in_background(store_papers(papers))
+
+async def cached_search_sources(
+    search_terms: List[str],
+    per_source: int,
+    max_results: int,
+    timeout: Optional[float] = None
+) -> Tuple[List[ResearchPaper], List[str]]:
+    """Research cache, then the local corpus, then the external sources"""
+    timed_out = []
+    answered_locally = False
+
+    async def load():
+        nonlocal answered_locally, timeout
+        started = asyncio.get_running_loop().time()
+        local_papers = await search_local_corpus(search_terms, max_results, timeout)
+        if len(local_papers) >= local_recall_target(max_results):
+            print(f"Local corpus answered {search_terms} with {len(local_papers)} papers")
+            answered_locally = True
+            return [paper.dict() for paper in local_papers]
+        if timeout is not None:
+            timeout = max(0.0, timeout - (asyncio.get_running_loop().time() - started))
+
+        papers, cut_off = await search_sources(search_terms, per_source, timeout)
+        timed_out.extend(cut_off)
+        store_papers_in_background(papers)
+        return [paper.dict() for paper in papers]
+
+    cached, state = await research_cache.get_or_load(
+        research_cache_key(search_terms, per_source),
+        load,
+        # Partial results and local-corpus answers are returned but never cached
+        cache_if=lambda papers: bool(papers) and not timed_out and not answered_locally,
+        # Background refreshes run without the request budget so complete results get cached
+        refresh_loader=lambda: _load_research_dicts(search_terms, per_source),
+    )
+    print(f"Research cache {state} for {search_terms}")
+    return [ResearchPaper(**paper) for paper in cached], timed_out
+
+# End-to-end latency budget for a research request (search terms + all sources)
+RESEARCH_BUDGET_SECONDS = float(os.getenv("RESEARCH_BUDGET_SECONDS", "3"))
+# Search-term generation may use at most this share of the budget, and never
+# the last RESEARCH_MIN_SOURCE_SECONDS, so the sources (or the keyword
+# fallback) always get searched.
+RESEARCH_TERMS_BUDGET_FRACTION = float(os.getenv("RESEARCH_TERMS_BUDGET_FRACTION", "0.3"))
+RESEARCH_MIN_SOURCE_SECONDS = float(os.getenv("RESEARCH_MIN_SOURCE_SECONDS", "1"))
+
+def research_deadline(request: ResearchRequest, default_budget: Optional[float] = None) -> float:
+    budget = request.budget_seconds or default_budget or RESEARCH_BUDGET_SECONDS
+    return asyncio.get_running_loop().time() + budget
+
+def time_left(deadline: float) -> float:
+    return max(0.0, deadline - asyncio.get_running_loop().time())
+
+async def budgeted_search_terms(idea: str, deadline: float) -> Tuple[List[str], bool]:
+    """generate_search_terms bounded by its share of the request budget; returns (terms, timed_out)"""
+    budget = time_left(deadline)
+    terms_timeout = max(0.0, min(budget * RESEARCH_TERMS_BUDGET_FRACTION, budget - RESEARCH_MIN_SOURCE_SECONDS))
+    timed_out = False
+    try:
+        search_terms = await asyncio.wait_for(
+            search_terms_flight.do(
+                normalize_text_key(idea),
+                lambda: generate_search_terms(idea)
+            ),
+            timeout=terms_timeout
+        )
+    except asyncio.TimeoutError:
+        print("Search term generation exceeded the research budget, using local keywords")
+        search_terms, timed_out = extract_keywords(idea), True
+    if not search_terms:
+        search_terms = re.findall(r'\w{4,}', idea)[:3]  # Fallback
+    return search_terms, timed_out
+
+async def research_papers_for(request: ResearchRequest, default_budget: Optional[float] = None) -> ResearchResponse:
+    """Search terms, sources and ranking for one research request (~5 results per source).
+
+    default_budget replaces RESEARCH_BUDGET_SECONDS when the request sets no budget.
+    """
     print(f"Research request received: {request.idea[:50]}...")
 
     if not request.idea or not request.idea.strip():
         raise HTTPException(status_code=400, detail="Idea cannot be empty")
 
     try:
+        deadline = research_deadline(request, default_budget)
+
         # Generate search terms
-        search_terms = generate_search_terms(request.idea)
-        if not search_terms:
-            search_terms = re.findall(r'\w{4,}', request.idea)[:3]  # Fallback
+        search_terms, terms_timed_out = await budgeted_search_terms(request.idea, deadline)
 
         print(f"Search terms: {search_terms}")
 
         # We want 5 per source → total 15
         per_source = max(1, request.max_results // 3)
 
-        try:
-            semantic_task = asyncio.create_task(fetch_semantic_scholar(search_terms, per_source))
-            arxiv_task = asyncio.create_task(fetch_arxiv(search_terms, per_source))
-            crossref_task = asyncio.create_task(fetch_crossref(search_terms, per_source))
-
-            semantic_papers, arxiv_papers, crossref_papers = await asyncio.gather(
-                semantic_task, arxiv_task, crossref_task,
-                return_exceptions=True
-            )
-
-            if isinstance(semantic_papers, Exception):
-                print(f"Semantic Scholar failed: {semantic_papers}")
-                semantic_papers = []
-            if isinstance(arxiv_papers, Exception):
-                print(f"arXiv failed: {arxiv_papers}")
-                arxiv_papers = []
-            if isinstance(crossref_papers, Exception):
-                print(f"CrossRef failed: {crossref_papers}")
-                crossref_papers = []
-
-        except asyncio.TimeoutError:
-            print("Timeout fetching papers from all sources")
-            semantic_papers, arxiv_papers, crossref_papers = [], [], []
-
-        print(f"Results - Semantic: {len(semantic_papers)}, arXiv: {len(arxiv_papers)}, CrossRef: {len(crossref_papers)}")
-
-        # Combine & deduplicate
-        all_papers = semantic_papers + arxiv_papers + crossref_papers
-        seen_titles = set()
-        unique_papers = []
-        for paper in all_papers:
-            normalized_title = paper.title.lower().strip()
-            if normalized_title and normalized_title not in seen_titles:
-                seen_titles.add(normalized_title)
-                unique_papers.append(paper)
+        unique_papers, timed_out_sources = await cached_search_sources(
+            search_terms, per_source, request.max_results, timeout=time_left(deadline)
+        )
 
-        # Limit to requested max (default 15)
-        final_papers = unique_papers[:request.max_results]
+        # Rank, then limit to requested max (default 15)
+        ranked_papers = rank_papers(unique_papers, search_terms, request.min_relevance)
+        final_papers = ranked_papers[:request.max_results]
 
         print(f"Final papers: {len(final_papers)}")
 
         return ResearchResponse(
             papers=final_papers,
-            search_terms=search_terms
+            search_terms=search_terms,
+            partial=terms_timed_out or bool(timed_out_sources),
+            timed_out_sources=timed_out_sources
         )
 
     except Exception as e:
@@ -553,125 +740,183 @@ async def get_research_papers(request: ResearchRequest, current_user=Depends(get
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Failed to fetch research papers: {str(e)}")
 
-    """
-    Check if a paper is relevant based on its abstract and search terms
-    """
-    if not abstract or not search_terms:
-        return True  # Default to including if we can't determine
-        
-    abstract_lower = abstract.lower()
-    term_matches = 0
-    
-    for term in search_terms:
-        term_lower = term.lower()
-        # Check for exact matches or close matches
-        if term_lower in abstract_lower:
-            term_matches += 1
-        # Also check for word boundaries for better matching
-        elif re.search(r'\b' + re.escape(term_lower) + r'\b', abstract_lower):
-            term_matches += 1
-    
-    # Consider paper relevant if at least one search term matches
-    # or if it's from a short list of terms, require more matches
-    if len(search_terms) <= 3:
-        return term_matches >= 1
-    else:
-        return term_matches >= 2
-from typing import List, Optional
-import datetime
-from pymongo import MongoClient
-from pymongo.errors import PyMongoError
-
-# MongoDB Configuration
-MONGODB_URI = "mongodb://localhost:27017/"  # Default local connection
-DATABASE_NAME = "research"                  # As seen in your Compass screenshot
-COLLECTION_NAME = "papers"                  # Customizable collection name
+@app.post("/research-papers", response_model=ResearchResponse)
+async def get_research_papers(request: ResearchRequest, current_user=Depends(get_current_user)):
+    """Enhanced research papers endpoint enforcing ~15 results (5 from each source)"""
+    return await research_papers_for(request)
+
+@app.post("/research-papers/stream")
+async def stream_research_papers(
+    request: ResearchRequest,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    current_user=Depends(get_current_user)
+):
+    """Streaming variant of /research-papers: one frame per source as soon as it finishes"""
+    if not request.idea or not request.idea.strip():
+        raise HTTPException(status_code=400, detail="Idea cannot be empty")
+
+    deadline = research_deadline(request)
+    search_terms, terms_timed_out = await budgeted_search_terms(request.idea, deadline)
+    per_source = max(1, request.max_results // 3)
+    cache_key = research_cache_key(search_terms, per_source)
+
+    async def run_source(name):
+        try:
+            return name, await fetch_source(name, search_terms, per_source)
+        except Exception as e:
+            print(f"{name} failed: {e}")
+            return name, []
+
+    async def frames():
+        yield encode_frame({"type": "search_terms", "search_terms": search_terms}, format)
+
+        cached, state = await research_cache.get(cache_key)
+        if state != "miss":
+            if state == "stale":
+                research_cache.refresh_in_background(
+                    cache_key,
+                    lambda: _load_research_dicts(search_terms, per_source)
+                )
+            ranked = rank_papers([ResearchPaper(**paper) for paper in cached], search_terms, request.min_relevance)
+            papers = [paper.dict() for paper in ranked[:request.max_results]]
+            yield encode_frame({"type": "papers", "source": "cache", "papers": papers}, format)
+            yield encode_frame({
+                "type": "summary",
+                "search_terms": search_terms,
+                "counts": {"cache": len(papers)},
+                "total": len(papers),
+                "papers": papers,
+                "cached": True,
+                "partial": terms_timed_out,
+                "timed_out_sources": []
+            }, format)
+            return
+
+        local_papers = await search_local_corpus(search_terms, request.max_results, time_left(deadline))
+        if len(local_papers) >= local_recall_target(request.max_results):
+            local_papers = rank_papers(local_papers, search_terms, request.min_relevance)
+            yield encode_frame({
+                "type": "papers",
+                "source": "local",
+                "papers": [paper.dict() for paper in local_papers]
+            }, format)
+            yield encode_frame({
+                "type": "summary",
+                "search_terms": search_terms,
+                "counts": {"local": len(local_papers)},
+                "total": len(local_papers),
+                "papers": [paper.dict() for paper in local_papers],
+                "cached": False,
+                "partial": terms_timed_out,
+                "timed_out_sources": []
+            }, format)
+            return
+
+        tasks = {
+            asyncio.create_task(run_source(name)): name
+            for name in RESEARCH_SOURCES
+        }
+        deduper = PaperDeduper()
+        counts = {}
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=time_left(deadline)):
+                name, papers = await next_done
+                fresh = [paper for paper in papers if deduper.add(paper)]
+                # Each frame is ranked on its own; the summary carries the merged, ranked list
+                fresh = rank_papers(fresh, search_terms, request.min_relevance)
+                counts[name] = len(fresh)
+                yield encode_frame({
+                    "type": "papers",
+                    "source": name,
+                    "papers": [paper.dict() for paper in fresh]
+                }, format)
+        except asyncio.TimeoutError:
+            print("Research budget exhausted, returning partial stream")
+        finally:
+            # Budget exhausted or client went away: stop the remaining upstream calls
+            for task in tasks:
+                task.cancel()
+
+        timed_out_sources = [name for name in RESEARCH_SOURCES if name not in counts]
+        unique_papers = deduper.papers
+        store_papers_in_background(unique_papers)
+        if unique_papers and not timed_out_sources:
+            await research_cache.set(cache_key, [paper.dict() for paper in unique_papers])
+
+        # Final merged list in global rank order; clients replace the streamed list with it
+        ranked = rank_papers(list(unique_papers), search_terms, request.min_relevance)[:request.max_results]
+        yield encode_frame({
+            "type": "summary",
+            "search_terms": search_terms,
+            "counts": counts,
+            "total": len(ranked),
+            "papers": [paper.dict() for paper in ranked],
+            "cached": False,
+            "partial": terms_timed_out or bool(timed_out_sources),
+            "timed_out_sources": timed_out_sources
+        }, format)
+
+    return StreamingResponse(frames(), media_type=media_type_for(format), headers=STREAM_HEADERS)
 
 async def store_papers(papers: List[ResearchPaper]) -> bool:
-    """Store papers in MongoDB with error handling"""
+    """Upsert papers into the local corpus (keyed by DOI or title hash)"""
     try:
-        client = MongoClient(MONGODB_URI)
-        db = client[DATABASE_NAME]
-        collection = db[COLLECTION_NAME]
-        
-        documents = [{
-            "title": paper.title,
-            "authors": paper.authors,
-            "abstract": paper.abstract,
-            "published_date": paper.published_date,
-            "source": paper.source,
-            "url": paper.url,
-            "doi": paper.doi,
-            "timestamp": datetime.datetime.now()
-        } for paper in papers]
-        
-        if documents:
-            result = collection.insert_many(documents)
-            print(f"📀 Stored {len(result.inserted_ids)} papers in MongoDB")
-            return True
-        return False
-        
-    except PyMongoError as e:
+        stored = await upsert_papers([paper.dict() for paper in papers])
+        print(f"📀 Stored {stored} papers in the local corpus")
+        return stored > 0
+    except errors.PyMongoError as e:
         print(f"❌ MongoDB storage error: {e}")
         return False
-    finally:
-        client.close()
 
 async def fetch_papers(
     search_terms: List[str],
-    max_results: int = 15,
-    store: bool = False
+    max_results: int = 15
 ) -> List[ResearchPaper]:
     """
     Unified fetch function ensuring ~15 results (5 from each source).
+    Papers fetched from the sources are upserted into the local corpus by cached_search_sources.
     """
 
     per_source = max_results // 3  # e.g. 15 // 3 = 5
 
-    # Fetch concurrently
-    semantic, arxiv, crossref = await asyncio.gather(
-        fetch_semantic_scholar(search_terms, per_source),
-        fetch_arxiv(search_terms, per_source),
-        fetch_crossref(search_terms, per_source)
-    )
-
-    all_papers = semantic + arxiv + crossref
-
-    # Deduplicate by title
-    seen_titles = set()
-    unique_papers = []
-    for paper in all_papers:
-        title_norm = paper.title.strip().lower()
-        if title_norm and title_norm not in seen_titles:
-            seen_titles.add(title_norm)
-            unique_papers.append(paper)
+    unique_papers, _ = await cached_search_sources(search_terms, per_source, max_results)
 
-    # Limit to max_results (default 15)
-    final_papers = unique_papers[:max_results]
+    # Rank, then limit to max_results (default 15)
+    final_papers = rank_papers(unique_papers, search_terms)[:max_results]
 
-    # Optional: store in MongoDB
-    if store and final_papers:
-        await store_papers(final_papers)
-
-    print(f"✅ Returning {len(final_papers)} papers "
-          f"(Semantic: {len(semantic)}, arXiv: {len(arxiv)}, CrossRef: {len(crossref)})")
+    print(f"✅ Returning {len(final_papers)} papers")
 
     return final_papers
 
+def hasher_busy(e: PasswordHasherBusy) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Too many sign-in requests, please retry shortly",
+        headers={"Retry-After": str(int(e.retry_after))}
+    )
+
 @app.post("/register", status_code=status.HTTP_201_CREATED)
-def register(user: RegisterIn):
+async def register(user: RegisterIn):
     if user.password != user.confirm_password:
         raise HTTPException(status_code=400, detail="Passwords do not match")
 
-    hashed = hash_password(user.password)
+    email = user.email.lower()
+    # Check before hashing so duplicate sign-ups cost no bcrypt work
+    if await async_database.users_collection.find_one({"email": email}, {"_id": 1}):
+        raise HTTPException(status_code=400, detail="Email already registered")
+
+    try:
+        hashed = await password_hasher.hash(user.password)
+    except PasswordHasherBusy as e:
+        raise hasher_busy(e)
     doc = {
         "name": user.name,
-        "email": user.email.lower(),
+        "email": email,
         "password_hash": hashed,
         "created_at": datetime.utcnow()
     }
     try:
-        res = users_collection.insert_one(doc)
+        res = await async_database.users_collection.insert_one(doc)
         return {"id": str(res.inserted_id), "email": user.email}
     except errors.DuplicateKeyError:
         raise HTTPException(status_code=400, detail="Email already registered")
@@ -679,102 +924,115 @@ def register(user: RegisterIn):
         raise HTTPException(status_code=500, detail="Registration failed")
 
 @app.post("/login", response_model=TokenOut)
-def login(credentials: LoginIn):
-    user = users_collection.find_one({"email": credentials.email.lower()})
-    if not user or not verify_password(credentials.password, user["password_hash"]):
+async def login(credentials: LoginIn):
+    user = await async_database.users_collection.find_one({"email": credentials.email.lower()})
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        valid, new_hash = await password_hasher.verify(credentials.password, user["password_hash"])
+    except PasswordHasherBusy as e:
+        raise hasher_busy(e)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made: store one at the new cost
+        await async_database.users_collection.update_one(
+            {"_id": user["_id"], "password_hash": user["password_hash"]},
+            {"$set": {"password_hash": new_hash}}
+        )
+        await invalidate_principal(user["_id"])
 
     role = "developer" if credentials.email.lower() in DEVELOPER_EMAILS else "user"
-    token = create_access_token_helper(subject=str(user["_id"]), role=role)
+    token = create_access_token_helper(subject=str(user["_id"]), role=role, email=user["email"])
     return {"access_token": token}
 
-from datetime import datetime
-from fastapi import Depends, HTTPException
-from bson import ObjectId
+DASHBOARD_PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", "100"))
+DASHBOARD_MAX_PAGE_SIZE = int(os.getenv("DASHBOARD_MAX_PAGE_SIZE", "1000"))
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime) else None
+
+def dashboard_user(doc: dict) -> dict:
+    profile = doc.get("profile") or {}
+    return {
+        "id": str(doc["_id"]),
+        "name": doc.get("name", "Unknown"),
+        "email": doc.get("email", ""),
+        "created_at": _iso(doc.get("created_at")) or datetime.utcnow().isoformat(),
+        "profile_data": {
+            "skills": profile.get("skills", []),
+            "interests": profile.get("interests", []),
+            "experience": profile.get("experience", ""),
+            "availability": profile.get("availability", ""),
+            "location": profile.get("location", ""),
+            "updated_at": _iso(profile.get("updated_at"))
+        },
+        "validation_history": [
+            {
+                "prompt": v.get("prompt"),
+                "validation": v.get("validation"),
+                "created_at": _iso(v.get("created_at"))
+            } for v in doc.get("validations", [])
+        ],
+        "validation_count": doc.get("validation_count", len(doc.get("validations", [])))
+    }
 
 @app.get("/dashboard-data")
-def get_dashboard_data(current_user=Depends(get_current_user)):
+async def get_dashboard_data(
+    limit: int = Query(DASHBOARD_PAGE_SIZE, ge=1, le=DASHBOARD_MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    skills: Optional[List[str]] = Query(None),
+    interests: Optional[List[str]] = Query(None),
+    location: Optional[str] = Query(None),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    current_user=Depends(get_current_user)
+):
+    """One page of non-developer users with profile and last 10 validations.
+
+    Served by a single aggregation ($lookup on profiles and ideas) and
+    streamed as it is read: {"users": [...], "next_cursor": "<id>" | null}.
+    Pass next_cursor back as `after` for the following page.
+    """
     # First verify developer access
     if current_user.get("email") != "ry352004@gmail.com":
         raise HTTPException(
             status_code=403,
             detail="Access forbidden. Only ry352004@gmail.com can access this endpoint."
         )
+    if after is not None and not ObjectId.is_valid(after):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    cursor = async_database.iter_dashboard_users(
+        limit,
+        exclude_emails=["ry352004@gmail.com"],
+        after=ObjectId(after) if after else None,
+        created_from=created_from,
+        created_to=created_to,
+        skills=skills,
+        interests=interests,
+        location=location.strip() if location else None,
+    )
 
-    try:
-        # Get non-developer users
-        users_cursor = users_collection.find({
-            "email": {"$ne": "ry352004@gmail.com"}
-        })
-
-        users_list = []
-        for user in users_cursor:
-            user_id = user["_id"]
-            profile = profiles_collection.find_one({"user_id": user_id}) or {}
-            validations = list(ideas_collection.find(
-                {"user_id": user_id},
-                {"_id": 0, "prompt": 1, "validation": 1, "created_at": 1}
-            ).sort("created_at", -1).limit(10))  # Limit to 10 most recent
-
-            # Convert datetime objects to ISO format strings
-            users_list.append({
-                "id": str(user_id),
-                "name": user.get("name", "Unknown"),
-                "email": user.get("email", ""),
-                "created_at": user.get("created_at", datetime.utcnow()).isoformat(),
-                "profile_data": {
-                    "skills": profile.get("skills", []),
-                    "interests": profile.get("interests", []),
-                    "experience": profile.get("experience", ""),
-                    "availability": profile.get("availability", ""),
-                    "location": profile.get("location", ""),
-                    "updated_at": profile.get("updated_at", datetime.utcnow()).isoformat() if profile.get("updated_at") else None
-                },
-                "validation_history": [
-                    {
-                        "prompt": v["prompt"],
-                        "validation": v["validation"],
-                        "created_at": v["created_at"].isoformat() if v.get("created_at") else None
-                    } for v in validations
-                ]
-            })
-
-        return {"users": users_list}
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"An error occurred: {str(e)}"
-        )
+    async def body():
+        yield '{"users": ['
+        count, last_id = 0, None
+        try:
+            async for doc in cursor:
+                yield ("," if count else "") + json.dumps(dashboard_user(doc), default=str)
+                count, last_id = count + 1, doc["_id"]
+        except Exception as e:
+            # Headers are already sent; a truncated body tells the client the page failed
+            print(f"Error streaming dashboard data: {str(e)}")
+            return
+        next_cursor = str(last_id) if count == limit else None
+        yield '], "next_cursor": ' + json.dumps(next_cursor) + '}'
 
-    except Exception as e:
-        print(f"Error fetching dashboard data: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to fetch dashboard data"
-        )
+    return StreamingResponse(body(), media_type="application/json")
 
 # AI Validation + Suggestions (No Authentication)
 # --------------------------------------------------
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-
-# ---------------- Existing Imports ----------------
-# (your login/authentication imports here)
-# --------------------------------------------------
-
-# ---------------- New Imports ----------------
-import json, re, requests, os
-from datetime import datetime
-from typing import List
-from pydantic import BaseModel, Field
-# ----------------------------------------------
-
-
-# Environment variable for GROQ API (you'll need to set this)
-import os
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")  # Make sure to set this in your environment
-
 # Pydantic models
 class IdeaInput(BaseModel):
     prompt: str = Field(..., min_length=30, max_length=2000)
@@ -808,20 +1066,14 @@ class ValidationResponse(BaseModel):
     suggestions: Suggestions
     created_at: datetime
 
-def call_groq_validation(prompt: str) -> dict:
-    """
-    Enhanced validation function using the comprehensive AI prompt system
-    """
-    if not GROQ_API_KEY:
-        raise HTTPException(status_code=500, detail="GROQ_API_KEY not set in environment")
+VALIDATION_MODEL = "llama3-70b-8192"  # Using more powerful model for better analysis
+VALIDATION_TEMPERATURE = 0.3  # Lower temperature for more consistent analysis
+VALIDATION_MAX_TOKENS = 4000
 
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    system_prompt = """You are an AI Startup Validator for "Startup GPS". 
+# Bump VALIDATION_PROMPT_VERSION whenever VALIDATION_SYSTEM_PROMPT changes:
+# it is part of the validation cache key, so old cached results stop matching.
+VALIDATION_PROMPT_VERSION = "1"
+VALIDATION_SYSTEM_PROMPT = """You are an AI Startup Validator for "Startup GPS". 
 Your role is to provide dynamic, detailed, and actionable startup validation reports based on the user's idea. 
 Do not use any static or placeholder data. Always analyze the user's input deeply.
 
@@ -884,25 +1136,29 @@ Do not use any static or placeholder data. Always analyze the user's input deepl
 
 Provide ONLY the JSON response with no additional text."""
 
+async def call_groq_validation(prompt: str) -> dict:
+    """
+    Enhanced validation function using the comprehensive AI prompt system
+    """
+    if not GROQ_API_KEY:
+        raise HTTPException(status_code=500, detail="GROQ_API_KEY not set in environment")
+
     user_prompt = f"Please validate this startup idea comprehensively: {prompt}"
 
-    payload = {
-        "model": "llama3-70b-8192",  # Using more powerful model for better analysis
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        "temperature": 0.3,  # Lower temperature for more consistent analysis
-        "max_tokens": 4000
-    }
+    messages = [
+        {"role": "system", "content": VALIDATION_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
 
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        if response.status_code != 200:
-            raise HTTPException(status_code=response.status_code, detail="Failed to get response from Groq API")
-
-        data = response.json()
-        ai_text = data["choices"][0]["message"]["content"]
+        ai_text = await chat_completion(
+            messages,
+            model=VALIDATION_MODEL,
+            temperature=VALIDATION_TEMPERATURE,
+            max_tokens=VALIDATION_MAX_TOKENS,
+            timeout=30,
+            priority=PRIORITY_INTERACTIVE
+        )
         
         # Clean up the response to ensure it's valid JSON
         ai_text = ai_text.strip()
@@ -914,183 +1170,232 @@ Provide ONLY the JSON response with no additional text."""
         
         # Parse JSON response
         try:
-            result = json.loads(ai_text)
+            return normalize_validation_result(json.loads(ai_text))
         except json.JSONDecodeError:
-            # Fallback: try to extract data using regex patterns
-            result = parse_fallback_response(ai_text)
+            # Fallback: repair the malformed JSON and keep what can be recovered
+            return parse_fallback_response(ai_text)
         
-        return result
-        
-    except requests.exceptions.RequestException as e:
-        raise HTTPException(status_code=500, detail=f"API request failed: {str(e)}")
+    except GroqError as e:
+        raise HTTPException(status_code=e.status_code, detail="Failed to get response from Groq API")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Validation processing failed: {str(e)}")
 
-def parse_fallback_response(text: str) -> dict:
-    """
-    Fallback parser in case JSON parsing fails
-    """
-    # Extract scores using regex patterns
-    overall_score = extract_score(text, r"overall[_\s]*score[\"']?\s*:\s*(\d+)")
-    feasibility_score = extract_score(text, r"feasibility[\"']?\s*:\s*(\d+)")
-    market_score = extract_score(text, r"market[_\s]*demand[\"']?\s*:\s*(\d+)")
-    uniqueness_score = extract_score(text, r"uniqueness[\"']?\s*:\s*(\d+)")
-    strength_score = extract_score(text, r"strength[\"']?\s*:\s*(\d+)")
-    risk_score = extract_score(text, r"risk[_\s]*factors[\"']?\s*:\s*(\d+)")
-    
-    # Extract analysis sections
-    verdict = extract_section(text, r"verdict[\"']?\s*:\s*[\"'](.*?)[\"']", "Strong potential identified with key areas for development.")
-    feasibility = extract_section(text, r"feasibility[\"']?\s*:\s*[\"'](.*?)[\"']", "Technical implementation appears feasible with proper planning.")
-    market_demand = extract_section(text, r"market[_\s]*demand[\"']?\s*:\s*[\"'](.*?)[\"']", "Market shows promising demand indicators.")
-    uniqueness = extract_section(text, r"uniqueness[\"']?\s*:\s*[\"'](.*?)[\"']", "Concept demonstrates notable differentiation opportunities.")
-    strength = extract_section(text, r"strength[\"']?\s*:\s*[\"'](.*?)[\"']", "Core strengths provide solid foundation for growth.")
-    risk_factors = extract_section(text, r"risk[_\s]*factors[\"']?\s*:\s*[\"'](.*?)[\"']", "Manageable risks identified with mitigation strategies available.")
-    competitors = extract_section(text, r"competitors[\"']?\s*:\s*[\"'](.*?)[\"']", "Competitive landscape analysis reveals positioning opportunities.")
-    
-    # Extract suggestions
-    critical = extract_suggestions(text, "critical")
-    recommended = extract_suggestions(text, "recommended")
-    optional = extract_suggestions(text, "optional")
-    
-    return {
-        "overall_score": overall_score,
-        "scores": {
-            "feasibility": feasibility_score,
-            "market_demand": market_score,
-            "uniqueness": uniqueness_score,
-            "strength": strength_score,
-            "risk_factors": risk_score
-        },
-        "analysis": {
-            "verdict": verdict,
-            "feasibility": feasibility,
-            "market_demand": market_demand,
-            "uniqueness": uniqueness,
-            "strength": strength,
-            "risk_factors": risk_factors,
-            "existing_competitors": competitors
-        },
-        "suggestions": {
-            "critical": critical,
-            "recommended": recommended,
-            "optional": optional
-        }
-    }
+# API Endpoints
 
-def extract_score(text: str, pattern: str) -> int:
-    """Extract numeric score from text using regex pattern"""
-    match = re.search(pattern, text, re.IGNORECASE)
-    if match:
-        return min(100, max(0, int(match.group(1))))
-    return 70  # Default score
-
-def extract_section(text: str, pattern: str, default: str) -> str:
-    """Extract analysis section from text"""
-    match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
-    if match:
-        return match.group(1).strip()[:500]  # Limit length
-    return default
-
-def extract_suggestions(text: str, category: str) -> List[str]:
-    """Extract suggestion items from text"""
-    # Look for the category followed by suggestions
-    pattern = rf"{category}[\"']?\s*:\s*\[(.*?)\]"
-    match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
-    
-    if match:
-        suggestions_text = match.group(1)
-        # Parse individual suggestions
-        suggestions = re.findall(r'["\']([^"\']+)["\']', suggestions_text)
-        return suggestions[:5]  # Limit to 5 suggestions
-    
-    # Fallback: look for bullet points or numbered lists
-    lines = text.split('\n')
-    suggestions = []
-    in_category = False
-    
-    for line in lines:
-        if category.lower() in line.lower():
-            in_category = True
-            continue
-        if in_category:
-            if line.strip().startswith(('-', '•', '*')) or re.match(r'^\d+\.', line.strip()):
-                suggestion = re.sub(r'^[-•*\d\.\s]+', '', line.strip())
-                if suggestion:
-                    suggestions.append(suggestion[:100])  # Limit length
-            elif line.strip() and not line.startswith(' '):
-                break
-    
-    return suggestions[:5] if suggestions else [f"No specific {category} suggestions identified"]
+# Validation result cache: in-process LRU in front of the MongoDB "cache" collection
+VALIDATION_CACHE_MAX_ENTRIES = int(os.getenv("VALIDATION_CACHE_MAX_ENTRIES", "1024"))
+VALIDATION_CACHE_TTL_SECONDS = float(os.getenv("VALIDATION_CACHE_TTL_SECONDS", "604800"))
+
+validation_cache = TwoTierCache(
+    "validation",
+    cache_collection,
+    max_entries=VALIDATION_CACHE_MAX_ENTRIES,
+    max_entry_bytes=64_000,
+    fresh_seconds=VALIDATION_CACHE_TTL_SECONDS,
+    stale_seconds=0,
+)
 
-# API Endpoints
+def validation_cache_key(prompt: str) -> str:
+    """Hash of the normalized prompt, model, temperature and system-prompt version"""
+    raw = json.dumps({
+        "prompt": normalize_text_key(prompt),
+        "model": VALIDATION_MODEL,
+        "temperature": VALIDATION_TEMPERATURE,
+        "prompt_version": VALIDATION_PROMPT_VERSION
+    })
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def build_validation_response(prompt: str, ai_result: dict) -> ValidationResponse:
+    """Structure the AI result to match frontend expectations"""
+    return ValidationResponse(
+        prompt=prompt,
+        validation=ValidationDetails(
+            verdict=ai_result["analysis"]["verdict"],
+            feasibility=ai_result["analysis"]["feasibility"],
+            marketDemand=ai_result["analysis"]["market_demand"],
+            uniqueness=ai_result["analysis"]["uniqueness"],
+            strength=ai_result["analysis"]["strength"],
+            riskFactors=ai_result["analysis"]["risk_factors"],
+            existingCompetitors=ai_result["analysis"]["existing_competitors"]
+        ),
+        scores=ValidationScores(
+            overall=ai_result["overall_score"],
+            feasibility=ai_result["scores"]["feasibility"],
+            marketDemand=ai_result["scores"]["market_demand"],
+            uniqueness=ai_result["scores"]["uniqueness"],
+            strength=ai_result["scores"]["strength"],
+            riskFactors=ai_result["scores"]["risk_factors"]
+        ),
+        suggestions=Suggestions(
+            critical=ai_result["suggestions"]["critical"],
+            recommended=ai_result["suggestions"]["recommended"],
+            optional=ai_result["suggestions"]["optional"]
+        ),
+        created_at=datetime.utcnow()
+    )
+
+def for_request(payload: dict, prompt: str) -> dict:
+    # Cache hits and shared flights carry the first caller's prompt (which may
+    # differ in case or whitespace) and timestamp; report the current ones
+    return {**payload, "prompt": prompt, "created_at": datetime.utcnow()}
+
+async def validate_prompt(prompt: str) -> dict:
+    """Validation payload for one prompt: cache first, then one shared Groq call per prompt"""
+    cache_key = validation_cache_key(prompt)
+    cached, state = await validation_cache.get(cache_key)
+    if state != "miss":
+        return for_request(cached, prompt)
+
+    async def produce():
+        ai_result = await call_groq_validation(prompt)
+        payload = build_validation_response(prompt, ai_result).dict()
+        # Results recovered by the fallback parser are returned but not cached
+        if not ai_result.get("parsed_with_fallback"):
+            await validation_cache.set(cache_key, payload)
+        return payload
+
+    # Identical concurrent prompts share one Groq call
+    return for_request(await validation_flight.do(cache_key, produce), prompt)
+
+async def record_idea(user_id, payload: dict):
+    """Keep a signed-in user's validation in "ideas" (dashboard history and activity counters)"""
+    try:
+        await save_idea(str(user_id), {
+            "prompt": payload["prompt"],
+            "validation": payload["validation"]["verdict"],
+            "details": payload["validation"],
+            "scores": payload["scores"],
+            "suggestions": payload["suggestions"],
+            "created_at": payload["created_at"],
+        })
+    except errors.PyMongoError as e:
+        print(f"❌ Could not save idea: {e}")
 
 @app.post("/validate-idea", response_model=ValidationResponse)
-async def validate_idea(idea: IdeaInput):
+async def validate_idea(idea: IdeaInput, current_user=Depends(get_optional_user)):
     """
-    Enhanced idea validation endpoint with comprehensive AI analysis (No Authentication Required)
+    Enhanced idea validation endpoint with comprehensive AI analysis (No Authentication Required).
+    Signed-in callers also get the idea saved to their history.
     """
     try:
-        # Get AI validation
-        ai_result = call_groq_validation(idea.prompt)
-        
-        # Structure the response to match frontend expectations
-        validation_response = ValidationResponse(
-            prompt=idea.prompt,
-            validation=ValidationDetails(
-                verdict=ai_result["analysis"]["verdict"],
-                feasibility=ai_result["analysis"]["feasibility"],
-                marketDemand=ai_result["analysis"]["market_demand"],
-                uniqueness=ai_result["analysis"]["uniqueness"],
-                strength=ai_result["analysis"]["strength"],
-                riskFactors=ai_result["analysis"]["risk_factors"],
-                existingCompetitors=ai_result["analysis"]["existing_competitors"]
-            ),
-            scores=ValidationScores(
-                overall=ai_result["overall_score"],
-                feasibility=ai_result["scores"]["feasibility"],
-                marketDemand=ai_result["scores"]["market_demand"],
-                uniqueness=ai_result["scores"]["uniqueness"],
-                strength=ai_result["scores"]["strength"],
-                riskFactors=ai_result["scores"]["risk_factors"]
-            ),
-            suggestions=Suggestions(
-                critical=ai_result["suggestions"]["critical"],
-                recommended=ai_result["suggestions"]["recommended"],
-                optional=ai_result["suggestions"]["optional"]
-            ),
-            created_at=datetime.utcnow()
-        )
-        
-        # You can optionally save to database here if needed
-        # For now, just return the response
-        
-        return validation_response
+        payload = await validate_prompt(idea.prompt)
+        if current_user:
+            run_in_background(record_idea(current_user["_id"], payload))
+        return ValidationResponse(**payload)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Validation failed: {str(e)}")
 
-@app.post("/validate-idea", response_model=IdeaResponse)
-def validate_idea(idea: IdeaInput, current_user=Depends(get_current_user)):
-    ai_result = call_groq_validation(idea.prompt)
+# =====================
+# Batch validation
+# =====================
+VALIDATION_BATCH_MAX_ITEMS = int(os.getenv("VALIDATION_BATCH_MAX_ITEMS", "200"))
+# Defaults to the LLM scheduler's slot count; more would only queue in the scheduler
+VALIDATION_BATCH_CONCURRENCY = int(os.getenv("VALIDATION_BATCH_CONCURRENCY", str(llm_scheduler.max_concurrency)))
 
-    idea_doc = {
-        "user_id": current_user["_id"],
-        "prompt": idea.prompt,
-        "validation": ai_result["validation"],
-        "score": ai_result["score"],
-        "suggestions": ai_result["suggestions"],
-        "created_at": datetime.utcnow()
-    }
-    ideas_collection.insert_one(idea_doc)
-
-    return IdeaResponse(
-        prompt=idea.prompt,
-        validation=ai_result["validation"],
-        score=ai_result["score"],
-        suggestions=ai_result["suggestions"],
-        created_at=idea_doc["created_at"],
+class BatchValidationRequest(BaseModel):
+    ideas: List[IdeaInput] = Field(..., min_length=1, max_length=VALIDATION_BATCH_MAX_ITEMS)
+
+class BatchValidationItem(BaseModel):
+    index: int
+    prompt: str
+    result: Optional[ValidationResponse] = None
+    error: Optional[str] = None
+    status_code: int = 200
+
+class BatchValidationResponse(BaseModel):
+    results: List[BatchValidationItem]
+    total: int
+    unique_prompts: int
+    succeeded: int
+    failed: int
+
+def group_batch_prompts(ideas: List[IdeaInput]) -> List[Tuple[str, List[int]]]:
+    """Unique prompts (by validation cache key) with the batch positions they fill"""
+    groups = {}
+    for index, idea in enumerate(ideas):
+        key = validation_cache_key(idea.prompt)
+        if key not in groups:
+            groups[key] = (idea.prompt, [])
+        groups[key][1].append(index)
+    return list(groups.values())
+
+async def run_validation_batch(ideas: List[IdeaInput], groups: List[Tuple[str, List[int]]]):
+    """Yield BatchValidationItems as each unique prompt finishes, at most
+    VALIDATION_BATCH_CONCURRENCY Groq validations in flight at a time.
+
+    Batch calls queue at PRIORITY_BATCH so a large batch never holds
+    single-idea validations and search terms behind it."""
+    semaphore = asyncio.Semaphore(VALIDATION_BATCH_CONCURRENCY)
+
+    async def validate_group(prompt: str, indices: List[int]):
+        priority_floor.set(PRIORITY_BATCH)  # each group runs in its own task context
+        async with semaphore:
+            try:
+                result = ValidationResponse(**await validate_prompt(prompt))
+                return indices, result, None, 200
+            except HTTPException as e:
+                return indices, None, str(e.detail), e.status_code
+            except Exception as e:
+                return indices, None, f"Validation failed: {str(e)}", 500
+
+    tasks = [asyncio.create_task(validate_group(prompt, indices)) for prompt, indices in groups]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            indices, result, error, status_code = await next_done
+            for index in indices:
+                yield BatchValidationItem(
+                    index=index,
+                    prompt=ideas[index].prompt,
+                    result=result,
+                    error=error,
+                    status_code=status_code
+                )
+    finally:
+        for task in tasks:
+            task.cancel()
+
+@app.post("/validate-idea/batch", response_model=BatchValidationResponse)
+async def validate_idea_batch(batch: BatchValidationRequest, current_user=Depends(get_current_user)):
+    """Validate many ideas concurrently; results come back in input order with per-item errors"""
+    groups = group_batch_prompts(batch.ideas)
+    results: List[Optional[BatchValidationItem]] = [None] * len(batch.ideas)
+    async for item in run_validation_batch(batch.ideas, groups):
+        results[item.index] = item
+    succeeded = sum(1 for item in results if item.error is None)
+    return BatchValidationResponse(
+        results=results,
+        total=len(results),
+        unique_prompts=len(groups),
+        succeeded=succeeded,
+        failed=len(results) - succeeded
     )
 
+@app.post("/validate-idea/batch/stream")
+async def stream_validate_idea_batch(
+    batch: BatchValidationRequest,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    current_user=Depends(get_current_user)
+):
+    """Streaming variant of /validate-idea/batch: one "result" frame per idea as soon as it finishes"""
+    async def frames():
+        succeeded = failed = 0
+        async for item in run_validation_batch(batch.ideas, group_batch_prompts(batch.ideas)):
+            if item.error is None:
+                succeeded += 1
+            else:
+                failed += 1
+            yield encode_frame({"type": "result", **item.dict()}, format)
+        yield encode_frame({
+            "type": "summary",
+            "total": len(batch.ideas),
+            "succeeded": succeeded,
+            "failed": failed
+        }, format)
+
+    return StreamingResponse(frames(), media_type=media_type_for(format), headers=STREAM_HEADERS)
 
 @app.post("/profile", response_model=ProfileResponse)
 async def create_or_update_profile(
@@ -1104,8 +1409,9 @@ async def create_or_update_profile(
     })
     
     try:
-        update_user_profile(current_user["_id"], profile_data)
-        updated_profile = get_user_profile(current_user["_id"])
+        await update_user_profile(current_user["_id"], profile_data)
+        await invalidate_principal(current_user["_id"])
+        updated_profile = await get_user_profile(current_user["_id"])
         if not updated_profile:
             raise HTTPException(status_code=400, detail="Profile not saved correctly")
         updated_profile["user_id"] = str(updated_profile["user_id"])
@@ -1118,7 +1424,7 @@ async def edit_profile(
     profile: ProfileCreate,
     current_user=Depends(get_current_user)
 ):
-    existing_profile = get_user_profile(current_user["_id"])
+    existing_profile = await get_user_profile(current_user["_id"])
     if not existing_profile:
         raise HTTPException(status_code=404, detail="Profile not found")
     
@@ -1129,8 +1435,9 @@ async def edit_profile(
     })
     
     try:
-        update_user_profile(current_user["_id"], profile_data)
-        updated_profile = get_user_profile(current_user["_id"])
+        await update_user_profile(current_user["_id"], profile_data)
+        await invalidate_principal(current_user["_id"])
+        updated_profile = await get_user_profile(current_user["_id"])
         updated_profile["user_id"] = str(updated_profile["user_id"])
         return updated_profile
     except Exception as e:
@@ -1138,12 +1445,17 @@ async def edit_profile(
 
 @app.get("/profile", response_model=ProfileResponse)
 async def get_profile(current_user=Depends(get_current_user)):
-    profile = get_user_profile(current_user["_id"])
+    profile = await get_user_profile(current_user["_id"])
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
     profile["user_id"] = str(profile["user_id"])
     return profile
 
+@app.get("/activity")
+async def get_activity(current_user=Depends(get_current_user)):
+    """Counts of the user's ideas, roadmaps and research, and whether a profile exists"""
+    return await get_user_activity(str(current_user["_id"]))
+
 @app.get("/health")
 def health_check():
     """Health check endpoint - no authentication required"""
@@ -1155,6 +1467,7 @@ def health_check():
             "research_papers": "POST /research-papers (requires auth)",
             "debug_sources": "GET /debug/sources (requires auth)",
             "test_sources": "GET /debug/test-sources (requires auth)",
+            "source_health": "GET /debug/source-health (requires auth)",
             "health": "GET /health (public)"
         }
     }
@@ -1178,6 +1491,7 @@ async def debug_research_sources(
     
     return {
         "search_terms": search_terms,
+        "http_clients": http_registry.stats(),
         "results": {
             source: {
                 "count": len(papers),
@@ -1186,52 +1500,78 @@ async def debug_research_sources(
         }
     }
 
-import asyncio
-import re
-import logging
-from typing import Dict, List, Optional, Any, Set
-from datetime import datetime
-from pydantic import BaseModel, Field
-import requests
-from fastapi import HTTPException, Depends
+@app.get("/debug/source-health")
+async def debug_source_health(current_user=Depends(get_current_user)):
+    """Circuit breaker state and rate limiter waits for each research source"""
+    return {name: guard.stats() for name, guard in source_guards.items()}
+
+@app.get("/debug/cache-stats")
+async def debug_cache_stats(current_user=Depends(get_current_user)):
+    """Hit/miss/eviction counters for the in-process caches"""
+    return {
+        "research": research_cache.stats(),
+        "validation": validation_cache.stats(),
+        "principal": principal_cache.stats(),
+        "single_flight": {
+            flight.name: flight.stats()
+            for flight in (search_terms_flight, source_flight, validation_flight)
+        }
+    }
+
+@app.get("/debug/llm-scheduler")
+async def debug_llm_scheduler(current_user=Depends(get_current_user)):
+    """Concurrency, queue depth per priority, wait times and Retry-After pauses for Groq calls"""
+    return llm_scheduler.stats()
+
+@app.get("/debug/password-hasher")
+async def debug_password_hasher(current_user=Depends(get_current_user)):
+    """bcrypt pool load: pending work, rejections, rehashes, queue wait and hash time"""
+    return password_hasher.stats()
 
 # Enhanced Pydantic models
 class RoadmapInput(BaseModel):
     prompt: str
     timeframe: str
 
+class RoadmapPhase(BaseModel):
+    number: int
+    title: str
+    description: str = ""
+    tasks: List[str] = []
+    implementation: List[str] = []
+
 class RoadmapResponse(BaseModel):
     id: str
     prompt: str
     timeframe: str
     roadmap: str
+    overview: str = ""
+    phases: List[RoadmapPhase] = []
     created_at: datetime
     updated_at: datetime
     user_id: str
 
+class PhaseRegenerateInput(BaseModel):
+    instructions: Optional[str] = Field(None, max_length=1000)
+
 class RoadmapUpdate(BaseModel):
     prompt: Optional[str] = None
     timeframe: Optional[str] = None
     roadmap: Optional[str] = None
 
-# Add these new endpoints to your existing FastAPI app
-@app.post("/roadmaps", response_model=RoadmapResponse)
-async def create_roadmap_endpoint(
-    roadmap_input: RoadmapInput,
-    current_user: dict = Depends(get_current_user)
-):
+async def generate_and_store_roadmap(roadmap_input: RoadmapInput, user_id: ObjectId) -> RoadmapResponse:
     # Call AI
-    roadmap_text = call_groq_roadmap(roadmap_input.prompt, roadmap_input.timeframe)
+    roadmap_text = await call_groq_roadmap(roadmap_input.prompt, roadmap_input.timeframe)
 
     # Save to DB
     roadmap_data = {
         "prompt": roadmap_input.prompt,
         "timeframe": roadmap_input.timeframe,
         "roadmap": roadmap_text,
-        "user_id": current_user["_id"]
+        "user_id": user_id
     }
 
-    roadmap_id = create_roadmap(str(current_user["_id"]), roadmap_data)
+    roadmap_id = await create_roadmap(str(user_id), roadmap_data)
 
 
     # Return response
@@ -1240,18 +1580,99 @@ async def create_roadmap_endpoint(
         prompt=roadmap_input.prompt,
         timeframe=roadmap_input.timeframe,
         roadmap=roadmap_text,
+        overview=roadmap_data["overview"],
+        phases=roadmap_data["phases"],
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
-        user_id=str(current_user["_id"])
+        user_id=str(user_id)
     )
 
+# Add these new endpoints to your existing FastAPI app
+@app.post("/roadmaps", response_model=RoadmapResponse)
+async def create_roadmap_endpoint(
+    roadmap_input: RoadmapInput,
+    current_user: dict = Depends(get_current_user)
+):
+    return await generate_and_store_roadmap(roadmap_input, current_user["_id"])
+
+
+@app.post("/roadmaps/stream")
+async def stream_roadmap_endpoint(
+    roadmap_input: RoadmapInput,
+    granularity: str = Query("token", pattern="^(token|phase)$"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Streaming variant of /roadmaps over Server-Sent Events.
+
+    Emits "token" frames (or "phase" frames with granularity=phase) while
+    Groq generates, then saves the roadmap and emits a "done" frame with
+    the stored document. Nothing is written if the stream fails or the
+    client disconnects before the completion finishes.
+    """
+    if not GROQ_API_KEY:
+        raise HTTPException(status_code=500, detail="GROQ_API_KEY not set in environment")
+    user_id = str(current_user["_id"])
+
+    async def events():
+        splitter = PhaseSplitter()
+        phase_index = 0
+        try:
+            async for delta in stream_chat_completion(
+                roadmap_messages(roadmap_input.prompt, roadmap_input.timeframe),
+                model=ROADMAP_MODEL,
+                temperature=ROADMAP_TEMPERATURE,
+                timeout=30,
+                priority=PRIORITY_INTERACTIVE
+            ):
+                phases = splitter.feed(delta)
+                if granularity == "token":
+                    yield encode_frame({"type": "token", "text": delta}, "sse")
+                for phase in phases:
+                    phase_index += 1
+                    yield encode_frame({"type": "phase", "index": phase_index, "text": phase}, "sse")
+            for phase in splitter.close():
+                phase_index += 1
+                yield encode_frame({"type": "phase", "index": phase_index, "text": phase}, "sse")
+        except GroqError as e:
+            yield encode_frame({"type": "error", "detail": f"Groq API request failed: {e.detail}"}, "sse")
+            return
+
+        roadmap_text = splitter.text.strip()
+        if not roadmap_text:
+            yield encode_frame({"type": "error", "detail": "Groq returned an empty roadmap"}, "sse")
+            return
+
+        # Persist only the finished completion
+        roadmap_data = {
+            "prompt": roadmap_input.prompt,
+            "timeframe": roadmap_input.timeframe,
+            "roadmap": roadmap_text,
+        }
+        roadmap_id = await create_roadmap(user_id, roadmap_data)
+        yield encode_frame({
+            "type": "done",
+            "roadmap": RoadmapResponse(
+                id=str(roadmap_id),
+                prompt=roadmap_input.prompt,
+                timeframe=roadmap_input.timeframe,
+                roadmap=roadmap_text,
+                overview=roadmap_data["overview"],
+                phases=roadmap_data["phases"],
+                created_at=roadmap_data["created_at"],
+                updated_at=roadmap_data["updated_at"],
+                user_id=user_id
+            ).dict()
+        }, "sse")
+
+    return StreamingResponse(events(), media_type=media_type_for("sse"), headers=STREAM_HEADERS)
+
 
 @app.get("/roadmaps/{roadmap_id}", response_model=RoadmapResponse)
 async def get_roadmap(
     roadmap_id: str,
     current_user: dict = Depends(get_current_user)
 ):
-    roadmap = get_roadmap_by_id(roadmap_id)
+    roadmap = await get_roadmap_by_id(roadmap_id)
     if not roadmap:
         raise HTTPException(status_code=404, detail="Roadmap not found")
     
@@ -1262,7 +1683,7 @@ async def get_roadmap(
     return roadmap
 
 @app.get("/users/{user_id}/roadmaps", response_model=List[RoadmapResponse])
-async def get_user_roadmaps(
+async def get_user_roadmaps_endpoint(
     user_id: str,
     current_user: dict = Depends(get_current_user)
 ):
@@ -1270,7 +1691,7 @@ async def get_user_roadmaps(
     if user_id != str(current_user["_id"]):
         raise HTTPException(status_code=403, detail="Not authorized to access these roadmaps")
     
-    roadmaps = get_user_roadmaps(user_id)
+    roadmaps = await get_user_roadmaps(user_id)
     return roadmaps
 
 @app.put("/roadmaps/{roadmap_id}", response_model=RoadmapResponse)
@@ -1280,19 +1701,19 @@ async def update_roadmap_endpoint(
     current_user: dict = Depends(get_current_user)
 ):
     # First verify the roadmap exists and belongs to this user
-    roadmap = get_roadmap_by_id(roadmap_id)
+    roadmap = await get_roadmap_by_id(roadmap_id)
     if not roadmap:
         raise HTTPException(status_code=404, detail="Roadmap not found")
     if roadmap["user_id"] != str(current_user["_id"]):
         raise HTTPException(status_code=403, detail="Not authorized to update this roadmap")
     
     # Perform the update
-    updated = update_roadmap(roadmap_id, update_data.dict(exclude_unset=True))
+    updated = await update_roadmap(roadmap_id, update_data.dict(exclude_unset=True))
     if updated.modified_count == 0:
         raise HTTPException(status_code=404, detail="Roadmap not found or no changes made")
     
     # Return the updated roadmap
-    updated_roadmap = get_roadmap_by_id(roadmap_id)
+    updated_roadmap = await get_roadmap_by_id(roadmap_id)
     return updated_roadmap
 
 @app.delete("/roadmaps/{roadmap_id}")
@@ -1301,31 +1722,22 @@ async def delete_roadmap_endpoint(
     current_user: dict = Depends(get_current_user)
 ):
     # First verify the roadmap exists and belongs to this user
-    roadmap = get_roadmap_by_id(roadmap_id)
+    roadmap = await get_roadmap_by_id(roadmap_id)
     if not roadmap:
         raise HTTPException(status_code=404, detail="Roadmap not found")
     if roadmap["user_id"] != str(current_user["_id"]):
         raise HTTPException(status_code=403, detail="Not authorized to delete this roadmap")
     
     # Perform the deletion
-    deleted = delete_roadmap(roadmap_id)
-    if deleted.deleted_count == 0:
+    if not await delete_roadmap(roadmap_id):
         raise HTTPException(status_code=404, detail="Roadmap not found")
     
     return {"message": "Roadmap deleted successfully"}
 
 # Add this helper function
-def call_groq_roadmap(prompt: str, timeframe: str) -> str:
-    if not GROQ_API_KEY:
-        raise HTTPException(status_code=500, detail="GROQ_API_KEY not set in environment")
-
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    system_prompt = """You are a startup roadmap specialist. Generate a detailed, actionable roadmap based on the provided idea and timeframe. Structure your response EXACTLY as follows:
+ROADMAP_MODEL = "llama3-8b-8192"
+ROADMAP_TEMPERATURE = 0.6
+ROADMAP_SYSTEM_PROMPT = """You are a startup roadmap specialist. Generate a detailed, actionable roadmap based on the provided idea and timeframe. Structure your response EXACTLY as follows:
 
 Overview:
 [Provide a 3-4 sentence high-level summary of the entire roadmap]
@@ -1362,22 +1774,305 @@ Each phase should have:
 3. 3-4 implementation details (bullet points under "Implementation")
 4. Adjust the number of phases according to the specified timeframe (3 months = 3 phases, 6 months = 5 phases, etc.)"""
 
-    payload = {
-        "model": "llama3-8b-8192",
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Create a roadmap for: {prompt}\nTimeframe: {timeframe}"}
-        ],
-        "temperature": 0.6
-    }
+
+def roadmap_messages(prompt: str, timeframe: str) -> List[dict]:
+    return [
+        {"role": "system", "content": ROADMAP_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Create a roadmap for: {prompt}\nTimeframe: {timeframe}"}
+    ]
+
+
+async def call_groq_roadmap(prompt: str, timeframe: str) -> str:
+    if not GROQ_API_KEY:
+        raise HTTPException(status_code=500, detail="GROQ_API_KEY not set in environment")
 
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        return data["choices"][0]["message"]["content"]
-    except requests.exceptions.RequestException as e:
-        raise HTTPException(status_code=500, detail=f"Groq API request failed: {str(e)}")
+        return await chat_completion(
+            roadmap_messages(prompt, timeframe),
+            model=ROADMAP_MODEL,
+            temperature=ROADMAP_TEMPERATURE,
+            timeout=30,
+            priority=PRIORITY_INTERACTIVE
+        )
+    except GroqError as e:
+        raise HTTPException(status_code=500, detail=f"Groq API request failed: {e.detail}")
+
+
+PHASE_SYSTEM_PROMPT = """You are a startup roadmap specialist. You are revising ONE phase of an existing roadmap. Respond with only that phase, structured EXACTLY as follows:
+
+Phase N: [Phase Name] - [Brief one-line description]
+Tasks:
+- Task 1 (specific action item)
+- Task 2
+- Task 3
+- Task 4
+Implementation:
+- How to accomplish this phase (3-4 specific steps)
+- Resources needed
+- Team members involved
+- Potential challenges
+
+Keep the phase consistent with the overview and the neighbouring phases: build on the previous phase, set up the next one, and don't repeat their tasks."""
+
+
+async def get_owned_roadmap(roadmap_id: str, current_user: dict) -> dict:
+    roadmap = await get_roadmap_by_id(roadmap_id)
+    if not roadmap:
+        raise HTTPException(status_code=404, detail="Roadmap not found")
+    if roadmap["user_id"] != str(current_user["_id"]):
+        raise HTTPException(status_code=403, detail="Not authorized to access this roadmap")
+    return roadmap
+
+
+def phase_position(roadmap: dict, phase_number: int) -> int:
+    """Index of phase_number (1-based) in the roadmap's phases"""
+    if not 1 <= phase_number <= len(roadmap.get("phases") or []):
+        raise HTTPException(status_code=404, detail=f"Roadmap has no phase {phase_number}")
+    return phase_number - 1
+
+
+@app.get("/roadmaps/{roadmap_id}/phases/{phase_number}", response_model=RoadmapPhase)
+async def get_roadmap_phase(
+    roadmap_id: str,
+    phase_number: int,
+    current_user: dict = Depends(get_current_user)
+):
+    roadmap = await get_owned_roadmap(roadmap_id, current_user)
+    return roadmap["phases"][phase_position(roadmap, phase_number)]
+
+
+@app.post("/roadmaps/{roadmap_id}/phases/{phase_number}/regenerate", response_model=RoadmapPhase)
+async def regenerate_roadmap_phase(
+    roadmap_id: str,
+    phase_number: int,
+    request: PhaseRegenerateInput = PhaseRegenerateInput(),
+    current_user: dict = Depends(get_current_user)
+):
+    """Regenerate one phase with the overview and neighbouring phases as context.
+
+    Only that phase's text is replaced; the rest of the roadmap is kept
+    byte for byte.
+    """
+    if not GROQ_API_KEY:
+        raise HTTPException(status_code=500, detail="GROQ_API_KEY not set in environment")
+    roadmap = await get_owned_roadmap(roadmap_id, current_user)
+    index = phase_position(roadmap, phase_number)
+    text = roadmap["roadmap"]
+    phase_count = len(roadmap["phases"])
+
+    context = [
+        f"Startup idea: {roadmap['prompt']}",
+        f"Timeframe: {roadmap['timeframe']}",
+        f"Roadmap overview: {roadmap.get('overview', '')}",
+    ]
+    if index > 0:
+        context.append(f"Previous phase:\n{phase_text(text, index - 1)}")
+    if index < phase_count - 1:
+        context.append(f"Next phase:\n{phase_text(text, index + 1)}")
+    context.append(f"Current Phase {phase_number} (rewrite this one):\n{phase_text(text, index)}")
+    if request.instructions:
+        context.append(f"Requested changes: {request.instructions}")
+
+    try:
+        completion = await chat_completion(
+            [
+                {"role": "system", "content": PHASE_SYSTEM_PROMPT},
+                {"role": "user", "content": "\n\n".join(context)}
+            ],
+            model=ROADMAP_MODEL,
+            temperature=ROADMAP_TEMPERATURE,
+            max_tokens=800,
+            timeout=30,
+            priority=PRIORITY_INTERACTIVE
+        )
+    except GroqError as e:
+        raise HTTPException(status_code=500, detail=f"Groq API request failed: {e.detail}")
+
+    # Keep only the first phase block the model returned, numbered as the one it replaces
+    heading = PHASE_HEADING_RE.search(completion)
+    if not heading:
+        raise HTTPException(status_code=502, detail="Groq response did not contain a roadmap phase")
+    new_phase = completion[heading.start():]
+    following = PHASE_HEADING_RE.search(new_phase, heading.end() - heading.start())
+    if following:
+        new_phase = new_phase[:following.start()]
+    new_phase = PHASE_HEADING_RE.sub(f"Phase {phase_number}:", new_phase, count=1)
+    heading_line, _, body = new_phase.partition("\n")
+    new_phase = heading_line.rstrip("* ") + "\n" + body  # drop markdown bold closers
+
+    new_text = replace_phase_text(text, index, new_phase)
+    if not await replace_roadmap_text(roadmap_id, text, new_text):
+        raise HTTPException(status_code=409, detail="Roadmap changed while the phase was regenerating, please retry")
+    return (await get_roadmap_by_id(roadmap_id))["phases"][index]
+
+
+# =====================
+# Background jobs
+# =====================
+# POST /jobs/* returns a job ID at once and a worker runs the task, so long
+# LLM and research calls no longer hold the HTTP connection open past the
+# load balancer timeout. Clients poll GET /jobs/{id} or subscribe to
+# GET /jobs/{id}/events. Run the API with JOB_WORKERS=0 and start
+# job_worker.py to move the work into separate processes.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_TIMEOUT_SECONDS = float(os.getenv("JOB_TIMEOUT_SECONDS", "120"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", "86400"))
+JOB_EVENTS_POLL_SECONDS = float(os.getenv("JOB_EVENTS_POLL_SECONDS", "2"))
+# Queued research is not interactive: give it most of the job timeout instead of RESEARCH_BUDGET_SECONDS
+JOB_RESEARCH_BUDGET_SECONDS = float(os.getenv("JOB_RESEARCH_BUDGET_SECONDS", str(JOB_TIMEOUT_SECONDS * 0.75)))
+
+job_queue = JobQueue(
+    jobs_collection,
+    workers=JOB_WORKERS,
+    timeout_seconds=JOB_TIMEOUT_SECONDS,
+    # A lease outlives the job timeout, so only dead workers lose their jobs
+    lease_seconds=JOB_TIMEOUT_SECONDS + 60,
+    max_attempts=JOB_MAX_ATTEMPTS,
+    result_ttl_seconds=JOB_RESULT_TTL_SECONDS,
+)
+
+@job_queue.handler("roadmap")
+async def run_roadmap_job(job: dict) -> dict:
+    roadmap = await generate_and_store_roadmap(RoadmapInput(**job["payload"]), ObjectId(job["user_id"]))
+    return roadmap.dict()
+
+@job_queue.handler("validate_idea")
+async def run_validation_job(job: dict) -> dict:
+    return await validate_prompt(job["payload"]["prompt"])
+
+@job_queue.handler("research_papers")
+async def run_research_job(job: dict) -> dict:
+    response = await research_papers_for(ResearchRequest(**job["payload"]), JOB_RESEARCH_BUDGET_SECONDS)
+    return response.dict()
+
+# Activity counters are kept with $inc on every write; this job recounts
+# them from the source collections to correct drift. One pass runs per
+# ACTIVITY_RECONCILE_INTERVAL_SECONDS period (0 disables) as a chain of jobs:
+# each recounts the next ACTIVITY_RECONCILE_BATCH_SIZE users and enqueues the
+# following batch, and the last batch enqueues the next period's pass. Every
+# process seeds the next period's first job, but the period is part of the
+# payload, so the queue's dedupe keeps that to one job and one pass per period.
+ACTIVITY_RECONCILE_INTERVAL_SECONDS = float(os.getenv("ACTIVITY_RECONCILE_INTERVAL_SECONDS", "21600"))
+ACTIVITY_RECONCILE_BATCH_SIZE = int(os.getenv("ACTIVITY_RECONCILE_BATCH_SIZE", "500"))
+
+async def enqueue_activity_reconciliation(period: int, after: Optional[str] = None):
+    start = datetime.utcfromtimestamp(period * ACTIVITY_RECONCILE_INTERVAL_SECONDS)
+    await job_queue.enqueue("reconcile_activity", {"period": period, "after": after}, "system", run_at=start)
+
+@job_queue.handler("reconcile_activity")
+async def run_activity_reconcile_job(job: dict) -> dict:
+    period, after = job["payload"]["period"], job["payload"].get("after")
+    user_ids = await async_database.next_user_ids(ObjectId(after) if after else None, ACTIVITY_RECONCILE_BATCH_SIZE)
+    result = {"users": 0, "drifted": 0, "skipped": 0}
+    if user_ids:
+        # Async, so a job timeout cancels the recount instead of leaving it running
+        result = await async_database.reconcile_activity_counters(user_ids)
+    if len(user_ids) == ACTIVITY_RECONCILE_BATCH_SIZE:
+        await enqueue_activity_reconciliation(period, str(user_ids[-1]))
+    elif ACTIVITY_RECONCILE_INTERVAL_SECONDS > 0:
+        await enqueue_activity_reconciliation(period + 1)
+    print(f"Activity counters reconciled (period {period}, after {after}): {result}")
+    return result
+
+async def schedule_activity_reconciliation():
+    while True:
+        try:
+            await enqueue_activity_reconciliation(int(time.time() // ACTIVITY_RECONCILE_INTERVAL_SECONDS) + 1)
+        except Exception as e:
+            print(f"Could not enqueue activity reconciliation: {e}")
+        await asyncio.sleep(ACTIVITY_RECONCILE_INTERVAL_SECONDS)
+
+class JobResponse(BaseModel):
+    id: str
+    type: str
+    status: str
+    attempts: int
+    max_attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+def job_response(job: dict) -> JobResponse:
+    return JobResponse(
+        id=str(job["_id"]),
+        type=job["type"],
+        status=job["status"],
+        attempts=job["attempts"],
+        max_attempts=job["max_attempts"],
+        created_at=job["created_at"],
+        started_at=job.get("started_at"),
+        finished_at=job.get("finished_at"),
+        duration_seconds=job.get("duration_seconds"),
+        result=job.get("result"),
+        error=job.get("error")
+    )
+
+async def enqueue_job(job_type: str, payload: dict, current_user: dict) -> JobResponse:
+    job = await job_queue.enqueue(job_type, payload, str(current_user["_id"]))
+    return job_response(job)
+
+async def get_owned_job(job_id: str, current_user: dict) -> dict:
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=400, detail="Invalid job ID")
+    job = await job_queue.get(ObjectId(job_id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["user_id"] != str(current_user["_id"]):
+        raise HTTPException(status_code=403, detail="Not authorized to access this job")
+    return job
+
+@app.post("/jobs/roadmaps", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_roadmap_job(roadmap_input: RoadmapInput, current_user: dict = Depends(get_current_user)):
+    """Queue roadmap generation; the result is the RoadmapResponse of /roadmaps"""
+    return await enqueue_job("roadmap", roadmap_input.dict(), current_user)
+
+@app.post("/jobs/validate-idea", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_validation_job(idea: IdeaInput, current_user: dict = Depends(get_current_user)):
+    """Queue idea validation; the result is the ValidationResponse of /validate-idea"""
+    return await enqueue_job("validate_idea", idea.dict(), current_user)
+
+@app.post("/jobs/research-papers", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_research_job(request: ResearchRequest, current_user: dict = Depends(get_current_user)):
+    """Queue a research search; the result is the ResearchResponse of /research-papers"""
+    if not request.idea or not request.idea.strip():
+        raise HTTPException(status_code=400, detail="Idea cannot be empty")
+    return await enqueue_job("research_papers", request.dict(), current_user)
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    return job_response(await get_owned_job(job_id, current_user))
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Server-Sent Events: a "status" frame on every change, ending with the finished job"""
+    job = await get_owned_job(job_id, current_user)
+
+    async def frames():
+        current = job
+        last_status = None
+        while True:
+            if current["status"] != last_status:
+                last_status = current["status"]
+                yield encode_frame({"type": "status", "job": job_response(current).dict()}, "sse")
+            if current["status"] in TERMINAL_STATUSES:
+                return
+            # Woken at once by a local worker; jobs run by other processes are polled
+            await job_queue.wait_for_change(current["_id"], JOB_EVENTS_POLL_SECONDS)
+            current = await job_queue.get(current["_id"]) or current
+
+    return StreamingResponse(frames(), media_type=media_type_for("sse"), headers=STREAM_HEADERS)
+
+@app.get("/debug/job-stats")
+async def debug_job_stats(current_user=Depends(get_current_user)):
+    """Job counts by status, retries, dead letters and duration/queue-wait percentiles"""
+    return {
+        **job_queue.stats(),
+        "statuses": await asyncio.to_thread(job_queue.status_counts)
+    }
 
 
 @app.get("/")
@@ -0,0 +1,196 @@
+import re
+import unicodedata
+from typing import Dict, List, Optional, Set
+
+# =====================
+# Cross-source paper deduplication
+# =====================
+# Papers are matched on DOI first, then arXiv ID, then normalized title.
+# Titles that differ slightly (punctuation, markup, a dropped word) are
+# caught with MinHash signatures over character shingles; LSH banding
+# keeps candidate lookup constant-time per paper, so a whole batch is
+# deduplicated in linear time.
+
+SHINGLE_SIZE = 4
+NUM_HASHES = 24
+BAND_ROWS = 4
+TITLE_SIMILARITY_THRESHOLD = 0.8
+MAX_CANDIDATES = 32  # per paper, guards against pathological buckets
+
+_EMPTY_BIN = 1 << 32
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_DOI_PREFIX_RE = re.compile(r"^(https?://(dx\.)?doi\.org/|doi:)", re.IGNORECASE)
+_ARXIV_URL_RE = re.compile(r"arxiv\.org/(?:abs|pdf)/([a-z\-]+/\d{7}|\d{4}\.\d{4,5})", re.IGNORECASE)
+_ARXIV_DOI_RE = re.compile(r"^10\.48550/arxiv\.(.+)$", re.IGNORECASE)
+
+PLACEHOLDER_ABSTRACT = "No abstract available"
+
+
+def normalize_doi(doi: Optional[str]) -> str:
+    if not doi:
+        return ""
+    return _DOI_PREFIX_RE.sub("", doi.strip()).lower()
+
+
+def arxiv_id(paper) -> str:
+    """arXiv identifier without version, from the arXiv DOI or an arxiv.org URL"""
+    match = _ARXIV_DOI_RE.match(normalize_doi(getattr(paper, "doi", None)))
+    if match:
+        return match.group(1)
+    match = _ARXIV_URL_RE.search(getattr(paper, "url", "") or "")
+    return match.group(1).lower() if match else ""
+
+
+def normalize_title(title: str) -> str:
+    title = _TAG_RE.sub(" ", title or "")
+    title = unicodedata.normalize("NFKD", title).encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM_RE.sub(" ", title.lower()).strip()
+
+
+def title_shingles(normalized_title: str) -> Set[int]:
+    # Built-in str hashing is fast and stable within a process, which is all the signatures need
+    compact = normalized_title.replace(" ", "")
+    if len(compact) <= SHINGLE_SIZE:
+        return {hash(compact) & 0xFFFFFFFF} if compact else set()
+    return {
+        hash(compact[i:i + SHINGLE_SIZE]) & 0xFFFFFFFF
+        for i in range(len(compact) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash_signature(shingles: Set[int]) -> List[int]:
+    """One-permutation MinHash: each shingle hash lands in one bin, each bin keeps its minimum.
+
+    This costs a single pass over the shingles instead of one pass per hash
+    function. Empty bins borrow the value of the next non-empty bin
+    (rotation densification) so short titles still get full signatures.
+    """
+    bins = [_EMPTY_BIN] * NUM_HASHES
+    for shingle in shingles:
+        mixed = (shingle * 0x9E3779B1) & 0xFFFFFFFF
+        index = mixed % NUM_HASHES
+        if mixed < bins[index]:
+            bins[index] = mixed
+    if _EMPTY_BIN in bins and len(set(bins)) > 1:
+        for index in range(NUM_HASHES):
+            offset = 1
+            while bins[index] == _EMPTY_BIN:
+                donor = bins[(index + offset) % NUM_HASHES]
+                if donor != _EMPTY_BIN:
+                    bins[index] = donor + offset * _EMPTY_BIN
+                offset += 1
+    return bins
+
+
+def jaccard(left: Set[int], right: Set[int]) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def _conflicting_dois(left: str, right: str) -> bool:
+    if not left or not right or left == right:
+        return False
+    # arXiv DOIs identify the preprint of a paper that may also have a journal DOI
+    return not (_ARXIV_DOI_RE.match(left) or _ARXIV_DOI_RE.match(right))
+
+
+def merge_paper(kept, duplicate):
+    """Fill gaps in the kept paper with metadata from its duplicate"""
+    for field in ("doi", "url", "published_date"):
+        if not getattr(kept, field, None) and getattr(duplicate, field, None):
+            setattr(kept, field, getattr(duplicate, field))
+    if not kept.authors and duplicate.authors:
+        kept.authors = duplicate.authors
+    if kept.abstract == PLACEHOLDER_ABSTRACT and duplicate.abstract != PLACEHOLDER_ABSTRACT:
+        kept.abstract = duplicate.abstract
+    kept_citations = getattr(kept, "citation_count", None)
+    duplicate_citations = getattr(duplicate, "citation_count", None)
+    if duplicate_citations is not None and (kept_citations is None or duplicate_citations > kept_citations):
+        kept.citation_count = duplicate_citations
+
+
+class PaperDeduper:
+    """Incremental deduplicator; add() returns True for a new paper, False for a merged duplicate"""
+
+    def __init__(self, threshold: float = TITLE_SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.papers: List = []
+        self._by_doi: Dict[str, int] = {}
+        self._by_arxiv: Dict[str, int] = {}
+        self._by_title: Dict[str, int] = {}
+        self._shingles: List[Set[int]] = []
+        self._dois: List[str] = []
+        self._buckets: Dict[tuple, List[int]] = {}
+
+    def _find_exact(self, doi: str, arxiv: str, title: str) -> Optional[int]:
+        if doi and doi in self._by_doi:
+            return self._by_doi[doi]
+        if arxiv and arxiv in self._by_arxiv:
+            return self._by_arxiv[arxiv]
+        index = self._by_title.get(title)
+        if index is not None and _conflicting_dois(doi, self._dois[index]):
+            return None  # same title, but two different published works
+        return index
+
+    def _find_similar(self, doi: str, shingles: Set[int], bands: List[tuple]) -> Optional[int]:
+        checked = 0
+        for band in bands:
+            for index in self._buckets.get(band, ()):
+                if checked >= MAX_CANDIDATES:
+                    return None
+                checked += 1
+                if _conflicting_dois(doi, self._dois[index]):
+                    continue  # similar titles, but two different published works
+                if jaccard(shingles, self._shingles[index]) >= self.threshold:
+                    return index
+        return None
+
+    def _register(self, index: int, doi: str, arxiv: str, title: str):
+        if doi:
+            self._by_doi.setdefault(doi, index)
+        if arxiv:
+            self._by_arxiv.setdefault(arxiv, index)
+        self._by_title.setdefault(title, index)
+
+    def add(self, paper) -> bool:
+        title = normalize_title(paper.title)
+        if not title:
+            return False
+        doi = normalize_doi(paper.doi)
+        arxiv = arxiv_id(paper)
+
+        match = self._find_exact(doi, arxiv, title)
+        if match is None:
+            shingles = title_shingles(title)
+            signature = minhash_signature(shingles)
+            bands = [
+                (start, *signature[start:start + BAND_ROWS])
+                for start in range(0, NUM_HASHES, BAND_ROWS)
+            ]
+            match = self._find_similar(doi, shingles, bands)
+
+        if match is not None:
+            merge_paper(self.papers[match], paper)
+            if doi and not self._dois[match]:
+                self._dois[match] = doi
+            self._register(match, doi, arxiv, title)
+            return False
+
+        index = len(self.papers)
+        self.papers.append(paper)
+        self._shingles.append(shingles)
+        self._dois.append(doi)
+        self._register(index, doi, arxiv, title)
+        for band in bands:
+            self._buckets.setdefault(band, []).append(index)
+        return True
+
+
+def dedupe_papers(papers: List, threshold: float = TITLE_SIMILARITY_THRESHOLD) -> List:
+    deduper = PaperDeduper(threshold)
+    for paper in papers:
+        deduper.add(paper)
+    return deduper.papers
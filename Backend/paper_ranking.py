@@ -0,0 +1,137 @@
+import math
+import re
+from collections import Counter
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# =====================
+# Relevance ranking for merged papers
+# =====================
+# All papers are scored against the search terms in one batched pass:
+# a (papers x query tokens) term-frequency matrix per field feeds a BM25
+# computation in NumPy, multi-word search terms add a phrase bonus, and
+# citation counts give a log-scaled boost.
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 2.0
+ABSTRACT_WEIGHT = 1.0
+PHRASE_BONUS = 0.5
+CITATION_WEIGHT = 0.3
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = {"the", "and", "for", "with", "of", "in", "on", "to", "a", "an", "using", "based"}
+_NO_ABSTRACT = "no abstract available"
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def query_tokens(search_terms: Sequence[str]) -> List[str]:
+    tokens = []
+    for term in search_terms:
+        for token in tokenize(term):
+            if token not in _STOP_WORDS and token not in tokens:
+                tokens.append(token)
+    return tokens
+
+
+def _tf_matrix(texts: List[str], vocabulary: List[str]):
+    """Term frequencies of the query tokens plus document lengths"""
+    tf = np.zeros((len(texts), len(vocabulary)), dtype=np.float32)
+    lengths = np.zeros(len(texts), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = tokenize(text)
+        lengths[row] = len(tokens)
+        counts = Counter(tokens)
+        tf[row] = [counts.get(token, 0) for token in vocabulary]
+    return tf, lengths
+
+
+def _bm25(tf, lengths) -> "np.ndarray":
+    n_docs = tf.shape[0]
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+    avg_length = max(float(lengths.mean()), 1.0)
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_length)
+    scores = tf * (BM25_K1 + 1) / (tf + norm[:, None])
+    return scores @ idf
+
+
+def _abstract(paper) -> str:
+    abstract = paper.abstract or ""
+    return "" if abstract.lower() == _NO_ABSTRACT else abstract
+
+
+def term_coverage(papers: Sequence, search_terms: Sequence[str]) -> "np.ndarray":
+    """Share of the query tokens found in each paper's title or abstract, in [0, 1].
+
+    Unlike relevance_scores this does not depend on the rest of the batch,
+    so it can serve as an absolute quality bar.
+    """
+    vocabulary = query_tokens(search_terms)
+    if not papers or not vocabulary:
+        return np.zeros(len(papers), dtype=np.float64)
+    coverage = np.zeros(len(papers), dtype=np.float64)
+    for row, paper in enumerate(papers):
+        tokens = set(tokenize(f"{paper.title or ''} {_abstract(paper)}"))
+        coverage[row] = sum(token in tokens for token in vocabulary) / len(vocabulary)
+    return coverage
+
+
+def relevance_scores(papers: Sequence, search_terms: Sequence[str]) -> "np.ndarray":
+    """Relevance of each paper in [0, 1], in input order"""
+    if not papers:
+        return np.zeros(0, dtype=np.float32)
+    vocabulary = query_tokens(search_terms)
+    titles = [paper.title or "" for paper in papers]
+    abstracts = [_abstract(paper) for paper in papers]
+
+    scores = np.zeros(len(papers), dtype=np.float64)
+    if vocabulary:
+        title_tf, title_lengths = _tf_matrix(titles, vocabulary)
+        abstract_tf, abstract_lengths = _tf_matrix(abstracts, vocabulary)
+        scores += TITLE_WEIGHT * _bm25(title_tf, title_lengths)
+        scores += ABSTRACT_WEIGHT * _bm25(abstract_tf, abstract_lengths)
+
+    phrases = [" ".join(tokenize(term)) for term in search_terms if len(tokenize(term)) > 1]
+    if phrases:
+        texts = [" ".join(tokenize(f"{title} {abstract}")) for title, abstract in zip(titles, abstracts)]
+        hits = np.array([[phrase in text for phrase in phrases] for text in texts], dtype=np.float64)
+        scores += PHRASE_BONUS * hits.sum(axis=1)
+
+    top = scores.max()
+    if top > 0:
+        scores /= top
+
+    citations = np.array(
+        [getattr(paper, "citation_count", None) or 0 for paper in papers], dtype=np.float64
+    )
+    if citations.max() > 0:
+        boost = np.log1p(citations) / math.log1p(citations.max())
+        scores = scores * (1 - CITATION_WEIGHT) + boost * CITATION_WEIGHT * (scores > 0)
+    return scores
+
+
+def rank_papers(papers: List, search_terms: Sequence[str], min_relevance: Optional[float] = None) -> List:
+    """Sort papers by relevance (stable for ties) and drop those under min_relevance.
+
+    relevance_score is normalised to the best paper of the batch, so the
+    cutoff is applied to term_coverage instead: a batch of off-topic papers
+    is dropped whole rather than keeping its top paper at 1.0.
+    """
+    scores = relevance_scores(papers, search_terms)
+    if min_relevance is not None:
+        coverage = term_coverage(papers, search_terms)
+    order = np.argsort(-scores, kind="stable")
+    ranked = []
+    for index in order:
+        score = float(scores[index])
+        if min_relevance is not None and coverage[index] < min_relevance:
+            continue
+        paper = papers[index]
+        paper.relevance_score = round(score, 4)
+        ranked.append(paper)
+    return ranked
@@ -0,0 +1,151 @@
+import os
+import re
+import time
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import bcrypt
+
+# =====================
+# Password hashing pool
+# =====================
+# bcrypt is deliberately slow (~0.25 s at cost 12), so hashing on the event
+# loop or on Starlette's shared threadpool lets a login storm starve every
+# other endpoint. Password work runs on its own small thread pool instead
+# (bcrypt releases the GIL, so threads use every core), and admission
+# control rejects new work with PasswordHasherBusy once max_pending hashes
+# are queued, rather than letting requests wait behind it.
+#
+# Hashes record their cost ("$2b$12$..."); verify() reports a replacement
+# hash when the stored cost differs from BCRYPT_ROUNDS so login can rehash
+# transparently after the cost is changed.
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 16)))
+
+DURATION_SAMPLES = 500
+_COST_RE = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+class PasswordHasherBusy(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"Password hashing queue is full, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def _secret(password: str) -> bytes:
+    # bcrypt only reads the first 72 bytes; passlib truncated the same way
+    return password.encode("utf-8")[:72]
+
+
+def hash_password_sync(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    return bcrypt.hashpw(_secret(password), bcrypt.gensalt(rounds, prefix=b"2b")).decode("ascii")
+
+
+def verify_password_sync(password: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(_secret(password), hashed.encode("ascii"))
+    except (ValueError, UnicodeEncodeError):
+        return False  # malformed or non-bcrypt hash
+
+
+def hash_cost(hashed: str) -> Optional[int]:
+    match = _COST_RE.match(hashed or "")
+    return int(match.group(1)) if match else None
+
+
+class PasswordHasher:
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING,
+                 rounds: int = BCRYPT_ROUNDS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.counters = {"hashed": 0, "verified": 0, "failed_verifications": 0, "rehashed": 0, "rejected": 0}
+        self._waits = deque(maxlen=DURATION_SAMPLES)
+        self._durations = deque(maxlen=DURATION_SAMPLES)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def _retry_after(self) -> float:
+        # Time for the pool to drain its queue, from the average hash duration
+        average = sum(self._durations) / len(self._durations) if self._durations else 0.25
+        return max(1.0, round(self.pending * average / self.workers))
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.counters["rejected"] += 1
+            raise PasswordHasherBusy(self._retry_after())
+        self.pending += 1
+        submitted = time.monotonic()
+
+        def timed():
+            started = time.monotonic()
+            try:
+                return fn(*args)
+            finally:
+                self._waits.append(started - submitted)
+                self._durations.append(time.monotonic() - started)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(hash_password_sync, password, self.rounds)
+        self.counters["hashed"] += 1
+        return hashed
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new_hash); new_hash is set when the stored cost differs from the configured one"""
+        valid = await self._run(verify_password_sync, password, hashed)
+        self.counters["verified"] += 1
+        if not valid:
+            self.counters["failed_verifications"] += 1
+            return False, None
+        if hash_cost(hashed) == self.rounds:
+            return True, None
+        try:
+            new_hash = await self.hash(password)
+        except PasswordHasherBusy:
+            return True, None  # rehash on a later login
+        self.counters["rehashed"] += 1
+        return True, new_hash
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        def summary(samples) -> dict:
+            ordered = sorted(samples)
+            if not ordered:
+                return {"avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+            return {
+                "avg_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+            }
+
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            **self.counters,
+            "queue_wait": summary(self._waits),
+            "hash_time": summary(self._durations),
+        }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,109 @@
+import re
+from typing import List, Optional
+
+# =====================
+# Roadmap phase parsing and splitting
+# =====================
+# Roadmaps follow the "Overview / Phase N: Name - description / Tasks /
+# Implementation" layout requested in the roadmap system prompt.
+# parse_roadmap() turns that text into structured phases when a roadmap is
+# written; replace_phase_text() swaps one phase's text and leaves the rest
+# untouched. PhaseSplitter cuts a streamed completion into whole phases: a
+# phase is complete as soon as the next phase heading appears, and the last
+# one when the stream ends.
+
+# Headings may come wrapped in markdown ("## Phase 2:", "**Phase 2: ...**")
+PHASE_HEADING_RE = re.compile(r"^[#* \t]*Phase\s+\d+\s*:", re.MULTILINE | re.IGNORECASE)
+_PHASE_TITLE_RE = re.compile(
+    r"^[#*\s]*Phase\s+(\d+)\s*:\s*(.*?)(?:\s+[-\u2013\u2014]\s+(.*?))?[*\s]*$", re.IGNORECASE
+)
+_SECTION_RE = re.compile(r"^[#*\s]*(overview|tasks|implementation)[*\s]*:[*\s]*(.*)$", re.IGNORECASE)
+_BULLET_RE = re.compile(r"^\s*(?:[-*\u2022]|\d+[.)])\s*")
+
+
+def _clean(line: str) -> str:
+    return _BULLET_RE.sub("", line).strip().strip("*").strip()
+
+
+def parse_phase(text: str, number: Optional[int] = None) -> dict:
+    """One "Phase N: ..." block as {number, title, description, tasks, implementation}"""
+    lines = text.strip().splitlines()
+    heading = _PHASE_TITLE_RE.match(lines[0]) if lines else None
+    phase = {
+        "number": int(heading.group(1)) if heading else (number or 0),
+        "title": (heading.group(2) if heading else (lines[0] if lines else "")).strip("* "),
+        "description": ((heading.group(3) or "") if heading else "").strip("* "),
+        "tasks": [],
+        "implementation": [],
+    }
+    section = None
+    for line in lines[1:]:
+        match = _SECTION_RE.match(line)
+        if match:
+            section = match.group(1).lower()
+            line = match.group(2)
+        if section in ("tasks", "implementation") and _clean(line):
+            phase[section].append(_clean(line))
+    return phase
+
+
+def parse_roadmap(text: str) -> dict:
+    """Split roadmap text into {"overview": str, "phases": [phase, ...]}"""
+    headings = [match.start() for match in PHASE_HEADING_RE.finditer(text)]
+    intro = text[:headings[0]] if headings else text
+    overview_lines = []
+    for line in intro.strip().splitlines():
+        match = _SECTION_RE.match(line)
+        overview_lines.append(match.group(2) if match and match.group(1).lower() == "overview" else line)
+    phases = [
+        parse_phase(text[start:end], index + 1)
+        for index, (start, end) in enumerate(zip(headings, headings[1:] + [len(text)]))
+    ]
+    return {"overview": "\n".join(overview_lines).strip(), "phases": phases}
+
+
+def phase_spans(text: str) -> List[tuple]:
+    """(start, end) offsets of each phase block, in order"""
+    headings = [match.start() for match in PHASE_HEADING_RE.finditer(text)]
+    return list(zip(headings, headings[1:] + [len(text)]))
+
+
+def phase_text(text: str, index: int) -> str:
+    start, end = phase_spans(text)[index]
+    return text[start:end].strip()
+
+
+def replace_phase_text(text: str, index: int, new_phase: str) -> str:
+    """Swap the phase at position index, keeping every other byte of the roadmap"""
+    start, end = phase_spans(text)[index]
+    trailing = text[start:end][len(text[start:end].rstrip()):]
+    return text[:start] + new_phase.strip() + (trailing or "\n\n") + text[end:]
+
+
+class PhaseSplitter:
+    def __init__(self):
+        self.text = ""
+        self._phase_start: Optional[int] = None
+        self._scan_from = 0
+
+    def feed(self, delta: str) -> List[str]:
+        """Append a delta; returns the phases it completed"""
+        self.text += delta
+        completed = []
+        # Only whole lines can hold a heading, so rescan from the last unfinished line
+        for match in PHASE_HEADING_RE.finditer(self.text, self._scan_from):
+            if self._phase_start is not None:
+                completed.append(self.text[self._phase_start:match.start()].strip())
+            self._phase_start = match.start()
+        self._scan_from = self.text.rfind("\n") + 1
+        if self._phase_start is not None:
+            self._scan_from = max(self._scan_from, self._phase_start + 1)
+        return completed
+
+    def close(self) -> List[str]:
+        """The final phase, once the stream has ended"""
+        if self._phase_start is None:
+            return []
+        last = self.text[self._phase_start:].strip()
+        self._phase_start = None
+        return [last] if last else []
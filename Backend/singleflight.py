@@ -0,0 +1,64 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# =====================
+# Single-flight request coalescing
+# =====================
+# Concurrent calls with the same key share one upstream task. Every waiter
+# gets the same result or exception. Waiters await the task through
+# asyncio.shield, so cancelling one waiter (client disconnect, budget
+# timeout) never cancels the shared work for the others. With
+# cancel_when_abandoned, the shared task is cancelled once its last waiter
+# is gone; use it for work whose result is only useful to the waiters
+# (nothing is cached or stored by the task itself).
+
+
+def normalize_text_key(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class SingleFlight:
+    def __init__(self, name: str, cancel_when_abandoned: bool = False):
+        self.name = name
+        self.cancel_when_abandoned = cancel_when_abandoned
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.counters = {"leaders": 0, "coalesced": 0, "abandoned": 0}
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        self._waiters.pop(task, None)
+        if not task.cancelled():
+            task.exception()  # mark as retrieved even if every waiter went away
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            self.counters["leaders"] += 1
+        else:
+            self.counters["coalesced"] += 1
+        if not self.cancel_when_abandoned:
+            return await asyncio.shield(task)
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            remaining = self._waiters.get(task, 0) - 1
+            if remaining > 0:
+                self._waiters[task] = remaining
+            else:
+                self._waiters.pop(task, None)
+                if not task.done():
+                    # Last waiter left (cancelled or timed out): stop the orphaned work
+                    self.counters["abandoned"] += 1
+                    if self._calls.get(key) is task:
+                        del self._calls[key]
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {**self.counters, "in_flight": len(self._calls)}
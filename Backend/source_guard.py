@@ -0,0 +1,209 @@
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+# =====================
+# Per-source rate limiting and circuit breaking
+# =====================
+# Every outbound call to a research source takes a token from that source's
+# bucket (waiting up to max_wait for one) and passes through its circuit
+# breaker. After failure_threshold consecutive failures, or a 429/503 with
+# Retry-After, the circuit opens and calls fail immediately until the
+# cool-down ends; then a single half-open probe decides whether to close it.
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+RETRYABLE_STATUS = {429, 503}
+
+
+class SourceUnavailableError(Exception):
+    """Raised instead of calling a source whose circuit is open or whose limiter is saturated"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> float:
+        elapsed = time.monotonic() - self.updated
+        return min(self.capacity, self.tokens + elapsed * self.rate)
+
+    async def acquire(self, max_wait: float) -> float:
+        """Take one token, sleeping if needed; returns the time waited"""
+        async with self._lock:
+            self._refill()
+            wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            if wait > max_wait:
+                raise SourceUnavailableError(f"rate limit wait {wait:.1f}s exceeds {max_wait:.1f}s")
+            # Reserve the token now so concurrent callers queue behind us
+            self.tokens -= 1
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.open_until = 0.0
+        self._probe_in_flight = False
+
+    def before_call(self):
+        if self.state == OPEN:
+            if time.monotonic() < self.open_until:
+                raise SourceUnavailableError(f"circuit open for {self.open_until - time.monotonic():.1f}s")
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                raise SourceUnavailableError("circuit half-open, probe in flight")
+            self._probe_in_flight = True
+
+    def release_probe(self):
+        """The half-open probe ended without a verdict (cancelled or never sent)"""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self, retry_after: Optional[float] = None):
+        self.failures += 1
+        self._probe_in_flight = False
+        if retry_after is not None or self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            cool_down = retry_after if retry_after is not None else self.reset_timeout
+            self.state = OPEN
+            self.open_until = time.monotonic() + cool_down
+
+
+class SourceGuard:
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: float,
+        max_wait: float = 2.0,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+    ):
+        self.name = name
+        self.max_wait = max_wait
+        self.limiter = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.stats_counters = {
+            "calls": 0,
+            "rejected": 0,
+            "failures": 0,
+            "limiter_waits": 0,
+            "limiter_wait_seconds": 0.0,
+            "limiter_max_wait_seconds": 0.0,
+        }
+
+    async def acquire(self):
+        """Call before each request; raises SourceUnavailableError to fail fast"""
+        try:
+            self.breaker.before_call()
+        except SourceUnavailableError:
+            self.stats_counters["rejected"] += 1
+            raise
+        try:
+            waited = await self.limiter.acquire(self.max_wait)
+        except SourceUnavailableError:
+            self.stats_counters["rejected"] += 1
+            self.breaker.release_probe()
+            raise
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
+        self.stats_counters["calls"] += 1
+        if waited:
+            self.stats_counters["limiter_waits"] += 1
+            self.stats_counters["limiter_wait_seconds"] += waited
+            self.stats_counters["limiter_max_wait_seconds"] = max(
+                self.stats_counters["limiter_max_wait_seconds"], waited
+            )
+
+    @asynccontextmanager
+    async def request(self):
+        """Guard one outbound request; the body must call record_response()"""
+        await self.acquire()
+        try:
+            yield self
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+
+    def record_response(self, response):
+        if response.status_code in RETRYABLE_STATUS or response.status_code >= 500:
+            self.record_failure(parse_retry_after(response.headers.get("Retry-After")))
+        else:
+            self.breaker.record_success()
+
+    def record_failure(self, retry_after: Optional[float] = None):
+        self.stats_counters["failures"] += 1
+        self.breaker.record_failure(retry_after)
+
+    def stats(self) -> dict:
+        open_for = max(0.0, self.breaker.open_until - time.monotonic()) if self.breaker.state == OPEN else 0.0
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "open_for_seconds": round(open_for, 2),
+            "tokens_available": round(self.limiter.available(), 2),
+            **self.stats_counters,
+        }
+
+
+def _guard_from_env(name: str, prefix: str, rate: str, burst: str) -> SourceGuard:
+    return SourceGuard(
+        name,
+        rate=float(os.getenv(f"{prefix}_RATE_PER_SECOND", rate)),
+        burst=float(os.getenv(f"{prefix}_BURST", burst)),
+        max_wait=float(os.getenv(f"{prefix}_MAX_WAIT_SECONDS", "2")),
+        failure_threshold=int(os.getenv(f"{prefix}_FAILURE_THRESHOLD", "3")),
+        reset_timeout=float(os.getenv(f"{prefix}_RESET_SECONDS", "30")),
+    )
+
+
+source_guards: Dict[str, SourceGuard] = {
+    "semantic_scholar": _guard_from_env("semantic_scholar", "SEMANTIC_SCHOLAR", "1", "5"),
+    "arxiv": _guard_from_env("arxiv", "ARXIV", "1", "4"),
+    "crossref": _guard_from_env("crossref", "CROSSREF", "10", "20"),
+}
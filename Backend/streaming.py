@@ -0,0 +1,23 @@
+import json
+
+# =====================
+# Streaming response helpers (NDJSON / Server-Sent Events)
+# =====================
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# Stop proxies (nginx) from buffering the stream into one response
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def media_type_for(fmt: str) -> str:
+    return SSE_MEDIA_TYPE if fmt == "sse" else NDJSON_MEDIA_TYPE
+
+
+def encode_frame(frame: dict, fmt: str = "ndjson") -> str:
+    """Encode one frame; SSE frames use the frame's "type" as the event name"""
+    data = json.dumps(frame, default=str)
+    if fmt == "sse":
+        return f"event: {frame.get('type', 'message')}\ndata: {data}\n\n"
+    return data + "\n"
+
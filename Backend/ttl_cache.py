@@ -0,0 +1,176 @@
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# =====================
+# Two-tier cache (in-process LRU + MongoDB TTL collection)
+# =====================
+# Entries are "fresh" until fresh_until, then "stale" until expires_at.
+# Stale entries are still served while a single background refresh runs
+# (stale-while-revalidate). MongoDB removes expired documents through the
+# TTL index on expires_at (see database.py). The collection is a motor
+# (async_database) collection, so the Mongo tier is awaited on the event loop.
+
+
+class TwoTierCache:
+    def __init__(
+        self,
+        namespace: str,
+        collection=None,
+        max_entries: int = 256,
+        max_entry_bytes: int = 256_000,
+        fresh_seconds: float = 3600,
+        stale_seconds: float = 86400,
+    ):
+        self.namespace = namespace
+        self.collection = collection
+        self.max_entries = max_entries
+        self.max_entry_bytes = max_entry_bytes
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self._entries: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "mongo_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "oversize_skips": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+
+    def _doc_id(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _remember(self, key: str, value: Any, fresh_until: float, expires_at: float):
+        self._entries[key] = (value, fresh_until, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    async def _load_from_mongo(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        if self.collection is None:
+            return None
+        try:
+            doc = await self.collection.find_one({"_id": self._doc_id(key)})
+        except Exception as e:
+            print(f"{self.namespace} cache read failed: {e}")
+            return None
+        if not doc:
+            return None
+        return doc["value"], _to_timestamp(doc["fresh_until"]), _to_timestamp(doc["expires_at"])
+
+    async def get(self, key: str) -> Tuple[Optional[Any], str]:
+        """Return (value, state); state is one of fresh, stale or miss"""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] <= now:
+            del self._entries[key]
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+        else:
+            entry = await self._load_from_mongo(key)
+            if entry is None or entry[2] <= now:
+                self.counters["misses"] += 1
+                return None, "miss"
+            self.counters["mongo_hits"] += 1
+            self._remember(key, *entry)
+
+        value, fresh_until, _ = entry
+        if fresh_until > now:
+            self.counters["hits"] += 1
+            return value, "fresh"
+        self.counters["stale_hits"] += 1
+        return value, "stale"
+
+    async def set(self, key: str, value: Any):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_entry_bytes:
+            self.counters["oversize_skips"] += 1
+            return
+        now = time.time()
+        fresh_until = now + self.fresh_seconds
+        expires_at = fresh_until + self.stale_seconds
+        self._remember(key, value, fresh_until, expires_at)
+        if self.collection is None:
+            return
+        doc = {
+            "value": value,
+            "fresh_until": _to_datetime(fresh_until),
+            "expires_at": _to_datetime(expires_at),
+        }
+        try:
+            await self.collection.replace_one({"_id": self._doc_id(key)}, doc, upsert=True)
+        except Exception as e:
+            print(f"{self.namespace} cache write failed: {e}")
+
+    async def invalidate(self, key: str):
+        self._entries.pop(key, None)
+        if self.collection is not None:
+            try:
+                await self.collection.delete_one({"_id": self._doc_id(key)})
+            except Exception as e:
+                print(f"{self.namespace} cache delete failed: {e}")
+
+    async def _refresh(self, key: str, loader: Callable[[], Awaitable[Any]], cache_if: Callable[[Any], bool]):
+        try:
+            value = await loader()
+            if cache_if(value):
+                await self.set(key, value)
+            self.counters["refreshes"] += 1
+        except Exception as e:
+            self.counters["refresh_errors"] += 1
+            print(f"{self.namespace} cache refresh failed: {e}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    def refresh_in_background(self, key: str, loader: Callable[[], Awaitable[Any]], cache_if: Callable[[Any], bool] = bool):
+        if key not in self._refreshing:
+            self._refreshing[key] = asyncio.create_task(self._refresh(key, loader, cache_if))
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        cache_if: Callable[[Any], bool] = bool,
+        refresh_loader: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Tuple[Any, str]:
+        """Serve from cache (refreshing stale entries in the background) or load and store.
+
+        refresh_loader, when given, replaces loader for background refreshes of
+        stale entries (e.g. one without the caller's latency budget).
+        """
+        value, state = await self.get(key)
+        if state == "stale":
+            self.refresh_in_background(key, refresh_loader or loader, cache_if)
+        if state != "miss":
+            return value, state
+        value = await loader()
+        if cache_if(value):
+            await self.set(key, value)
+        return value, state
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "max_entry_bytes": self.max_entry_bytes,
+            "refreshing": len(self._refreshing),
+        }
+
+
+def _to_datetime(timestamp: float) -> datetime:
+    # Naive UTC, matching how the rest of the app stores datetimes
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+def _to_timestamp(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
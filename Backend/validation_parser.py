@@ -0,0 +1,131 @@
+import re
+from typing import List, Optional
+
+from json_repair import lenient_json_loads
+
+# =====================
+# Validation result parsing
+# =====================
+# Model output is fitted to the validation result shape field by field:
+# keys match regardless of case and separators, scores are clamped to
+# 0-100, and suggestions may be lists or bulleted text. Missing fields get
+# defaults and mark the result parsed_with_fallback (returned, not cached).
+
+DEFAULT_SCORE = 70
+VALIDATION_SCORE_FIELDS = ("feasibility", "market_demand", "uniqueness", "strength", "risk_factors")
+VALIDATION_ANALYSIS_DEFAULTS = {
+    "verdict": "Strong potential identified with key areas for development.",
+    "feasibility": "Technical implementation appears feasible with proper planning.",
+    "market_demand": "Market shows promising demand indicators.",
+    "uniqueness": "Concept demonstrates notable differentiation opportunities.",
+    "strength": "Core strengths provide solid foundation for growth.",
+    "risk_factors": "Manageable risks identified with mitigation strategies available.",
+    "existing_competitors": "Competitive landscape analysis reveals positioning opportunities."
+}
+_FIELD_KEY_RE = re.compile(r"[^a-z]")
+_SCORE_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_LIST_ITEM_RE = re.compile(r"^\s*(?:[-•*]|\d+[.)])\s*")
+
+
+def _fields(data) -> dict:
+    """Index a parsed object by key, ignoring case, spaces and underscores ("marketDemand")"""
+    if not isinstance(data, dict):
+        return {}
+    return {_FIELD_KEY_RE.sub("", key.lower()): value for key, value in data.items() if isinstance(key, str)}
+
+
+def _field(fields: dict, *names):
+    for name in names:
+        value = fields.get(name.replace("_", ""))
+        if value is not None:
+            return value
+    return None
+
+
+def _score(value) -> Optional[int]:
+    if isinstance(value, bool) or value is None:
+        return None
+    if not isinstance(value, (int, float)):
+        match = _SCORE_RE.search(str(value))  # "78", "78/100"
+        if not match:
+            return None
+        value = float(match.group())
+    return min(100, max(0, int(round(value))))
+
+
+def _suggestion_list(value) -> Optional[List[str]]:
+    if isinstance(value, str):
+        value = [line for line in value.splitlines() if line.strip()]
+    if not isinstance(value, list):
+        return None
+    items = [_LIST_ITEM_RE.sub("", str(item)).strip() for item in value if item is not None]
+    return [item for item in items if item][:5] or None
+
+
+def normalize_validation_result(data) -> dict:
+    """Fit parsed model output to the validation result shape.
+
+    Fields the model omitted (or that were lost to truncation) get the
+    defaults, and the result is marked parsed_with_fallback so it is
+    returned but not cached.
+    """
+    missing = 0
+    top = _fields(data)
+    scores_data = _fields(_field(top, "scores")) or top
+    analysis_data = _fields(_field(top, "analysis")) or top
+    suggestions_data = _fields(_field(top, "suggestions")) or top
+
+    def score(value):
+        nonlocal missing
+        parsed = _score(value)
+        if parsed is None:
+            missing += 1
+            return DEFAULT_SCORE
+        return parsed
+
+    def section(name, *aliases):
+        nonlocal missing
+        value = _field(analysis_data, name, *aliases)
+        if isinstance(value, list):
+            value = ", ".join(str(item) for item in value)
+        if not isinstance(value, str) or not value.strip():
+            missing += 1
+            return VALIDATION_ANALYSIS_DEFAULTS[name]
+        return value.strip()
+
+    def suggestions(category):
+        nonlocal missing
+        items = _suggestion_list(_field(suggestions_data, category))
+        if items is None:
+            missing += 1
+            return [f"No specific {category} suggestions identified"]
+        return items
+
+    result = {
+        "overall_score": score(_field(top, "overall_score", "overall")),
+        "scores": {name: score(_field(scores_data, name)) for name in VALIDATION_SCORE_FIELDS},
+        "analysis": {
+            "verdict": section("verdict"),
+            "feasibility": section("feasibility"),
+            "market_demand": section("market_demand"),
+            "uniqueness": section("uniqueness"),
+            "strength": section("strength"),
+            "risk_factors": section("risk_factors"),
+            "existing_competitors": section("existing_competitors", "competitors")
+        },
+        "suggestions": {
+            category: suggestions(category) for category in ("critical", "recommended", "optional")
+        }
+    }
+    if missing:
+        result["parsed_with_fallback"] = True
+    return result
+
+
+def parse_fallback_response(text: str) -> dict:
+    """
+    Fallback parser in case JSON parsing fails: one lenient pass that repairs
+    fences, trailing commas, stray quotes and truncation, then keeps every
+    field it recovered
+    """
+    return normalize_validation_result(lenient_json_loads(text, default={}))
@@ -23,10 +23,12 @@ interface User {
   created_at: string;
   profile_data?: ProfileData;
   validation_history?: ValidationItem[];
+  validation_count?: number;
 }
 
 interface ApiResponse {
   users?: User[];
+  next_cursor?: string | null;
 }
 
 const DashboardPage = () => {
@@ -48,23 +50,32 @@ const DashboardPage = () => {
         setLoading(true);
         setError(null);
         
-        const response = await fetch('http://localhost:8000/dashboard-data', {
-          headers: {
-            'Authorization': `Bearer ${token}`
+        // The endpoint is paginated; follow next_cursor until the last page
+        const allUsers: User[] = [];
+        let cursor: string | null | undefined = null;
+        do {
+          const url = 'http://localhost:8000/dashboard-data' + (cursor ? `?after=${encodeURIComponent(cursor)}` : '');
+          const response = await fetch(url, {
+            headers: {
+              'Authorization': `Bearer ${token}`
+            }
+          });
+
+          if (response.status === 403) {
+            setError('Access denied. You need developer privileges.');
+            return;
           }
-        });
 
-        if (response.status === 403) {
-          setError('Access denied. You need developer privileges.');
-          return;
-        }
+          if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+          }
 
-        if (!response.ok) {
-          throw new Error(`HTTP error! status: ${response.status}`);
-        }
+          const page: ApiResponse = await response.json();
+          allUsers.push(...(page.users || []));
+          cursor = page.next_cursor;
+        } while (cursor);
 
-        const result: ApiResponse = await response.json();
-        const processedUsers = (result.users || []).map(user => ({
+        const processedUsers = allUsers.map(user => ({
           ...user,
           created_at: user.created_at ? new Date(user.created_at).toISOString() : new Date().toISOString(),
           profile_data: user.profile_data ? {
@@ -184,7 +195,12 @@ const DashboardPage = () => {
                       </div>
                       
                       <div>
-                        <h4 className="font-medium mb-2 text-gray-300">Recent Validations</h4>
+                        <h4 className="font-medium mb-2 text-gray-300">
+                          Recent Validations
+                          {user.validation_count !== undefined && user.validation_count > (user.validation_history?.length || 0) && (
+                            <span className="text-gray-500 font-normal"> ({user.validation_history?.length || 0} of {user.validation_count})</span>
+                          )}
+                        </h4>
                         {user.validation_history && user.validation_history.length > 0 ? (
                           <div className="space-y-3">
                             {user.validation_history.map((validation: ValidationItem, index: number) => (
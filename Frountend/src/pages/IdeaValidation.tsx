@@ -183,6 +183,8 @@ const IdeaValidation: React.FC = () => {
 
     try {
       const API_URL = "http://127.0.0.1:8000/validate-idea";
+      // Validation works without an account; signed-in users also get the idea saved to their history
+      const token = localStorage.getItem("token");
       
       const response = await axios.post<ValidationResponse>(
         API_URL,
@@ -190,6 +192,7 @@ const IdeaValidation: React.FC = () => {
         {
           headers: {
             'Content-Type': 'application/json',
+            ...(token ? { Authorization: `Bearer ${token}` } : {}),
           },
           timeout: 60000 // Increased timeout to 60 seconds
         }
@@ -36,7 +36,7 @@ export default function ResearchAdvisor() {
       }
 
       console.log('🔍 Sending request to backend...');
-      const response = await fetch('http://localhost:8000/research-papers', {
+      const response = await fetch('http://localhost:8000/research-papers/stream', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -48,7 +48,7 @@ export default function ResearchAdvisor() {
         })
       });
 
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         const errorText = await response.text();
         let errorMessage = 'Failed to fetch research papers';
         
@@ -62,22 +62,58 @@ export default function ResearchAdvisor() {
         throw new Error(errorMessage);
       }
 
-      const data = await response.json();
-      console.log('📊 Received data:', data);
-      
-      const receivedPapers = data.papers || [];
-      setPapers(receivedPapers);
-      setSearchTerms(data.search_terms || []);
-      
-      const stats: {[key: string]: number} = {};
-      receivedPapers.forEach((paper: ResearchPaper) => {
-        stats[paper.source] = (stats[paper.source] || 0) + 1;
-      });
-      setSourceStats(stats);
+      setPapers([]);
+      setSourceStats({});
+
+      // Papers arrive as NDJSON frames, one per source, as soon as each source finishes;
+      // the closing summary frame carries the merged, deduped list in global rank order
+      let receivedPapers: ResearchPaper[] = [];
+      let stats: {[key: string]: number} = {};
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      const handleFrame = (frame: any) => {
+        if (frame.type === 'search_terms') {
+          setSearchTerms(frame.search_terms || []);
+        } else if (frame.type === 'papers') {
+          (frame.papers || []).forEach((paper: ResearchPaper) => {
+            receivedPapers.push(paper);
+            stats[paper.source] = (stats[paper.source] || 0) + 1;
+          });
+          setPapers([...receivedPapers]);
+          setSourceStats({ ...stats });
+          setIsLoading(false);
+        } else if (frame.type === 'summary') {
+          console.log('📊 Research summary:', frame);
+          if (Array.isArray(frame.papers)) {
+            receivedPapers = frame.papers;
+            stats = {};
+            receivedPapers.forEach((paper: ResearchPaper) => {
+              stats[paper.source] = (stats[paper.source] || 0) + 1;
+            });
+            setPapers([...receivedPapers]);
+            setSourceStats({ ...stats });
+            setIsLoading(false);
+          }
+        }
+      };
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop() || '';
+        lines.filter(line => line.trim()).forEach(line => handleFrame(JSON.parse(line)));
+      }
+      if (buffer.trim()) {
+        handleFrame(JSON.parse(buffer));
+      }
       
       console.log('📈 Source statistics:', stats);
       
-      if (!receivedPapers || receivedPapers.length === 0) {
+      if (receivedPapers.length === 0) {
         setError('No research papers found for your idea. Try rephrasing or using different keywords.');
       } else {
         console.log(`✅ Successfully loaded ${receivedPapers.length} papers from ${Object.keys(stats).length} sources`);
@@ -105,22 +105,52 @@ const RoadmapGenerator: React.FC = () => {
         headers.Authorization = `Bearer ${token}`;
       }
 
-      const response = await fetch("http://localhost:8000/generate-roadmap", {
+      const response = await fetch("http://localhost:8000/roadmaps/stream", {
         method: "POST",
         headers,
         body: JSON.stringify({
           prompt: ideaPrompt,
-          timeframe: timeframe,
-          timestamp: Date.now() // Cache busting
+          timeframe: timeframe
         })
       });
 
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
 
-      const data = await response.json();
-      setRoadmapData(parseRoadmapResponse(data.roadmap));
+      // Tokens arrive as Server-Sent Events; re-render the roadmap as it grows
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let roadmapText = "";
+
+      const handleEvent = (event: string) => {
+        const dataLine = event.split("\n").find(line => line.startsWith("data: "));
+        if (!dataLine) return;
+        const frame = JSON.parse(dataLine.substring(6));
+        if (frame.type === "token") {
+          roadmapText += frame.text;
+          setRoadmapData(parseRoadmapResponse(roadmapText));
+          setLoading(false);
+        } else if (frame.type === "done") {
+          setRoadmapData(parseRoadmapResponse(frame.roadmap.roadmap));
+        } else if (frame.type === "error") {
+          throw new Error(frame.detail);
+        }
+      };
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split("\n\n");
+        buffer = events.pop() || "";
+        events.filter(event => event.trim()).forEach(handleEvent);
+      }
+      if (buffer.trim()) {
+        handleEvent(buffer);
+      }
+
       setRegenerateFlag(false);
     } catch (err: any) {
       console.error("Roadmap generation error:", err);